@@ -22,9 +22,44 @@ const BROWSERCHROME = (() => {
 
 const PREF_ENABLED = 'userChromeJS.enabled';
 const PREF_SCRIPTSDISABLED = 'userChromeJS.scriptsDisabled';
+// Written by the installer when script bundling is enabled
+const BUNDLE_BASE_URI = "chrome://userchromejs/content/bundles/";
+
+// Parsed userChromeJS.scriptsDisabled and the scripts and styles matching
+// each document URL seen so far. Both are dropped whenever the pref changes,
+// which is also what toggleScript() does.
+const MATCH_CACHE = new (function(){
+  // Query strings could make the number of distinct URLs grow without bound
+  const MAX_URLS = 100;
+  let disabledScripts = null;
+  const matches = new Map();
+  this.disabledScripts = () => {
+    if(!disabledScripts){
+      disabledScripts = new Set(Services.prefs.getStringPref(PREF_SCRIPTSDISABLED,"").split(","));
+    }
+    return disabledScripts
+  }
+  this.forURL = (aHref,compute) => {
+    let entry = matches.get(aHref);
+    if(!entry){
+      if(matches.size >= MAX_URLS){
+        matches.clear();
+      }
+      entry = compute(aHref);
+      matches.set(aHref,entry);
+    }
+    return entry
+  }
+  this.invalidate = () => {
+    disabledScripts = null;
+    matches.clear();
+  }
+  Services.prefs.addObserver(PREF_SCRIPTSDISABLED,this.invalidate);
+  return this
+})();
 
 function getDisabledScripts(){
-  return Services.prefs.getStringPref(PREF_SCRIPTSDISABLED,"").split(",")
+  return MATCH_CACHE.disabledScripts()
 }
 
 const MODULE_LOADER = new (function(){
@@ -46,6 +81,7 @@ class ScriptData {
   #chromeURI;
   #isRunning = false;
   #injectionFailed = false;
+  #precompiled = null;
   constructor(leafName, headerText, noExec, isStyle){
     const hasLongDescription = (/^\/\/\ @long-description/im).test(headerText);
     this.filename = leafName;
@@ -103,7 +139,7 @@ class ScriptData {
     Object.freeze(this);
   }
   get isEnabled() {
-    return getDisabledScripts().indexOf(this.filename) === -1;
+    return !getDisabledScripts().has(this.filename);
   }
   get injectionFailed(){
     return this.#injectionFailed
@@ -111,6 +147,9 @@ class ScriptData {
   get isRunning(){
     return this.#isRunning
   }
+  get isPrecompiled(){
+    return this.#precompiled !== null
+  }
   setRunning(){
     this.#isRunning = true
   }
@@ -153,6 +192,10 @@ class ScriptData {
     if(aStyle.styleSheetMode !== "author" || !aStyle.regex?.test(win.location.href)){
       return
     }
+    ScriptData.loadAuthorStyleIntoWindow(aStyle,win);
+  }
+  // Caller has checked that aStyle is an author sheet matching win
+  static loadAuthorStyleIntoWindow(aStyle,win){
     if(!aStyle.#preLoadedStyle){
       let success = ScriptData.preLoadAuthorStyle(aStyle);
       if(!success){
@@ -165,15 +208,32 @@ class ScriptData {
   static markScriptRunning(aScript){
     aScript.#isRunning = true;
   }
+  // Resolves to true once the script can be run without reading it from disk.
+  // Failures resolve to false, loadSubScript reports them at injection.
+  static precompileClassicScript(aScript){
+    if(aScript.ignoreCache || aScript.isESM){
+      return Promise.resolve(false)
+    }
+    return ChromeUtils.compileScript(aScript.chromeURI.spec)
+    .then(compiled => {
+      aScript.#precompiled = compiled;
+      return true
+    })
+    .catch(() => false)
+  }
   static injectClassicScriptIntoGlobal(aScript,aGlobal){
     try{
-      Services.scriptloader.loadSubScriptWithOptions(
-        aScript.chromeURI.spec,
-        {
-          target: aGlobal,
-          ignoreCache: aScript.ignoreCache
-        }
-      )
+      if(aScript.#precompiled){
+        aScript.#precompiled.executeInGlobal(aGlobal);
+      }else{
+        Services.scriptloader.loadSubScriptWithOptions(
+          aScript.chromeURI.spec,
+          {
+            target: aGlobal,
+            ignoreCache: aScript.ignoreCache
+          }
+        )
+      }
       aScript.#isRunning = true;
       return Promise.resolve(1)
     }catch(ex){
@@ -181,6 +241,20 @@ class ScriptData {
       return Promise.reject(ex)
     }
   }
+  static runBundledScriptInGlobal(aScript,aBundledScript,aBundle,aGlobal){
+    const [firstLine, scriptFunction] = aBundledScript;
+    try{
+      scriptFunction.call(aGlobal);
+      aScript.#isRunning = true;
+    }catch(ex){
+      aScript.#injectionFailed = true;
+      // Report the line in the original file rather than in the bundle
+      const line = ex.fileName?.endsWith(aBundle.chromeURI.spec)
+        ? ex.lineNumber - firstLine + 1
+        : ex.lineNumber;
+      console.error(new Error(`@ ${aScript.filename}:${line}`,{cause:ex}));
+    }
+  }
   static registerScriptManifest(aScript){
     if(aScript.#isRunning){
       return
@@ -222,6 +296,88 @@ class ScriptData {
   }
 }
 
+// Several classic scripts matching the same documents, generated into one
+// file so that each window loads it once instead of every script separately
+class ScriptBundle{
+  #failed = false;
+  #precompiled = null;
+  constructor(filename){
+    this.filename = filename;
+    this.chromeURI = Services.io.newURI(`${BUNDLE_BASE_URI}${filename}`);
+  }
+  get isPrecompiled(){
+    return this.#precompiled !== null
+  }
+  precompile(){
+    return ChromeUtils.compileScript(this.chromeURI.spec,{ hasReturnValue: true })
+    .then(compiled => {
+      this.#precompiled = compiled;
+      return true
+    })
+    .catch(() => false)
+  }
+  // Returns Map of filename -> [first line, function], or null if the bundle
+  // can't be used and scripts should be loaded individually instead
+  loadIntoGlobal(aGlobal){
+    if(this.#failed){
+      return null
+    }
+    try{
+      const bundled = this.#precompiled
+        ? this.#precompiled.executeInGlobal(aGlobal)
+        : Services.scriptloader.loadSubScriptWithOptions(
+            this.chromeURI.spec,
+            { target: aGlobal }
+          );
+      if(!Array.isArray(bundled)){
+        throw new Error("bundle did not evaluate to a list of scripts")
+      }
+      return new Map(bundled.map(([filename, firstLine, fun]) => [filename, [firstLine, fun]]))
+    }catch(ex){
+      this.#failed = true;
+      console.error(new Error(`Script bundle ${this.filename} failed to load, loading its scripts individually`,{cause:ex}));
+      return null
+    }
+  }
+}
+
+// Returns Map of script filename -> ScriptBundle. Bundles whose scripts have
+// changed since install are ignored, those scripts just load individually.
+function loadScriptBundles(scripts,scriptFiles){
+  const bundles = new Map();
+  const manifestFile = FileSystem.getEntry(Services.io.newURI(`${BUNDLE_BASE_URI}bundles.json`));
+  if(!manifestFile.isFile()){
+    return bundles
+  }
+  let manifest;
+  try{
+    manifest = JSON.parse(manifestFile.readSync());
+  }catch(ex){
+    console.error(new Error("Could not read script bundle manifest",{cause:ex}));
+    return bundles
+  }
+  for(let entry of manifest.bundles || []){
+    const members = entry.scripts.map(bundled => {
+      const script = scripts.find(s => s.filename === bundled.filename);
+      const file = scriptFiles.get(bundled.filename);
+      return script && file
+        && file.fileSize === bundled.size
+        && file.lastModifiedTime === bundled.mtime
+        && !(script.isESM || script.noExec || script.onlyonce || script.inbackground || script.ignoreCache)
+        ? script : null
+    });
+    if(members.some(script => !script || script.regex?.source !== members[0].regex?.source)){
+      console.warn(`Ignoring outdated script bundle ${entry.file}, reinstall to regenerate it`);
+      continue
+    }
+    const bundle = new ScriptBundle(entry.file);
+    for(let script of members){
+      bundles.set(script.filename, bundle);
+    }
+  }
+  return bundles
+}
+
 Pref.setIfUnset(PREF_ENABLED,true);
 Pref.setIfUnset(PREF_SCRIPTSDISABLED,"");
 
@@ -276,7 +432,7 @@ function updateMenuStatus(event){
     if(item.getAttribute("type") != "checkbox"){
       continue
     }
-    if (disabledScripts.includes(item.dataset.filename)){
+    if (disabledScripts.has(item.dataset.filename)){
       item.removeAttribute("checked");
     }else{
       item.setAttribute("checked","true");
@@ -288,9 +444,11 @@ class UserChrome_js{
   constructor(){
     this.scripts = [];
     this.styles = [];
+    this.bundles = new Map();
     this.SESSION_RESTORED = false;
     this.IS_ENABLED = Services.prefs.getBoolPref(PREF_ENABLED,false);
     this.isInitialWindow = true;
+    this.injectionTimingLogged = false;
     this.initialized = false;
     this.init();
   }
@@ -328,11 +486,13 @@ class UserChrome_js{
     const disabledScripts = getDisabledScripts();
     // load script data
     const scriptDir = FileSystem.getScriptDir();
+    const scriptFiles = new Map();
     if(scriptDir.isDirectory()){
       for(let entry of scriptDir){
         if (/^[A-Za-z0-9]+.*(\.uc\.js|\.uc\.mjs|\.sys\.mjs)$/i.test(entry.leafName)) {
           let script = ScriptData.fromScriptFile(entry);
-          if(this.registerScript(script,disabledScripts.includes(script.filename))){
+          scriptFiles.set(script.filename,entry);
+          if(this.registerScript(script,disabledScripts.has(script.filename))){
             continue // script is disabled
           }
           if(script.inbackground){
@@ -355,17 +515,42 @@ class UserChrome_js{
       for(let entry of styleDir){
         if (/^[A-Za-z0-9]+.*\.uc\.css$/i.test(entry.leafName)) {
           let style = ScriptData.fromStyleFile(entry);
-          this.registerScript(style,!disabledScripts.includes(style.filename));
+          this.registerScript(style,!disabledScripts.has(style.filename));
         }
       }
-      this.addAgentStyles(this.styles.filter(style => style.styleSheetMode === "agent" && !disabledScripts.includes(style.filename)));
+      this.addAgentStyles(this.styles.filter(style => style.styleSheetMode === "agent" && !disabledScripts.has(style.filename)));
     }
     this.scripts.sort((a,b) => a.loadOrder - b.loadOrder);
     this.styles.sort((a,b) => a.loadOrder - b.loadOrder);
+    this.bundles = loadScriptBundles(this.scripts,scriptFiles);
+    this.precompileMainWindowScripts();
     Services.obs.addObserver(this, 'domwindowopened', false);
     this.initialized = true;
 
   }
+  // Read and compile the classic scripts of the main window off the main
+  // thread while startup continues, so the first window doesn't wait on disk
+  precompileMainWindowScripts(){
+    const started = Cu.now();
+    const tasks = [];
+    const bundles = new Set();
+    for(let script of this.getMatchesForURL(BROWSERCHROME).scripts){
+      const bundle = this.bundles.get(script.filename);
+      if(bundle){
+        bundles.add(bundle);
+      }else if(!script.isESM){
+        tasks.push(ScriptData.precompileClassicScript(script));
+      }
+    }
+    for(let bundle of bundles){
+      tasks.push(bundle.precompile());
+    }
+    if(tasks.length){
+      Promise.all(tasks).then(results => {
+        console.log(`fx-autoconfig: precompiled ${results.filter(Boolean).length} of ${tasks.length} main window scripts in ${(Cu.now() - started).toFixed(1)}ms`);
+      });
+    }
+  }
   addAgentStyles(agentStyles){
     if(agentStyles.length > 0){
       let sss = Cc['@mozilla.org/content/style-sheet-service;1'].getService(Ci.nsIStyleSheetService);
@@ -379,16 +564,27 @@ class UserChrome_js{
       }
     }
   }
+  // Enabled scripts and author styles matching a document URL, in load order.
+  // Per-window state like injectionFailed is still checked at injection.
+  getMatchesForURL(aHref){
+    return MATCH_CACHE.forURL(aHref,() => {
+      const disabledScripts = getDisabledScripts();
+      // Note, sys.mjs scripts have .regex = null
+      const scripts = this.scripts.filter(s => !s.noExec && !disabledScripts.has(s.filename) && s.regex?.test(aHref));
+      return {
+        scripts: scripts,
+        hasModules: scripts.some(s => s.isESM),
+        styles: this.styles.filter(s => s.styleSheetMode === "author" && !disabledScripts.has(s.filename) && s.regex?.test(aHref))
+      }
+    })
+  }
   onDOMContent(document){
     const window = document.defaultView;
     if(!(/^chrome:(?!\/\/global\/content\/(commonDialog|alerts\/alert)\.xhtml)|about:(?!blank)/i).test(window.location.href)){
       // Don't inject scripts to modal prompt windows or notifications
       if(this.IS_ENABLED && this.styles.length > 0){
-        const disabledScripts = getDisabledScripts();
-        for(let style of this.styles){
-          if(!disabledScripts.includes(style.filename)){
-            ScriptData.tryLoadStyleIntoWindow(style,window)
-          }
+        for(let style of this.getMatchesForURL(window.location.href).styles){
+          ScriptData.loadAuthorStyleIntoWindow(style,window)
         }
       }
       return
@@ -417,25 +613,43 @@ class UserChrome_js{
         })
       }
       // Inject scripts to window
-      const disabledScripts = getDisabledScripts();
-      // Note, sys.mjs scripts have .regex = null
-      const scriptsForWindow = this.scripts.filter(s => s.regex?.test(window.location.href));
+      const matches = this.getMatchesForURL(window.location.href);
       
       // .uc.mjs scripts are loaded via module loader
-      if(scriptsForWindow.some(s => s.isESM && !disabledScripts.includes(s.filename))){
+      if(matches.hasModules){
         MODULE_LOADER.ready().then(m => m.executeInGlobal(window));
       }
       
-      for(let script of scriptsForWindow){
-        if(script.isESM || disabledScripts.includes(script.filename) || script.injectionFailed || script.noExec || (script.onlyonce && script.isRunning)) {
+      // Bundled scripts still run in load order, each from its own function
+      const loadedBundles = new Map();
+      const injectionStarted = Cu.now();
+      let injected = 0;
+      let precompiled = 0;
+      for(let script of matches.scripts){
+        if(script.isESM || script.injectionFailed || (script.onlyonce && script.isRunning)) {
           continue
         }
-        ScriptData.injectClassicScriptIntoGlobal(script,window)
-      }
-      for(let style of this.styles){
-        if(!disabledScripts.includes(style.filename)){
-          ScriptData.tryLoadStyleIntoWindow(style,window)
+        const bundle = this.bundles.get(script.filename);
+        if(bundle && !loadedBundles.has(bundle)){
+          loadedBundles.set(bundle,bundle.loadIntoGlobal(window));
+        }
+        const bundled = bundle && loadedBundles.get(bundle)?.get(script.filename);
+        if(bundled){
+          ScriptData.runBundledScriptInGlobal(script,bundled,bundle,window);
+        }else{
+          ScriptData.injectClassicScriptIntoGlobal(script,window)
         }
+        injected++;
+        if(bundled ? bundle.isPrecompiled : script.isPrecompiled){
+          precompiled++;
+        }
+      }
+      if(!this.injectionTimingLogged && window.location.href === BROWSERCHROME){
+        this.injectionTimingLogged = true;
+        console.log(`fx-autoconfig: injected ${injected} scripts (${precompiled} precompiled) into the first window in ${(Cu.now() - injectionStarted).toFixed(1)}ms`);
+      }
+      for(let style of matches.styles){
+        ScriptData.loadAuthorStyleIntoWindow(style,window)
       }
     }
     if(window.isChromeWindow){
@@ -1,15 +1,9 @@
 {
-  const PREF_SCRIPTSDISABLED = 'userChromeJS.scriptsDisabled';
-  
   let { loaderModuleLink } = ChromeUtils.importESModule("chrome://userchromejs/content/utils.sys.mjs");
   
-  let disabledScripts = Services.prefs.getStringPref(PREF_SCRIPTSDISABLED,"").split(",");
-  
-  let moduleScripts = loaderModuleLink.scripts
+  // Enabled scripts matching this document, cached by the loader per URL
+  let moduleScripts = loaderModuleLink.getMatchesForURL(window.location.href).scripts
   .filter(s => s.isESM
-            && s.regex?.test(window.location.href)
-            && !disabledScripts.includes(s.filename)
-            && !s.noExec
             && !(s.onlyonce && s.isRunning)
             && !s.injectionFailed
   );
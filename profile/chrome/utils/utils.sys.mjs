@@ -426,6 +426,9 @@ export const loaderModuleLink = new (function(){
     this.getScriptMenu = (aDoc) => {
       return ref.generateScriptMenuItemsIfNeeded(aDoc);
     }
+    this.getMatchesForURL = (aHref) => {
+      return ref.getMatchesForURL(aHref);
+    }
     brandName = aBrandName;
     variant = aVariant;
     this.scriptDataConstructor = aScriptData;
@@ -656,14 +659,14 @@ function getScriptInfoForType(aFilter,aScriptList){
     let script = aScriptList.find(s => s.filename === aFilter);
     return script ? ScriptInfo.fromScript(script,script.isEnabled) : null;
   }
-  const disabledScripts = Services.prefs.getStringPref('userChromeJS.scriptsDisabled',"").split(",");
+  // isEnabled reads the loader's cached set of disabled scripts
   if(filterType === "function"){
     return aScriptList.filter(aFilter).map(
-      script => ScriptInfo.fromScript(script,!disabledScripts.includes(script.filename))
+      script => ScriptInfo.fromScript(script,script.isEnabled)
     );
   }
   return aScriptList.map(
-    script => ScriptInfo.fromScript(script,!disabledScripts.includes(script.filename))
+    script => ScriptInfo.fromScript(script,script.isEnabled)
   );
 }
 
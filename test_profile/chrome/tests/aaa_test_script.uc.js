@@ -1 +1,2 @@
+var aaaTestScriptRuns = (window.aaaTestScriptRuns || 0) + 1;
 (()=>{42})();
\ No newline at end of file
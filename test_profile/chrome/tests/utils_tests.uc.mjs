@@ -26,6 +26,7 @@ import {
   Utils,
   Windows
 } from "chrome://userchromejs/content/uc_api.sys.mjs";
+import { loaderModuleLink } from "chrome://userchromejs/content/utils.sys.mjs";
 
   
 const BRAND_NAME = "Firefox Nightly";
@@ -455,7 +456,36 @@ new Test(
       && lines[lines.length - 1] === "Above line is also left empty";
 }),
 
-// TODO togglescript
+// Disabling a script must drop it from the per-URL matches the loader has
+// already cached for this window, and enabling it must bring it back
+new Test(
+  "toggleScriptInvalidatesMatchCache",
+  () => {
+    const filename = "aaa_test_script.uc.js";
+    const isMatched = () => loaderModuleLink.getMatchesForURL(window.location.href)
+      .scripts.some(script => script.filename === filename);
+    let states = [isMatched()];
+    Scripts.toggleScript(filename);
+    states.push(isMatched());
+    Scripts.toggleScript(filename);
+    states.push(isMatched());
+    return states.join(",");
+  }
+).expect("true,false,true"),
+
+// A precompiled classic script has to define its top-level var bindings on
+// the window just like loadSubScript does. aaa_test_script.uc.js counts its runs
+new Test(
+  "precompiledScriptDefinesGlobals",
+  async () => {
+    const ScriptData = loaderModuleLink.scriptDataConstructor;
+    const script = loaderModuleLink.scripts.find(script => script.filename === "aaa_test_script.uc.js");
+    const runsBefore = window.aaaTestScriptRuns;
+    const compiled = await ScriptData.precompileClassicScript(script);
+    await ScriptData.injectClassicScriptIntoGlobal(script,window);
+    return `${runsBefore};${compiled};${script.isPrecompiled};${window.aaaTestScriptRuns}`;
+  }
+).expectAsync("1;true;true;2"),
 
 // Check if script menu is available (this test runs in browser.xhtml context)
 new Test(
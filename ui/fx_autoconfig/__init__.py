@@ -0,0 +1,10 @@
+"""fx-autoconfig installer engine, usable without Tk"""
+
+from .durability import DURABILITY_BATCHED, DURABILITY_LEVELS, DURABILITY_NONE, DURABILITY_STRICT, SyncBatch
+from .engine import TEST_PROFILE_TEMPLATES, VERSION, FxAutoconfigEngine
+from .ignore import IgnoreRules
+from .jobs import Job, JobExecutor, OperationCancelled, OperationProgress
+from .library import ScriptLibrary
+from .loader import PREF_ENABLED, PREF_SCRIPTSDISABLED
+from .locks import TargetLock, TargetLockTimeout
+from .presets import PresetStore
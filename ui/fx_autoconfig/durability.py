@@ -0,0 +1,125 @@
+"""Durability levels for installer writes"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+# How hard a write phase works to get files onto disk before reporting success:
+# none leaves it to the OS, batched fsyncs every file and then each directory once
+# at the end of the phase, strict renames a synced temp file into place per file
+DURABILITY_NONE = "none"
+DURABILITY_BATCHED = "batched"
+DURABILITY_STRICT = "strict"
+DURABILITY_LEVELS = (DURABILITY_NONE, DURABILITY_BATCHED, DURABILITY_STRICT)
+# Files that are always written strictly: a truncated loader file breaks Firefox
+# startup, a truncated prefs file loses the user's settings
+CRITICAL_FILENAMES = ("config.js", "config-prefs.js", "prefs.js", "user.js")
+COPY_CHUNK_SIZE = 64 * 1024
+
+
+class SyncBatch:
+    """Durability policy for one write phase, critical loader files are always written strictly"""
+    def __init__(self, level=DURABILITY_BATCHED):
+        if level not in DURABILITY_LEVELS:
+            raise ValueError(f"Unknown durability level: {level}")
+        self.level = level
+        self.files = []
+        self.dirs = set()
+
+    @staticmethod
+    def is_critical(path):
+        parts = os.path.normpath(os.path.abspath(path)).split(os.sep)
+        if parts[-1] in CRITICAL_FILENAMES:
+            return True
+        return any(parts[i] == "chrome" and parts[i + 1] == "utils" for i in range(len(parts) - 2))
+
+    def level_for(self, path):
+        return DURABILITY_STRICT if self.is_critical(path) else self.level
+
+    @staticmethod
+    def fsync_fd(fd, full=False):
+        # On macOS fsync() only reaches the drive cache, F_FULLFSYNC reaches the disk
+        if full and sys.platform == "darwin":
+            import fcntl
+            try:
+                fcntl.fcntl(fd, fcntl.F_FULLFSYNC)
+                return
+            except OSError:
+                pass
+        os.fsync(fd)
+
+    @staticmethod
+    def fsync_path(path, directory=False):
+        if directory:
+            if os.name == "nt":
+                return  # Directories can't be opened for fsync, NTFS journals the metadata
+            fd = os.open(path, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+        else:
+            # Windows only flushes handles opened for writing
+            fd = os.open(path, os.O_RDWR if os.name == "nt" else os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def copy(self, src, dst):
+        """copy2() src to dst with the guarantee this batch asks for"""
+        if self.level_for(dst) == DURABILITY_STRICT:
+            self.atomic_write(dst, lambda out: self._copy_into(src, out),
+                              finish=lambda tmp_path: shutil.copystat(src, tmp_path))
+            return
+        shutil.copy2(src, dst)
+        self.written(dst)
+
+    @staticmethod
+    def _copy_into(src, out):
+        with open(src, 'rb') as f:
+            shutil.copyfileobj(f, out, COPY_CHUNK_SIZE)
+
+    def atomic_write(self, path, data, finish=None):
+        """Write bytes, or what data(file) writes, to a temp file that is renamed over path"""
+        # finish(tmp_path) can set metadata first. Strict files are synced
+        # before the rename, so path is never left half written.
+        strict = self.level_for(path) == DURABILITY_STRICT
+        fd, tmp_path = tempfile.mkstemp(prefix=".fx-autoconfig-", suffix=".tmp",
+                                        dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                if callable(data):
+                    data(out)
+                else:
+                    out.write(data)
+                out.flush()
+                if finish:
+                    finish(tmp_path)
+                if strict:
+                    self.fsync_fd(out.fileno(), full=True)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.written(path, synced=strict)
+
+    def written(self, path, synced=False):
+        """Account for a file written by other means, synced if its data was already fsynced"""
+        level = self.level_for(path)
+        if level == DURABILITY_STRICT:
+            if not synced:
+                self.fsync_path(path)
+            self.fsync_path(os.path.dirname(os.path.abspath(path)), directory=True)
+        elif level == DURABILITY_BATCHED:
+            self.files.append(path)
+            self.dirs.add(os.path.dirname(os.path.abspath(path)))
+
+    def flush(self):
+        """End the phase: fsync the collected files, then each of their directories once"""
+        for path in self.files:
+            if os.path.exists(path):
+                self.fsync_path(path)
+        for directory in sorted(self.dirs):
+            if os.path.isdir(directory):
+                self.fsync_path(directory, directory=True)
+        self.files.clear()
+        self.dirs.clear()
@@ -0,0 +1,2287 @@
+"""Install, uninstall and profile maintenance without any UI"""
+
+import configparser
+import contextlib
+import hashlib
+import io
+import json
+import mmap
+import os
+import platform
+import re
+import shutil
+import tarfile
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .durability import DURABILITY_BATCHED, DURABILITY_LEVELS, DURABILITY_NONE, SyncBatch
+from .ignore import IGNORE_FILENAME, IgnoreRules
+from .jobs import Job, JobExecutor
+from .library import ScriptLibrary
+from .loader import (AUTHOR_HEADER_RE, BROWSER_CHROME_URL, ID_HEADER_RE, PREF_ENABLED, PREF_LINE_RE,
+                     PREF_SCRIPTSDISABLED, SCRIPT_FILENAME_RE, SCRIPT_HEADER_RE, STYLE_FILENAME_RE,
+                     STYLE_HEADER_RE, VERSION_HEADER_RE)
+from .locks import LOCK_TIMEOUT, TargetLock, TargetLockTimeout
+
+VERSION = "1.0.0"
+
+# ScriptData fields compared when syncing copied custom files, read from the
+# header within the first few KB of each file
+SYNC_HEADER_BYTES = 8 * 1024
+SYNC_HEADER_EXTENSIONS = (".js", ".mjs", ".css")
+VERSION_PART_RE = re.compile(r'^(\d*)(\D*)(\d*)(.*)$')
+
+# Rough cost model used by the startup overhead report. These are estimates
+# for a cold read without startup cache, not measurements.
+EST_FILE_OPEN_MS = 0.05
+EST_READ_BYTES_PER_MS = 256 * 1024
+EST_PARSE_BYTES_PER_MS = 64 * 1024
+EST_MATCH_MS = 0.002
+
+# Files at least this large are memory-mapped when hashing, smaller ones are streamed
+MMAP_HASH_THRESHOLD = 1024 * 1024
+HASH_CHUNK_SIZE = 64 * 1024
+
+# Throwaway profiles created from the repository test profiles
+TEST_PROFILE_TEMPLATES = {"Firefox": "test_profile", "Thunderbird": "test_tb_profile"}
+TEST_PROFILE_PREFIX = "fx-autoconfig-test-"
+TEST_PROFILE_MARKER = ".fx-autoconfig-test-profiles"
+# Only these chrome/ subdirectories may share inodes with the repository,
+# the tests write to resources/ and userChrome.css
+TEST_PROFILE_LINKABLE_DIRS = ("tests", "utils", "CSS")
+FICLONE = 0x40049409
+
+# profile/chrome directories that only work with the config.js of the same
+# version, they are installed and removed together with the program files
+LOADER_DIRS = ("utils",)
+
+# Record of files copied from custom directories, lets the chrome/ cleanup
+# tell stale copies apart from files the user placed there by hand
+INSTALL_MANIFEST = ".fx-autoconfig-files.json"
+# chrome/ subdirectories swept by the cleanup
+CLEANUP_DIRS = ("JS", "CSS", "resources")
+
+# Exported setups: one streamed tar with the metadata member first, chrome/
+# as it is on disk (symlinks as symlinks) and the content behind each symlink
+# under linked/ so it can be restored as a copy when the link target is gone
+EXPORT_FORMAT = 1
+EXPORT_METADATA_NAME = "fx-autoconfig-export.json"
+EXPORT_LINKED_PREFIX = "linked/"
+EXPORT_HASH_HEADER = "FXAUTOCONFIG.sha256"
+EXPORT_PREF_PREFIXES = ("userChromeJS.", "toolkit.legacyUserProfileCustomizations.stylesheets")
+
+# Optional per-window script bundles, read by loadScriptBundles() in
+# profile/chrome/utils/boot.sys.mjs. They live under utils/ so linked JS/
+# directories are never written to.
+BUNDLE_DIR = ("utils", "bundles")
+BUNDLE_MANIFEST = "bundles.json"
+BUNDLE_FORMAT = 1
+LOAD_ORDER_HEADER_RE = re.compile(r'// @loadOrder\s+(\d+)\s*$', re.MULTILINE | re.IGNORECASE)
+# Scripts the loader has to handle on their own
+UNBUNDLED_HEADER_RE = re.compile(r'// @(onlyonce|backgroundmodule|ignorecache|charset)\b')
+# Line terminators as JavaScript counts them for error line numbers
+JS_LINE_BREAK_RE = re.compile('\r\n|[\r\n\u2028\u2029]')
+JS_WORD_RE = re.compile(r'[\w$]+')
+# Words after which "/" starts a regular expression and function/class an expression
+JS_EXPRESSION_KEYWORDS = frozenset(("return", "typeof", "void", "delete", "new", "in", "instanceof",
+                                    "of", "yield", "await", "case", "throw", "extends"))
+# A "{" after "keyword (...)" opens a block, after "name(...)" a function body
+JS_BLOCK_KEYWORDS = frozenset(("if", "for", "while", "switch", "catch", "with"))
+
+
+class FxAutoconfigEngine:
+    """Install, uninstall, discovery and profile maintenance without any UI"""
+    # on_event(kind, data) gets "log" (message, error), "progress" (job, progress)
+    # and "job" (job) events on the thread doing the work
+    def __init__(self, on_event=None, max_workers=4, lock_timeout=LOCK_TIMEOUT):
+        self.on_event = on_event
+        self.lock_timeout = lock_timeout
+        self.jobs = JobExecutor(max_workers, on_change=lambda job: self.emit("job", job=job))
+        # path -> ((mtime_ns, size), header fields), see read_sync_header()
+        self._header_cache = {}
+        self.library = ScriptLibrary()
+
+    def emit(self, kind, **data):
+        if self.on_event:
+            self.on_event(kind, data)
+
+    def log_message(self, message, error=False):
+        self.emit("log", message=message, error=error)
+
+    def new_sync_batch(self, settings):
+        return SyncBatch(settings.get('durability', DURABILITY_BATCHED))
+
+    def install(self, settings):
+        """Install program, profile and custom files"""
+        self.log_message("Starting fx-autoconfig installation...")
+        progress = self.current_progress()
+        if progress:
+            progress.set_totals(*self.scan_install_totals(settings))
+        # A new config.js with an old chrome/utils/ (or the other way round)
+        # breaks the loader, so a cancel waits until both are in place
+        with self.cancel_unit():
+            # Install program files
+            self.install_program_files(settings)
+            self.log_message("Program files installed successfully")
+            self.install_profile_files(settings, include=LOADER_DIRS)
+
+        # Install the rest of the profile files
+        self.install_profile_files(settings, exclude=LOADER_DIRS + self.linked_sample_dirs(settings))
+        self.log_message("Profile files installed successfully")
+        
+        # Copy/link custom files if specified
+        if settings['custom_js_path'] or settings['custom_css_path']:
+            self.install_custom_files(settings)
+            self.log_message("Custom files processed successfully")
+
+        if settings.get('library_path'):
+            self.install_library_selection(settings)
+            self.log_message("Library files processed successfully")
+
+        chrome_dir = os.path.join(settings['profile_path'], "chrome")
+        if settings.get('bundle_scripts'):
+            self.build_script_bundles(settings)
+        elif self.remove_script_bundles(chrome_dir):
+            self.log_message("Removed script bundles, scripts load individually again")
+        
+        self.log_message("fx-autoconfig installed successfully!")
+
+    def uninstall(self, settings, complete_uninstall=False):
+        """Remove program files and either only utils/ or every fx-autoconfig file from the profile"""
+        uninstall_type = "complete" if complete_uninstall else "partial"
+        self.log_message(f"Starting {uninstall_type} fx-autoconfig uninstallation...")
+        progress = self.current_progress()
+        if progress:
+            progress.set_totals(*self.scan_uninstall_totals(settings, complete_uninstall))
+        firefox_path = self.get_program_target_path(settings['firefox_path'])
+        profile_path = settings['profile_path']
+        chrome_dir = os.path.join(profile_path, "chrome")
+
+        # config-prefs.js without config.js makes Firefox complain at startup,
+        # program files and chrome/utils/ are removed as one unit like in install()
+        with self.cancel_unit():
+            # Remove only the specific files that fx-autoconfig installs
+            repo_root = self.get_repo_root()
+            if repo_root:
+                self._remove_program_files(firefox_path, repo_root)
+            else:
+                self.log_message("Warning: Could not find repository root, skipping program file removal", error=True)
+
+            if not complete_uninstall:
+                # Remove only utils directory (preserve user scripts)
+                utils_dir = os.path.join(chrome_dir, "utils")
+                if os.path.exists(utils_dir):
+                    self._safe_remove_directory(utils_dir)
+                    self.log_message("Removed utils directory (user scripts preserved)")
+
+        if complete_uninstall:
+            # Generated files would otherwise keep utils/ from being removed
+            self.remove_script_bundles(chrome_dir)
+            # Carefully remove only fx-autoconfig files, preserve existing user files
+            self._remove_fx_autoconfig_files(chrome_dir)
+        
+        self.log_message(f"fx-autoconfig {uninstall_type} uninstallation completed successfully")
+
+    def clear_startup_cache(self, profile_path):
+        """Delete the startup cache of a profile, Firefox must not be running"""
+        cache_dir = self.get_startup_cache_path(profile_path)
+        if cache_dir and os.path.exists(cache_dir):
+            shutil.rmtree(cache_dir)
+        self.log_message("Startup cache cleared successfully")
+
+    def get_program_target_path(self, firefox_path):
+        """Directory that receives the program files for a Firefox installation"""
+        # On macOS, files go to Contents/Resources/, not Contents/MacOS/
+        if platform.system() == "Darwin" and firefox_path.endswith("MacOS"):
+            return firefox_path.replace("MacOS", "Resources")
+        return firefox_path
+
+    @contextlib.contextmanager
+    def lock_targets(self, name, targets, progress=None):
+        """Hold the inter-process lock of every target for the duration of the block"""
+        locks = []
+        try:
+            # A fixed order keeps two processes with overlapping targets from deadlocking
+            for target in sorted({TargetLock.normalize(t) for t in targets if t}):
+                lock = TargetLock(target, name)
+                try:
+                    lock.acquire(self.lock_timeout,
+                                 on_wait=lambda holder, target=target: self.log_message(
+                                     f"{name} waiting for {target}, in use by {TargetLock.describe_holder(holder)}"),
+                                 check_cancelled=progress.check_cancelled if progress else None)
+                except TargetLockTimeout as e:
+                    self.log_message(f"{name} not started: {e}", error=True)
+                    raise
+                locks.append(lock)
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def submit_job(self, name, targets, func, progress=None):
+        """Queue an operation, serialized with any other job or installer process on the same targets"""
+        def run_locked():
+            with self.lock_targets(name, targets, progress):
+                func()
+        try:
+            job = self.jobs.submit(name, targets, run_locked, progress)
+        except RuntimeError as e:
+            self.log_message(f"{name} not started: {e}", error=True)
+            return None
+        if job.state == Job.QUEUED:
+            self.log_message(f"{name} queued, waiting for running jobs on the same files")
+        return job
+
+    def get_firefox_paths(self):
+        system = platform.system()
+        paths = []
+        
+        if system == "Windows":
+            # Check common installation directories
+            search_dirs = [
+                "C:\\Program Files",
+                "C:\\Program Files (x86)",
+                os.environ.get('LOCALAPPDATA', ''),
+            ]
+            
+            for search_dir in search_dirs:
+                if os.path.exists(search_dir):
+                    try:
+                        for item in os.listdir(search_dir):
+                            if "firefox" in item.lower():
+                                full_path = os.path.join(search_dir, item)
+                                if os.path.isdir(full_path):
+                                    paths.append(full_path)
+                    except (PermissionError, OSError):
+                        continue
+                        
+        elif system == "Darwin":  # macOS
+            # Check Applications directory
+            apps_dir = "/Applications"
+            if os.path.exists(apps_dir):
+                try:
+                    for item in os.listdir(apps_dir):
+                        if "firefox" in item.lower() and item.endswith(".app"):
+                            app_path = os.path.join(apps_dir, item, "Contents", "MacOS")
+                            if os.path.exists(app_path):
+                                paths.append(app_path)
+                except (PermissionError, OSError):
+                    pass
+                    
+        elif system == "Linux":
+            # Check common Linux installation directories
+            search_dirs = [
+                "/usr/lib",
+                "/usr/lib64", 
+                "/opt",
+                "/snap",
+                "/usr/bin",
+            ]
+            
+            for search_dir in search_dirs:
+                if os.path.exists(search_dir):
+                    try:
+                        for item in os.listdir(search_dir):
+                            if "firefox" in item.lower():
+                                full_path = os.path.join(search_dir, item)
+                                if os.path.isdir(full_path):
+                                    # For snap, check if it's the current version
+                                    if "snap" in search_dir and "firefox" in item:
+                                        current_path = os.path.join(full_path, "current")
+                                        if os.path.exists(current_path):
+                                            paths.append(current_path)
+                                        else:
+                                            paths.append(full_path)
+                                    else:
+                                        paths.append(full_path)
+                    except (PermissionError, OSError):
+                        continue
+            
+        # Remove duplicates and return only valid Firefox paths
+        unique_paths = []
+        for path in paths:
+            if path not in unique_paths and self.is_valid_firefox_path(path):
+                unique_paths.append(path)
+                
+        return unique_paths
+
+    def is_valid_firefox_path(self, path):
+        executable = "firefox.exe" if platform.system() == "Windows" else "firefox"
+        return os.path.exists(os.path.join(path, executable))
+
+    def get_profiles_dir(self):
+        system = platform.system()
+        
+        if system == "Windows":
+            return os.path.join(os.environ.get('APPDATA', ''), 
+                                "Mozilla", "Firefox", "Profiles")
+        elif system == "Darwin":  # macOS
+            return os.path.expanduser(
+                "~/Library/Application Support/Firefox/Profiles")
+        elif system == "Linux":
+            return os.path.expanduser("~/.mozilla/firefox")
+        return None
+
+    def get_profile_names(self):
+        """Profile names from profiles.ini, keyed by normalized profile path"""
+        profiles_dir = self.get_profiles_dir()
+        if not profiles_dir:
+            return {}
+        # profiles.ini sits next to Profiles/ on Windows and macOS, inside the directory on Linux
+        ini_dir = profiles_dir if platform.system() == "Linux" else os.path.dirname(profiles_dir)
+        parser = configparser.RawConfigParser()
+        try:
+            parser.read(os.path.join(ini_dir, "profiles.ini"), encoding='utf-8')
+        except (configparser.Error, UnicodeDecodeError):
+            return {}
+        names = {}
+        for section in parser.sections():
+            if not section.startswith("Profile") or not parser.has_option(section, "Path"):
+                continue
+            path = parser.get(section, "Path")
+            if parser.get(section, "IsRelative", fallback="1") == "1":
+                path = os.path.join(ini_dir, *path.split('/'))
+            names[os.path.normcase(os.path.abspath(path))] = parser.get(section, "Name", fallback=None)
+        return names
+
+    def iter_profile_paths(self, names=None):
+        """Yield profiles in the profiles directory, then any registered elsewhere in profiles.ini"""
+        profiles_dir = self.get_profiles_dir()
+        seen = set()
+        if profiles_dir and os.path.exists(profiles_dir):
+            with os.scandir(profiles_dir) as it:
+                for entry in it:
+                    if entry.is_dir() and self.is_valid_profile_path(entry.path):
+                        seen.add(os.path.normcase(os.path.abspath(entry.path)))
+                        yield entry.path
+        for path in (names if names is not None else self.get_profile_names()):
+            if path not in seen and self.is_valid_profile_path(path):
+                yield path
+
+    def get_profile_paths(self):
+        return list(self.iter_profile_paths())
+
+    def get_profile_metadata(self, profile_path):
+        """Last use, fx-autoconfig install status and chrome/ size of a profile"""
+        chrome_dir = os.path.join(profile_path, "chrome")
+        try:
+            # Firefox rewrites prefs.js when it shuts down
+            last_used = os.stat(os.path.join(profile_path, "prefs.js")).st_mtime
+        except OSError:
+            last_used = None
+        if os.path.exists(os.path.join(chrome_dir, "utils", "boot.sys.mjs")):
+            status = "installed"
+        elif os.path.isdir(chrome_dir):
+            status = "chrome/ only"
+        else:
+            status = "not installed"
+        return {'last_used': last_used, 'status': status, 'size': self.scan_directory(chrome_dir)[1]}
+
+    def is_valid_profile_path(self, path):
+        return os.path.exists(os.path.join(path, "prefs.js"))
+
+    def get_job_targets(self, settings):
+        """Paths an install or uninstall writes to, used to serialize jobs"""
+        return [os.path.join(settings['profile_path'], "chrome"),
+                self.get_program_target_path(settings['firefox_path'])]
+
+    def install_program_files(self, settings):
+        firefox_path = self.get_program_target_path(settings['firefox_path'])
+        
+        # Get repository root directory
+        repo_root = self.get_repo_root()
+        program_src = os.path.join(repo_root, "program")
+        
+        if not os.path.exists(program_src):
+            raise FileNotFoundError(f"Could not find program directory at {program_src}")
+        
+        # Copy the contents of the program directory (not the directory itself)
+        # This follows the manual installation instructions from the README
+        batch = self.new_sync_batch(settings)
+        try:
+            self.copy_directory(program_src, firefox_path, batch)
+        finally:
+            batch.flush()
+
+    def install_profile_files(self, settings, include=None, exclude=()):
+        """Copy fx-autoconfig profile files from repository to Firefox profile, optionally only some entries"""
+        profile_path = settings['profile_path']
+        chrome_dir = os.path.join(profile_path, "chrome")
+        
+        # Get repository root directory
+        repo_root = self.get_repo_root()
+        if not repo_root:
+            raise Exception("Could not find fx-autoconfig repository root")
+            
+        profile_src = os.path.join(repo_root, "profile", "chrome")
+        if not os.path.exists(profile_src):
+            raise Exception(f"Profile source directory not found: {profile_src}")
+        
+        # Copy the contents of the profile/chrome directory (not the directory itself)
+        # This follows the manual installation instructions from the README
+        self.log_message(f"Copying fx-autoconfig profile files from: {profile_src}")
+        batch = self.new_sync_batch(settings)
+        try:
+            for name in sorted(os.listdir(profile_src)):
+                if (include is not None and name not in include) or name in exclude:
+                    continue
+                src_path = os.path.join(profile_src, name)
+                dst_path = os.path.join(chrome_dir, name)
+                if os.path.isdir(src_path):
+                    # JS/ and CSS/ may be linked to custom directories, copies must not end up there
+                    if os.path.islink(dst_path):
+                        self.log_message(f"Skipped linked directory: {dst_path}")
+                    else:
+                        self.copy_directory(src_path, dst_path, batch, skip_links=True)
+                elif os.path.islink(dst_path):
+                    self.log_message(f"Skipped symlinked file: {dst_path}")
+                else:
+                    os.makedirs(chrome_dir, exist_ok=True)
+                    batch.copy(src_path, dst_path)
+                    self.track_progress(os.path.getsize(src_path))
+        finally:
+            batch.flush()
+
+    def get_repo_root(self):
+        # Start from the directory containing this script
+        current_dir = Path(__file__).parent.absolute()
+        
+        # Look for program and profile directories to identify repository root
+        for i in range(10):  # Limit search depth
+            program_path = current_dir / "program"
+            profile_path = current_dir / "profile"
+            if program_path.exists() and profile_path.exists():
+                return str(current_dir)
+                
+            parent = current_dir.parent
+            if parent == current_dir:
+                break  # Reached filesystem root
+            current_dir = parent
+            
+        # Try fallback: assume we're in ui/fx_autoconfig
+        fallback = Path(__file__).parent.parent.parent
+        program_path = fallback / "program"
+        profile_path = fallback / "profile"
+        if program_path.exists() and profile_path.exists():
+            return str(fallback)
+            
+        # Repository root not found
+        return None
+
+    def scan_directory(self, path, count_bytes=True):
+        """Count files and bytes below path without following directory symlinks"""
+        files = size = 0
+        if not os.path.isdir(path):
+            return files, size
+        stack = [path]
+        while stack:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    files += 1
+                    if count_bytes:
+                        try:
+                            size += entry.stat().st_size
+                        except OSError:
+                            pass
+        return files, size
+
+    def scan_install_totals(self, settings):
+        """Cheap pre-scan of everything an install is going to copy or link"""
+        repo_root = self.get_repo_root()
+        sources = []
+        if repo_root:
+            sources.append((os.path.join(repo_root, "program"), True))
+            sources.append((os.path.join(repo_root, "profile", "chrome"), True))
+        # Symlinked custom files cost a link each, not their size
+        copy_custom = not settings['use_symlinks']
+        link_dirs = settings['use_symlinks'] and settings['link_directories']
+        total_files = total_bytes = 0
+        for custom_path in (settings['custom_js_path'], settings['custom_css_path']):
+            if custom_path and link_dirs and os.path.isdir(custom_path):
+                # At most one link per top-level entry
+                total_files += len(os.listdir(custom_path))
+            elif custom_path and os.path.isdir(custom_path):
+                for root, dirs, files in IgnoreRules().walk(custom_path):
+                    total_files += len(files)
+                    if copy_custom:
+                        total_bytes += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+        if settings.get('library_path'):
+            for rel_path in settings.get('library_selection') or ():
+                src_file = os.path.join(settings['library_path'], *rel_path.split('/'))
+                if os.path.isfile(src_file):
+                    total_files += 1
+                    if copy_custom:
+                        total_bytes += os.path.getsize(src_file)
+
+        for path, count_bytes in sources:
+            files, size = self.scan_directory(path, count_bytes)
+            total_files += files
+            total_bytes += size
+        return total_files, total_bytes
+
+    def scan_uninstall_totals(self, settings, complete_uninstall):
+        """Count the files the uninstall loops are going to visit"""
+        repo_root = self.get_repo_root()
+        chrome_dir = os.path.join(settings['profile_path'], "chrome")
+        total_files = 0
+        if repo_root:
+            total_files += self.scan_directory(os.path.join(repo_root, "program"), False)[0]
+        if complete_uninstall:
+            for dir_name in ('CSS', 'JS'):
+                total_files += self.scan_directory(os.path.join(chrome_dir, dir_name), False)[0]
+            if repo_root:
+                profile_src = os.path.join(repo_root, "profile", "chrome")
+                for dir_name in os.listdir(profile_src):
+                    if dir_name in ('CSS', 'JS'):
+                        continue
+                    path = os.path.join(profile_src, dir_name)
+                    total_files += self.scan_directory(path, False)[0] if os.path.isdir(path) else 1
+        else:
+            total_files += self.scan_directory(os.path.join(chrome_dir, "utils"), False)[0]
+        return total_files, 0
+
+    def track_progress(self, nbytes=0, cancellable=True):
+        """Count one finished file and stop here if cancelled, unless inside a cancel_unit()"""
+        job = self.jobs.current_job()
+        if job and job.progress:
+            job.progress.advance(nbytes)
+            self.emit("progress", job=job, progress=job.progress)
+            if cancellable:
+                job.progress.check_cancelled()
+
+    def current_progress(self):
+        """Progress of the job running on the calling thread, if it has one"""
+        job = self.jobs.current_job()
+        return job.progress if job else None
+
+    def cancel_unit(self):
+        """Block in which a cancel request is held back until the block has finished"""
+        progress = self.current_progress()
+        return progress.defer_cancel() if progress else contextlib.nullcontext()
+
+    def copy_directory(self, src, dst, batch, skip_links=False):
+        for root, dirs, files in os.walk(src):
+            # Calculate relative path
+            rel_path = os.path.relpath(root, src)
+            
+            # Create destination directory
+            if rel_path != '.':
+                dst_dir = os.path.join(dst, rel_path)
+            else:
+                dst_dir = dst
+            if skip_links and rel_path != '.' and os.path.islink(dst_dir):
+                # A linked directory points into the user's own files, never write through it
+                self.log_message(f"Skipped linked directory: {dst_dir}")
+                dirs[:] = []
+                continue
+            os.makedirs(dst_dir, exist_ok=True)
+              # Copy files
+            for file in files:
+                src_file = os.path.join(root, file)
+                dst_file = os.path.join(dst_dir, file)
+                if skip_links and os.path.islink(dst_file):
+                    self.log_message(f"Skipped symlinked file: {dst_file}")
+                    self.track_progress()
+                    continue
+                batch.copy(src_file, dst_file)
+                self.track_progress(os.path.getsize(dst_file))
+
+    def install_custom_files(self, settings):
+        """Copy or symlink custom files from user-specified directories"""
+        profile_path = settings['profile_path']
+        chrome_dir = os.path.join(profile_path, "chrome")
+        js_dir = os.path.join(chrome_dir, "JS")
+        css_dir = os.path.join(chrome_dir, "CSS")
+        
+        use_symlinks = settings['use_symlinks']
+        
+        # Check if symlinks are supported if user wants to use them
+        if use_symlinks and not self.can_create_symlinks():
+            self.log_message("Warning: Symlinks not supported on this system, copying files instead")
+            use_symlinks = False
+        link_directories = use_symlinks and settings['link_directories']
+        
+        installed = {}
+        batch = self.new_sync_batch(settings)
+        try:
+            # The manifest is saved even after a cancel so that files copied
+            # before it are still known to the cleanup
+            for custom_path, target_dir, kind in ((settings['custom_js_path'], js_dir, 'scripts'),
+                                                  (settings['custom_css_path'], css_dir, 'styles')):
+                if not custom_path or not os.path.exists(custom_path):
+                    continue
+                self.log_message(f"Processing {kind} from: {custom_path}")
+                if link_directories:
+                    self._link_custom_directory(custom_path, target_dir, kind, installed)
+                else:
+                    self._process_custom_directory(custom_path, target_dir, use_symlinks, kind,
+                                                   installed=installed, batch=batch)
+        finally:
+            if installed:
+                manifest = self.load_install_manifest(chrome_dir)
+                for dst_file, src_file in installed.items():
+                    key = self.manifest_key(chrome_dir, dst_file)
+                    manifest[key] = self.manifest_entry(src_file, dst_file, manifest.get(key))
+                self.save_install_manifest(chrome_dir, manifest, batch)
+            batch.flush()
+
+    def manifest_key(self, chrome_dir, path):
+        return os.path.relpath(os.path.abspath(path), os.path.abspath(chrome_dir)).replace(os.sep, '/')
+
+    def load_install_manifest(self, chrome_dir):
+        """Map of chrome/-relative paths to manifest_entry() records of the custom source each came from"""
+        try:
+            with open(os.path.join(chrome_dir, INSTALL_MANIFEST), 'r', encoding='utf-8') as f:
+                files = json.load(f).get('files', {})
+        except (OSError, ValueError, AttributeError):
+            return {}
+        # Older installers stored only the source path
+        return {key: {'source': entry} if isinstance(entry, str) else entry for key, entry in files.items()}
+
+    def manifest_entry(self, src_file, dst_file, previous=None):
+        """Source of an installed file and, for copies, what the copy looked like when it was made"""
+        entry = {'source': src_file}
+        if os.path.islink(dst_file) or not os.path.isfile(dst_file):
+            return entry
+        stat = os.stat(dst_file)
+        entry['size'] = stat.st_size
+        entry['mtime_ns'] = stat.st_mtime_ns
+        if (previous and previous.get('sha256') and previous.get('size') == stat.st_size and
+                previous.get('mtime_ns') == stat.st_mtime_ns):
+            # Untouched since the last install, no need to hash it again
+            entry['sha256'] = previous['sha256']
+        else:
+            entry['sha256'] = self.hash_file(dst_file)
+        return entry
+
+    def installed_copy_unchanged(self, path, entry):
+        """True if a copied file still matches its manifest entry, False if it was edited or can't be told"""
+        if not entry.get('sha256') or os.path.islink(path) or not os.path.isfile(path):
+            return False
+        stat = os.stat(path)
+        if stat.st_size != entry.get('size'):
+            return False
+        return stat.st_mtime_ns == entry.get('mtime_ns') or self.hash_file(path) == entry['sha256']
+
+    def save_install_manifest(self, chrome_dir, manifest, batch):
+        target = os.path.join(chrome_dir, INSTALL_MANIFEST)
+        if not manifest:
+            if os.path.exists(target):
+                os.remove(target)
+            return
+        batch.atomic_write(target, json.dumps({'files': manifest}, indent=2, sort_keys=True).encode('utf-8'))
+
+    def collect_bundle_groups(self, profile_path):
+        """Enabled classic per-window scripts in chrome/JS/ grouped by the documents they match"""
+        prefs = self.read_profile_prefs(profile_path, [PREF_SCRIPTSDISABLED])
+        disabled_scripts = set(filter(None, str(prefs.get(PREF_SCRIPTSDISABLED, "")).split(",")))
+        groups = {}
+        for path, is_style in self.iter_loader_files(profile_path):
+            filename = os.path.basename(path)
+            if is_style or not filename.lower().endswith(".uc.js") or filename in disabled_scripts:
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            try:
+                source = data.decode('utf-8').lstrip('\ufeff')
+            except UnicodeDecodeError:
+                self.log_message(f"Not bundling {filename}: it is not valid UTF-8")
+                continue
+            match = SCRIPT_HEADER_RE.search(source) if len(data) >= 24 else None
+            header_text = match.group(0) if match else ""
+            # Header-only files are never injected, see ScriptData.fromScriptFile()
+            if len(header_text.encode('utf-8')) > len(data) - 2 or UNBUNDLED_HEADER_RE.search(header_text):
+                continue
+            regex = self.build_include_regex(header_text)
+            if regex is None:
+                continue
+            reason = self.find_global_declaration(source)
+            if reason:
+                self.log_message(f"Not bundling {filename}: it has {reason}")
+                continue
+            load_order = LOAD_ORDER_HEADER_RE.search(header_text)
+            file_stat = os.stat(path)
+            groups.setdefault(regex.pattern, []).append({
+                'filename': filename,
+                'source': source,
+                'load_order': int(load_order.group(1)) or 10 if load_order else 10,
+                'size': file_stat.st_size,
+                'mtime': file_stat.st_mtime_ns // 1_000_000,
+            })
+        for scripts in groups.values():
+            scripts.sort(key=lambda script: (script['load_order'], script['filename']))
+        return groups
+
+    def find_global_declaration(self, source):
+        """Why a script can't run inside a bundle function, None if it can
+
+        Outside of any function, var and function declarations become window
+        properties and let/const/class share one global scope with every other
+        script. Inside the bundle they would be locals instead. The scan is not
+        a full parser, anything it can't follow keeps the script unbundled."""
+        stack = []  # "(", "[", "{", "function" for function bodies, "${" inside templates
+        paren_owners = []
+        prev = None  # Last word or punctuator
+        closed_owner = None  # Word before the "(" of the last ")"
+        in_template = False
+        i, length = 0, len(source)
+        while i < length:
+            if in_template:
+                while i < length and source[i] != '`' and not source.startswith('${', i):
+                    i += 2 if source[i] == '\\' else 1
+                if i >= length:
+                    return "an unterminated template literal"
+                in_template = False
+                if source[i] == '`':
+                    i += 1
+                    prev = "`"
+                else:
+                    stack.append("${")
+                    i += 2
+                    prev = "${"
+                continue
+            char = source[i]
+            if char.isspace():
+                i += 1
+            elif source.startswith('//', i):
+                match = JS_LINE_BREAK_RE.search(source, i)
+                i = match.end() if match else length
+            elif source.startswith('/*', i):
+                end = source.find('*/', i + 2)
+                if end < 0:
+                    return "an unterminated comment"
+                i = end + 2
+            elif char in '\'"':
+                i += 1
+                while i < length and source[i] != char and source[i] not in '\r\n':
+                    i += 2 if source[i] == '\\' else 1
+                if i >= length or source[i] != char:
+                    return "an unterminated string"
+                i += 1
+                prev = "string"
+            elif char == '`':
+                in_template = True
+                i += 1
+            elif char == '/' and (prev is None or prev in JS_EXPRESSION_KEYWORDS
+                                  or not (JS_WORD_RE.fullmatch(prev) or prev in (')', ']', '}', 'string', '`'))):
+                # Regular expression literal
+                i += 1
+                in_class = False
+                while i < length and (in_class or source[i] != '/'):
+                    if source[i] in '\r\n\u2028\u2029':
+                        return "a regular expression it could not follow"
+                    if source[i] == '\\':
+                        i += 1
+                    elif source[i] in '[]':
+                        in_class = source[i] == '['
+                    i += 1
+                if i >= length:
+                    return "a regular expression it could not follow"
+                match = JS_WORD_RE.match(source, i + 1)
+                i = match.end() if match else i + 1
+                prev = "string"
+            elif JS_WORD_RE.match(source, i):
+                word = JS_WORD_RE.match(source, i).group(0)
+                i += len(word)
+                rest = source[i:i + 64].lstrip()
+                if prev in ('.', '?.') or rest.startswith(':') and not rest.startswith('::'):
+                    # Property access or object key
+                    prev = "name"
+                    continue
+                in_function = "function" in stack
+                expression = prev in JS_EXPRESSION_KEYWORDS or (
+                    prev is not None and not JS_WORD_RE.fullmatch(prev)
+                    and prev not in (';', '{', '}', ')', ']', 'string', '`'))
+                if word == "var" and not in_function:
+                    return "a top-level var declaration"
+                if word in ("let", "const") and not stack:
+                    return f"a top-level {word} declaration"
+                if word == "function" and not in_function and not expression:
+                    return "a top-level function declaration"
+                if word == "class" and not stack and not expression:
+                    return "a top-level class declaration"
+                prev = word
+            elif source.startswith('=>', i):
+                i += 2
+                prev = "=>"
+            elif source.startswith('?.', i) and not source[i + 2:i + 3].isdigit():
+                i += 2
+                prev = "?."
+            elif char in '([{':
+                if char == '(':
+                    paren_owners.append(prev)
+                    stack.append("(")
+                elif char == '{' and (prev == "=>" or prev == ')' and closed_owner is not None
+                                      and JS_WORD_RE.fullmatch(closed_owner)
+                                      and closed_owner not in JS_BLOCK_KEYWORDS):
+                    stack.append("function")
+                else:
+                    stack.append(char)
+                i += 1
+                prev = char
+            elif char in ')]}':
+                if not stack:
+                    return "unbalanced brackets"
+                opened = stack.pop()
+                if opened not in {')': ("(",), ']': ("[",), '}': ("{", "function", "${")}[char]:
+                    return "unbalanced brackets"
+                in_template = opened == "${"
+                if char == ')':
+                    closed_owner = paren_owners.pop()
+                i += 1
+                prev = char
+            else:
+                i += 1
+                prev = char
+        if stack or in_template:
+            return "unbalanced brackets"
+        return None
+
+    def render_script_bundle(self, scripts):
+        """Bundle source and manifest entries for scripts that share an @include target"""
+        # Sources go in unchanged, their line terminators are only counted
+        parts = ["// fx-autoconfig script bundle, generated at install time. Do not edit.\n[\n"]
+        line = 3
+        entries = []
+        for index, script in enumerate(scripts):
+            source = script['source']
+            parts.append(f"// {script['filename']}\n[{json.dumps(script['filename'])}, {line + 2}, function(){{\n")
+            line += 2
+            ends_with_break = JS_LINE_BREAK_RE.fullmatch(source[-2:]) or JS_LINE_BREAK_RE.fullmatch(source[-1:])
+            source_lines = len(JS_LINE_BREAK_RE.findall(source)) + (0 if ends_with_break else 1)
+            entries.append({
+                'filename': script['filename'],
+                'size': script['size'],
+                'mtime': script['mtime'],
+                'line': line,
+                'lines': source_lines,
+            })
+            parts.append(source if ends_with_break else source + "\n")
+            line += source_lines
+            parts.append("}],\n" if index < len(scripts) - 1 else "}]\n")
+            line += 1
+        parts.append("]\n")
+        return "".join(parts), entries
+
+    def build_script_bundles(self, settings):
+        """Generate one bundle per @include target so each window loads one file instead of many"""
+        chrome_dir = os.path.join(settings['profile_path'], "chrome")
+        bundle_dir = os.path.join(chrome_dir, *BUNDLE_DIR)
+        os.makedirs(bundle_dir, exist_ok=True)
+        batch = self.new_sync_batch(settings)
+        bundles = []
+        for scripts in self.collect_bundle_groups(settings['profile_path']).values():
+            if len(scripts) < 2:
+                continue  # Nothing to gain from bundling a single script
+            text, entries = self.render_script_bundle(scripts)
+            data = text.encode('utf-8')
+            # Content-addressed names keep the startup cache from serving an older bundle
+            filename = f"bundle-{hashlib.sha256(data).hexdigest()[:16]}.js"
+            batch.atomic_write(os.path.join(bundle_dir, filename), data)
+            bundles.append({'file': filename, 'scripts': entries})
+            self.log_message(f"Bundled {len(entries)} scripts into {filename}: "
+                             f"{', '.join(entry['filename'] for entry in entries)}")
+        # The manifest goes last, the loader never sees a bundle that isn't fully written
+        manifest = json.dumps({'format': BUNDLE_FORMAT, 'bundles': bundles}, indent=2)
+        batch.atomic_write(os.path.join(bundle_dir, BUNDLE_MANIFEST), manifest.encode('utf-8'))
+        keep = {BUNDLE_MANIFEST} | {bundle['file'] for bundle in bundles}
+        for name in os.listdir(bundle_dir):
+            if name not in keep and name.startswith("bundle-"):
+                os.remove(os.path.join(bundle_dir, name))
+        batch.flush()
+        if not bundles:
+            self.log_message("No @include target has more than one enabled script, nothing to bundle")
+
+    def remove_script_bundles(self, chrome_dir):
+        """Delete generated bundles, returns True if there were any"""
+        bundle_dir = os.path.join(chrome_dir, *BUNDLE_DIR)
+        if not os.path.isdir(bundle_dir):
+            return False
+        shutil.rmtree(bundle_dir)
+        return True
+
+    def can_create_symlinks(self):
+        """Check whether this process may create symlinks (Windows needs admin or developer mode)"""
+        test_dir = tempfile.mkdtemp()
+        try:
+            os.symlink(test_dir, os.path.join(test_dir, "link"), target_is_directory=True)
+            return True
+        except (OSError, NotImplementedError, AttributeError):
+            return False
+        finally:
+            shutil.rmtree(test_dir, ignore_errors=True)
+
+    def linked_sample_dirs(self, settings):
+        """profile/chrome sample directories that a linked custom directory takes the place of"""
+        if not (settings['use_symlinks'] and settings['link_directories'] and self.can_create_symlinks()):
+            return ()
+        return tuple(name for name, key in (("JS", 'custom_js_path'), ("CSS", 'custom_css_path'))
+                     if settings[key] and os.path.isdir(settings[key]))
+
+    def _files_identical(self, path_a, path_b):
+        return (os.path.getsize(path_a) == os.path.getsize(path_b) and
+                self.hash_file(path_a) == self.hash_file(path_b))
+
+    def _is_link_only_tree(self, path, known_dirs=()):
+        """True if a directory holds nothing but symlinks, unmodified copies of files in known_dirs
+        and empty directories"""
+        for root, dirs, files in os.walk(path):
+            for name in files:
+                file_path = os.path.join(root, name)
+                if os.path.islink(file_path):
+                    continue
+                rel_path = os.path.relpath(file_path, path)
+                if not any(os.path.isfile(os.path.join(known, rel_path)) and
+                           self._files_identical(file_path, os.path.join(known, rel_path))
+                           for known in known_dirs if known):
+                    return False
+        return True
+
+    def _can_replace_with_link(self, path, src_path=None, samples_dir=None):
+        """A path may become a link unless it holds files the user may have written or edited"""
+        if not os.path.lexists(path) or os.path.islink(path):
+            return True
+        if os.path.isdir(path):
+            # Earlier copies from the source or the samples can be replaced
+            return self._is_link_only_tree(path, (src_path, samples_dir))
+        return bool(src_path) and os.path.isfile(src_path) and self._files_identical(path, src_path)
+
+    def _replace_with_link(self, src_path, dst_path, is_dir, samples_dir=None):
+        """Point dst_path at src_path, returns False if it already does"""
+        if os.path.islink(dst_path):
+            if os.readlink(dst_path) == src_path:
+                return False
+            os.unlink(dst_path)
+        elif os.path.lexists(dst_path):
+            if not self._can_replace_with_link(dst_path, src_path, samples_dir):
+                raise FileExistsError(f"{dst_path} holds files of its own")
+            if os.path.isdir(dst_path):
+                # Left over from per-file symlink mode or the samples, nothing of the user's
+                self._safe_remove_directory(dst_path)
+            else:
+                os.remove(dst_path)
+        os.symlink(src_path, dst_path, target_is_directory=is_dir)
+        return True
+
+    def _link_custom_directory(self, src_dir, dst_dir, file_type, installed=None):
+        """Link the whole custom directory, or each of its top-level entries"""
+        src_dir = os.path.abspath(src_dir)
+        repo_root = self.get_repo_root()
+        samples_dir = repo_root and os.path.join(repo_root, "profile", "chrome", os.path.basename(dst_dir))
+        if self._can_replace_with_link(dst_dir, src_dir, samples_dir):
+            if self._replace_with_link(src_dir, dst_dir, True, samples_dir):
+                self.log_message(f"Linked {file_type} directory: {dst_dir} -> {src_dir}")
+            else:
+                self.log_message(f"{file_type.capitalize()} directory already linked: {dst_dir}")
+            self.track_progress()
+            return
+
+        # dst_dir has files of its own (e.g. from profile/chrome), link entries one level down
+        os.makedirs(dst_dir, exist_ok=True)
+        ignore_rules = IgnoreRules()
+        if os.path.isfile(os.path.join(src_dir, IGNORE_FILENAME)):
+            ignore_rules.load_file(os.path.join(src_dir, IGNORE_FILENAME), "")
+        with os.scandir(src_dir) as it:
+            entries = list(it)
+        for entry in entries:
+            dst_path = os.path.join(dst_dir, entry.name)
+            is_dir = entry.is_dir()
+            if ignore_rules.is_ignored(entry.name, is_dir):
+                ignore_rules.skipped += 1
+                continue
+            try:
+                if is_dir and not self._can_replace_with_link(dst_path):
+                    self.log_message(f"{entry.name}/ has files of its own, linking its files individually")
+                    self._process_custom_directory(entry.path, dst_path, True, file_type,
+                                                   ignore_rules, entry.name, report_skipped=False,
+                                                   installed=installed)
+                    continue
+                if not is_dir and not self._can_replace_with_link(dst_path, entry.path):
+                    self.log_message(f"Kept {entry.name} in profile, it differs from the source and "
+                                     f"may hold local edits", error=True)
+                    self.track_progress()
+                    continue
+                if self._replace_with_link(entry.path, dst_path, is_dir):
+                    self.log_message(f"Symlinked {file_type}: {entry.name}{'/' if is_dir else ''}")
+            except Exception as e:
+                self.log_message(f"Failed to process {entry.name}: {e}", error=True)
+            self.track_progress()
+        self.log_skipped_entries(ignore_rules, file_type)
+
+    def log_skipped_entries(self, ignore_rules, file_type):
+        if ignore_rules.skipped:
+            self.log_message(f"Skipped {ignore_rules.skipped} ignored entries while processing {file_type} "
+                             f"(built-in defaults and {IGNORE_FILENAME})")
+
+    def _process_custom_directory(self, src_dir, dst_dir, use_symlinks, file_type,
+                                  ignore_rules=None, rel_base="", report_skipped=True, installed=None,
+                                  batch=None):
+        """Helper method to copy all contents from a custom directory to destination"""
+        ignore_rules = ignore_rules or IgnoreRules()
+        batch = batch or SyncBatch()
+        sync_counts = {}
+        for root, dirs, files in ignore_rules.walk(src_dir, rel_base):
+            # Calculate relative path from source directory
+            rel_path = os.path.relpath(root, src_dir)
+            
+            # Create corresponding directory structure in destination
+            if rel_path == '.':
+                target_dir = dst_dir
+            else:
+                target_dir = os.path.join(dst_dir, rel_path)
+            
+            os.makedirs(target_dir, exist_ok=True)
+            
+            # Process all files in this directory
+            for file in files:
+                src_file = os.path.join(root, file)
+                dst_file = os.path.join(target_dir, file)
+                
+                action = self._install_custom_file(src_file, dst_file, use_symlinks, file_type, batch, sync_counts)
+                if installed is not None and action in ("copy", "unchanged"):
+                    installed[os.path.abspath(dst_file)] = os.path.abspath(src_file)
+        self.log_sync_counts(sync_counts, file_type)
+        if report_skipped:
+            self.log_skipped_entries(ignore_rules, file_type)
+
+    def _install_custom_file(self, src_file, dst_file, use_symlinks, file_type, batch, sync_counts):
+        """Symlink or sync one custom file, returns "link", the sync action, or None on failure"""
+        file = os.path.basename(dst_file)
+        action = None
+        # Create symlink or copy file
+        try:
+            if use_symlinks:
+                # Remove existing file/link if it exists
+                if os.path.lexists(dst_file):
+                    os.remove(dst_file)
+                os.symlink(src_file, dst_file)
+                action = "link"
+                self.log_message(f"Symlinked {file_type}: {file}")
+            else:
+                action, detail = self.sync_action(src_file, dst_file)
+                sync_counts[action] = sync_counts.get(action, 0) + 1
+                if action == "copy":
+                    if os.path.islink(dst_file):
+                        os.unlink(dst_file)
+                    batch.copy(src_file, dst_file)
+                    self.log_message(f"Copied {file_type}: {file}" + (f" ({detail})" if detail else ""))
+                elif action == "unchanged" and os.stat(src_file).st_mtime_ns != os.stat(dst_file).st_mtime_ns:
+                    # Same content, align the timestamps so the next sync can tell from stat() alone
+                    shutil.copystat(src_file, dst_file)
+                elif action == "downgrade":
+                    self.log_message(f"Kept newer {file} in profile: {detail}", error=True)
+                elif action == "conflict":
+                    self.log_message(f"Left {file} unchanged, it conflicts with the source: {detail}", error=True)
+        except Exception as e:
+            self.log_message(f"Failed to process {file}: {e}", error=True)
+        self.track_progress(0 if use_symlinks else os.path.getsize(src_file))
+        return action
+
+    def log_sync_counts(self, sync_counts, file_type):
+        if sync_counts:
+            self.log_message(f"Synced {file_type}: {sync_counts.get('copy', 0)} copied, "
+                             f"{sync_counts.get('unchanged', 0)} unchanged, "
+                             f"{sync_counts.get('downgrade', 0)} newer in profile, "
+                             f"{sync_counts.get('conflict', 0)} conflicts")
+
+    def install_library_selection(self, settings):
+        """Install the files chosen from the script library, remove ones no longer chosen"""
+        library_path = os.path.abspath(settings['library_path'])
+        if not os.path.isdir(library_path):
+            self.log_message(f"Script library not found: {library_path}", error=True)
+            return
+        chrome_dir = os.path.join(settings['profile_path'], "chrome")
+        use_symlinks = settings['use_symlinks']
+        if use_symlinks and not self.can_create_symlinks():
+            self.log_message("Warning: Symlinks not supported on this system, copying files instead")
+            use_symlinks = False
+
+        batch = self.new_sync_batch(settings)
+        sync_counts = {}
+        installed = {}
+        chosen = {}
+        for rel_path in settings.get('library_selection') or ():
+            src_file = os.path.join(library_path, *rel_path.split('/'))
+            if not os.path.isfile(src_file):
+                self.log_message(f"Selected library file no longer exists: {rel_path}", error=True)
+                continue
+            filename = os.path.basename(src_file)
+            kind = ScriptLibrary.file_kind(filename)
+            dst_file = os.path.abspath(os.path.join(chrome_dir, "CSS" if kind == "style" else "JS", filename))
+            if dst_file in chosen:
+                self.log_message(f"Skipped {rel_path}: {chosen[dst_file]} is also installed as {filename}", error=True)
+                continue
+            chosen[dst_file] = rel_path
+            os.makedirs(os.path.dirname(dst_file), exist_ok=True)
+            file_type = "styles" if kind == "style" else "scripts"
+            action = self._install_custom_file(src_file, dst_file, use_symlinks, file_type, batch, sync_counts)
+            if action in ("link", "copy", "unchanged"):
+                installed[dst_file] = src_file
+        self.log_sync_counts(sync_counts, "library files")
+
+        manifest = self.load_install_manifest(chrome_dir)
+        prefix = os.path.join(library_path, "")
+        for key, entry in list(manifest.items()):
+            src_file = entry['source']
+            dst_file = os.path.abspath(os.path.join(chrome_dir, *key.split('/')))
+            if not os.path.normcase(src_file).startswith(os.path.normcase(prefix)) or dst_file in chosen:
+                continue
+            # Installed from the library earlier but not chosen anymore
+            del manifest[key]
+            if os.path.islink(dst_file):
+                os.unlink(dst_file)
+            elif os.path.isfile(dst_file):
+                if not (self.installed_copy_unchanged(dst_file, entry) or
+                        (os.path.isfile(src_file) and self._files_identical(src_file, dst_file))):
+                    self.log_message(f"Kept {key}, it was changed in the profile", error=True)
+                    continue
+                os.remove(dst_file)
+            else:
+                continue
+            self.log_message(f"Removed {key}, it is no longer selected in the library")
+        for dst_file, src_file in installed.items():
+            key = self.manifest_key(chrome_dir, dst_file)
+            manifest[key] = self.manifest_entry(src_file, dst_file, manifest.get(key))
+        self.save_install_manifest(chrome_dir, manifest, batch)
+        batch.flush()
+
+    def read_sync_header(self, path):
+        """@version and @id of a script or style as ScriptData reads them, None without a header"""
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._header_cache.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        fields = None
+        if path.endswith(SYNC_HEADER_EXTENSIONS):
+            with open(path, 'rb') as f:
+                content = f.read(SYNC_HEADER_BYTES).decode('utf-8', errors='replace')
+            header_re = STYLE_HEADER_RE if path.endswith(".css") else SCRIPT_HEADER_RE
+            match = header_re.search(content)
+            if match:
+                header_text = match.group(0)
+                version = VERSION_HEADER_RE.search(header_text)
+                script_id = ID_HEADER_RE.search(header_text)
+                author = AUTHOR_HEADER_RE.search(header_text)
+                fields = {
+                    'version': version.group(1) if version else None,
+                    # Same fallback id as ScriptData
+                    'id': (script_id.group(1) if script_id else
+                           f"{os.path.basename(path).split('.uc.js')[0]}@{author.group(1) if author else 'userChromeJS'}"),
+                }
+        self._header_cache[path] = (key, fields)
+        return fields
+
+    def _version_parts(self, version):
+        parts = []
+        for part in version.split('.'):
+            num_a, str_b, num_c, extra = VERSION_PART_RE.match(part).groups()
+            # A missing string sorts after any string, so 1.0b1 < 1.0
+            parts.append((int(num_a or 0), (1, '') if not str_b else (0, str_b),
+                          int(num_c or 0), (1, '') if not extra else (0, extra)))
+        return parts
+
+    def compare_versions(self, a, b):
+        """Compare two version strings like Firefox does, returns -1, 0 or 1"""
+        parts_a, parts_b = self._version_parts(a), self._version_parts(b)
+        zero = self._version_parts("0")[0]
+        for i in range(max(len(parts_a), len(parts_b))):
+            part_a = parts_a[i] if i < len(parts_a) else zero
+            part_b = parts_b[i] if i < len(parts_b) else zero
+            if part_a != part_b:
+                return 1 if part_a > part_b else -1
+        return 0
+
+    def sync_action(self, src_file, dst_file):
+        """Decide what to do with a copied custom file: copy, unchanged, downgrade or conflict"""
+        if not os.path.lexists(dst_file) or os.path.islink(dst_file):
+            return "copy", None
+        src_stat = os.stat(src_file)
+        dst_stat = os.stat(dst_file)
+        # copy2() preserves mtime, so an untouched earlier copy matches exactly
+        if src_stat.st_size == dst_stat.st_size and src_stat.st_mtime_ns == dst_stat.st_mtime_ns:
+            return "unchanged", None
+
+        src_fields = self.read_sync_header(src_file)
+        dst_fields = self.read_sync_header(dst_file)
+        if src_fields and dst_fields and src_fields['version'] and dst_fields['version']:
+            if src_fields['id'] != dst_fields['id']:
+                return "conflict", f"@id is {dst_fields['id']} in the profile but {src_fields['id']} in the source"
+            order = self.compare_versions(src_fields['version'], dst_fields['version'])
+            if order > 0:
+                return "copy", f"{dst_fields['version']} -> {src_fields['version']}"
+            if order < 0:
+                return "downgrade", f"profile has {dst_fields['version']}, source has {src_fields['version']}"
+
+        if self._files_identical(src_file, dst_file):
+            return "unchanged", None
+        # Same or missing @version, the side that was saved last wins
+        if src_stat.st_mtime_ns > dst_stat.st_mtime_ns:
+            return "copy", "source was changed more recently"
+        return "downgrade", "profile copy was changed more recently than the source"
+
+    def _safe_remove_directory(self, directory_path):
+        """Safely remove a directory, handling symlinks properly"""
+        if not os.path.exists(directory_path) and not os.path.islink(directory_path):
+            return
+
+        if os.path.islink(directory_path):
+            # A linked directory: remove the link, never the files it points to
+            os.unlink(directory_path)
+            self.log_message(f"Removed directory symlink: {os.path.basename(directory_path)}")
+            return
+            
+        # Walk through all files and subdirectories
+        for root, dirs, files in os.walk(directory_path, topdown=False):
+            # Remove files (handle symlinks properly)
+            for file in files:
+                file_path = os.path.join(root, file)
+                if os.path.islink(file_path):
+                    # Remove symlink, not the target
+                    os.unlink(file_path)
+                    self.log_message(f"Removed symlink: {file}")
+                else:
+                    # Remove regular file
+                    os.remove(file_path)
+                    self.log_message(f"Removed file: {file}")
+                self.track_progress()
+            
+            # Remove empty directories
+            for dir_name in dirs:
+                dir_path = os.path.join(root, dir_name)
+                if os.path.islink(dir_path):
+                    # Remove directory symlink
+                    os.unlink(dir_path)
+                    self.log_message(f"Removed directory symlink: {dir_name}")
+                else:
+                    try:
+                        os.rmdir(dir_path)
+                        self.log_message(f"Removed directory: {dir_name}")
+                    except OSError:
+                        # Directory not empty, skip
+                        pass
+        
+        # Finally remove the root directory if empty
+        try:
+            os.rmdir(directory_path)
+        except OSError:
+            # Directory not empty, that's okay
+            pass
+
+    def _remove_fx_autoconfig_files(self, chrome_dir):
+        """Remove fx-autoconfig files based on correct assumptions:
+        1. CSS/ and JS/ folders can be completely removed (user-provided files)
+        2. Other files: only remove if they exist in fx-autoconfig repository
+        """
+        if not os.path.exists(chrome_dir):
+            self.log_message("Chrome directory does not exist")
+            return
+        
+        removed_count = 0
+        
+        # 1. Completely remove CSS and JS directories (user-provided files)
+        user_dirs = ['CSS', 'JS']
+        for dir_name in user_dirs:
+            dir_path = os.path.join(chrome_dir, dir_name)
+            if os.path.exists(dir_path):
+                file_count = sum([len(files) for r, d, files in os.walk(dir_path)])
+                self._safe_remove_directory(dir_path)
+                self.log_message(f"Removed {dir_name}/ directory with {file_count} files")
+                removed_count += file_count
+        
+        # 2. Get repository root to check what files fx-autoconfig actually installs
+        repo_root = self.get_repo_root()
+        profile_src = os.path.join(repo_root, "profile", "chrome")
+        
+        if not os.path.exists(profile_src):
+            self.log_message("Warning: Could not find fx-autoconfig profile source for comparison")
+            return
+        
+        # 3. Remove only files that exist in the fx-autoconfig repository
+        for root, dirs, files in os.walk(profile_src):
+            # Calculate relative path from profile/chrome/
+            rel_path = os.path.relpath(root, profile_src)
+            
+            # Skip CSS and JS directories (already handled above)
+            if rel_path.startswith('CSS') or rel_path.startswith('JS'):
+                continue
+            
+            # Determine target directory in user's profile
+            if rel_path == '.':
+                target_dir = chrome_dir
+            else:
+                target_dir = os.path.join(chrome_dir, rel_path)
+            
+            # Remove files that exist in fx-autoconfig repository
+            for file in files:
+                target_file = os.path.join(target_dir, file)
+                if os.path.exists(target_file) or os.path.islink(target_file):
+                    if os.path.islink(target_file):
+                        os.unlink(target_file)
+                        self.log_message(f"Removed fx-autoconfig symlink: {os.path.join(rel_path, file)}")
+                    else:
+                        os.remove(target_file)
+                        self.log_message(f"Removed fx-autoconfig file: {os.path.join(rel_path, file)}")
+                    removed_count += 1
+                self.track_progress()
+        
+        # 4. Remove empty directories that were created by fx-autoconfig
+        # Walk through repository structure to identify fx-autoconfig directories
+        for root, dirs, files in os.walk(profile_src, topdown=False):
+            rel_path = os.path.relpath(root, profile_src)
+            
+            # Skip CSS and JS directories (already removed)
+            if rel_path.startswith('CSS') or rel_path.startswith('JS') or rel_path == '.':
+                continue
+            
+            target_dir = os.path.join(chrome_dir, rel_path)
+            if os.path.exists(target_dir):
+                try:
+                    # Only remove if directory is empty (no user files)
+                    if not os.listdir(target_dir):
+                        os.rmdir(target_dir)
+                        self.log_message(f"Removed empty fx-autoconfig directory: {rel_path}")
+                    else:
+                        remaining = os.listdir(target_dir)
+                        self.log_message(f"Preserved directory {rel_path}/ with {len(remaining)} user files")
+                except OSError:
+                    pass
+        
+        # 5. Check if chrome directory itself can be removed
+        try:
+            if os.path.exists(chrome_dir) and not os.listdir(chrome_dir):
+                os.rmdir(chrome_dir)
+                self.log_message("Removed empty chrome directory")
+            elif os.path.exists(chrome_dir):
+                remaining = os.listdir(chrome_dir)
+                self.log_message(f"Preserved chrome directory with {len(remaining)} user items")
+        except OSError:
+            pass
+        
+        self.log_message(f"Complete uninstall summary: {removed_count} fx-autoconfig files removed")
+
+    def _remove_program_files(self, firefox_path, repo_root):
+        """Remove only program files that exist in the fx-autoconfig repository"""
+        program_src = os.path.join(repo_root, "program")
+        
+        # Walk through the repository program directory to find what files to remove
+        for root, dirs, files in os.walk(program_src):
+            rel_path = os.path.relpath(root, program_src)
+            
+            # Calculate target directory in Firefox installation
+            if rel_path == '.':
+                target_dir = firefox_path
+            else:
+                target_dir = os.path.join(firefox_path, rel_path)
+            
+            # Remove files that exist in the repository
+            for file in files:
+                target_file = os.path.join(target_dir, file)
+                
+                if os.path.exists(target_file):
+                    try:
+                        os.remove(target_file)
+                        self.log_message(f"Removed program file: {os.path.join(rel_path, file) if rel_path != '.' else file}")
+                    except Exception as e:
+                        self.log_message(f"Failed to remove {target_file}: {e}", error=True)
+                self.track_progress()
+        
+        # Clean up empty directories that we created (but don't remove existing directories)
+        # Only remove the specific subdirectories that fx-autoconfig created
+        defaults_pref_dir = os.path.join(firefox_path, "defaults", "pref")
+        defaults_dir = os.path.join(firefox_path, "defaults")
+        
+        # Remove defaults/pref if it's empty and was created by fx-autoconfig
+        if os.path.exists(defaults_pref_dir) and not os.listdir(defaults_pref_dir):
+            try:
+                os.rmdir(defaults_pref_dir)
+                self.log_message("Removed empty defaults/pref directory")
+            except Exception as e:
+                self.log_message(f"Could not remove defaults/pref directory: {e}")
+        
+        # Remove defaults if it's empty and was created by fx-autoconfig
+        if os.path.exists(defaults_dir) and not os.listdir(defaults_dir):
+            try:
+                os.rmdir(defaults_dir)
+                self.log_message("Removed empty defaults directory")
+            except Exception as e:                self.log_message(f"Could not remove defaults directory: {e}")
+
+    def get_startup_cache_path(self, profile_path):
+        """Get the correct startup cache path for the current platform"""
+        if not profile_path:
+            return None
+        
+        system = platform.system()
+        
+        if system == "Windows":
+            # On Windows, startup cache is in Local AppData, not Roaming
+            profile_name = os.path.basename(profile_path)
+            cache_dir = os.path.join(
+                os.environ.get('LOCALAPPDATA', ''),
+                "Mozilla", "Firefox", "Profiles", profile_name, "startupCache"
+            )
+        else:
+            # On macOS and Linux, startup cache is in the profile directory
+            cache_dir = os.path.join(profile_path, "startupCache")
+        
+        return cache_dir
+
+    def read_profile_prefs(self, profile_path, pref_names, filename="prefs.js"):
+        """Read selected user_pref() values from prefs.js line by line"""
+        prefs = {}
+        prefs_file = os.path.join(profile_path, filename)
+        if not os.path.exists(prefs_file):
+            return prefs
+
+        wanted = set(pref_names)
+        # Cheap prefix check before running the regex on every line
+        line_prefix = 'user_pref("' + os.path.commonprefix(list(wanted))
+        with open(prefs_file, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if not line.startswith(line_prefix):
+                    continue
+                match = PREF_LINE_RE.match(line)
+                if match and match.group(1) in wanted:
+                    prefs[match.group(1)] = self.parse_pref_value(match.group(2))
+        return prefs
+
+    def parse_pref_value(self, raw_value):
+        """Convert a prefs.js value literal to a Python value"""
+        try:
+            return json.loads(raw_value)
+        except ValueError:
+            return raw_value
+
+    def read_script_header(self, file_path, is_style):
+        """Read a file up to the end of its ==UserScript== header like the loader does"""
+        content = ""
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            while True:
+                chunk = f.read(4096)
+                if not chunk:
+                    break
+                content += chunk
+                if content.find('// ==/UserScript==') > 0:
+                    break
+        header_re = STYLE_HEADER_RE if is_style else SCRIPT_HEADER_RE
+        match = header_re.search(content)
+        return (match.group(0) if match else ""), len(content.encode('utf-8'))
+
+    def build_include_regex(self, header_text):
+        """Build the document URL regex the same way ScriptData does"""
+        rex = {'include': [], 'exclude': []}
+        for match in re.finditer(r'^// @(include|exclude)\s+(.+)\s*$', header_text, re.MULTILINE):
+            pattern = re.sub(r'^main$', BROWSER_CHROME_URL, match.group(2).strip(), flags=re.IGNORECASE)
+            rex[match.group(1)].append(pattern.replace('*', '.*?'))
+        if not rex['include']:
+            rex['include'].append(BROWSER_CHROME_URL)
+        exclude = f"(?!{'$|'.join(rex['exclude'])}$)" if rex['exclude'] else ''
+        try:
+            return re.compile(f"^{exclude}({'|'.join(rex['include'])})$", re.IGNORECASE)
+        except re.error:
+            return None
+
+    def describe_loader_entry(self, file_path, is_style, disabled_scripts):
+        """Classify one script or style the way ScriptData would see it"""
+        filename = os.path.basename(file_path)
+        size = os.path.getsize(file_path)
+        if size < 24:
+            # Smaller files can't possibly have a valid header
+            header_text, header_bytes = "", size
+        else:
+            header_text, header_bytes = self.read_script_header(file_path, is_style)
+
+        entry = {
+            'filename': filename,
+            'size': size,
+            'enabled': filename not in disabled_scripts,
+            'regex': None,
+        }
+
+        if is_style:
+            stylemode = re.search(r'// @stylemode\s+(.+)\s*$', header_text, re.MULTILINE | re.IGNORECASE)
+            if stylemode and stylemode.group(1).strip() == "agent_sheet":
+                entry['kind'] = "agent sheet"
+            else:
+                entry['kind'] = "author sheet"
+                entry['regex'] = self.build_include_regex(header_text)
+        else:
+            # Bytes on both sides, a header with non-ASCII text is longer in bytes than in characters
+            no_exec = size == 0 if size < 24 else len(header_text.encode('utf-8')) > size - 2
+            if filename.endswith(".sys.mjs") or re.search(r'// @backgroundmodule\b', header_text):
+                # The loader refuses to import legacy non-ESM background modules
+                entry['kind'] = "background module" if filename.endswith(".mjs") else "refused (not ESM)"
+            elif no_exec:
+                entry['kind'] = "no-op (header only)"
+            else:
+                entry['kind'] = "@onlyonce" if re.search(r'// @onlyonce\b', header_text) else "per-window script"
+                entry['regex'] = self.build_include_regex(header_text)
+
+        # Every file gets its header read once at startup, enabled or not
+        header_cost = EST_FILE_OPEN_MS + min(header_bytes, size) / EST_READ_BYTES_PER_MS
+        load_cost = EST_FILE_OPEN_MS + size / EST_READ_BYTES_PER_MS + size / EST_PARSE_BYTES_PER_MS
+        matches_main = bool(entry['regex'] and entry['regex'].match(BROWSER_CHROME_URL))
+
+        entry['startup_ms'] = header_cost
+        entry['first_window_ms'] = 0.0
+        entry['per_window_ms'] = 0.0
+        # The loader caches matches per document URL and skips disabled
+        # files before matching, so a regex is tested once per URL
+        if entry['regex'] and entry['enabled']:
+            entry['first_window_ms'] += EST_MATCH_MS
+        if entry['enabled']:
+            if entry['kind'] in ("background module", "agent sheet"):
+                entry['startup_ms'] += load_cost
+            elif matches_main and entry['kind'] in ("@onlyonce", "author sheet"):
+                entry['first_window_ms'] += load_cost
+            elif matches_main and entry['kind'] == "per-window script":
+                entry['per_window_ms'] += load_cost
+        return entry
+
+    def iter_loader_files(self, profile_path):
+        """Yield (path, is_style) for every file the loader would register"""
+        chrome_dir = os.path.join(profile_path, "chrome")
+        for dir_name, filename_re, is_style in (("JS", SCRIPT_FILENAME_RE, False),
+                                                ("CSS", STYLE_FILENAME_RE, True)):
+            source_dir = os.path.join(chrome_dir, dir_name)
+            if not os.path.isdir(source_dir):
+                continue
+            # The loader only looks at the top level of JS/ and CSS/
+            with os.scandir(source_dir) as it:
+                for dir_entry in it:
+                    if filename_re.match(dir_entry.name) and dir_entry.is_file():
+                        yield dir_entry.path, is_style
+
+    def collect_startup_overhead(self, profile_path):
+        """List everything the loader picks up from a profile and estimate its cost"""
+        prefs = self.read_profile_prefs(profile_path, [PREF_ENABLED, PREF_SCRIPTSDISABLED])
+        disabled_scripts = set(filter(None, str(prefs.get(PREF_SCRIPTSDISABLED, "")).split(",")))
+
+        entries = []
+        for file_path, is_style in self.iter_loader_files(profile_path):
+            try:
+                entries.append(self.describe_loader_entry(file_path, is_style, disabled_scripts))
+            except OSError as e:
+                self.log_message(f"Could not read {os.path.basename(file_path)}: {e}", error=True)
+
+        entries.sort(key=lambda e: (e['per_window_ms'], e['first_window_ms'], e['startup_ms']), reverse=True)
+        return {
+            'enabled': prefs.get(PREF_ENABLED, True) is not False,
+            'entries': entries,
+        }
+
+    def log_startup_overhead_report(self, report):
+        entries = report['entries']
+        self.log_message(f"Startup overhead report: {len(entries)} scripts and styles found")
+        if not report['enabled']:
+            self.log_message(f"{PREF_ENABLED} is false, the loader will not run any of these", error=True)
+
+        self.log_message(f"{'kind':<20} {'state':<8} {'size':>9} {'startup':>9} {'1st win':>9} {'per win':>9}  file")
+        for entry in entries:
+            state = "enabled" if entry['enabled'] else "disabled"
+            self.log_message(f"{entry['kind']:<20} {state:<8} {entry['size']:>9} "
+                             f"{entry['startup_ms']:>7.2f}ms {entry['first_window_ms']:>7.2f}ms "
+                             f"{entry['per_window_ms']:>7.2f}ms  {entry['filename']}")
+
+        total_size = sum(e['size'] for e in entries)
+        startup = sum(e['startup_ms'] for e in entries)
+        first_window = sum(e['first_window_ms'] for e in entries)
+        per_window = sum(e['per_window_ms'] for e in entries)
+        self.log_message(f"Total {total_size} bytes, estimated {startup:.2f}ms at startup, "
+                         f"{first_window + per_window:.2f}ms on the first browser window, "
+                         f"{per_window:.2f}ms on every later browser window")
+
+    def get_profile_lock_owner(self, profile_path):
+        """Return a description of the process holding the profile lock, or None"""
+        if platform.system() == "Windows":
+            lock_file = os.path.join(profile_path, "parent.lock")
+            if not os.path.exists(lock_file):
+                return None
+            try:
+                # Firefox keeps parent.lock open without sharing while running
+                with open(lock_file, 'r+b'):
+                    pass
+            except PermissionError:
+                return "Firefox (parent.lock is in use)"
+            except OSError:
+                pass
+            return None
+
+        # Linux and macOS: "lock" symlink pointing to "address:+pid" plus an
+        # fcntl lock on .parentlock
+        lock_link = os.path.join(profile_path, "lock")
+        if os.path.islink(lock_link):
+            target = os.readlink(lock_link)
+            pid = target.rpartition('+')[2]
+            if pid.isdigit():
+                try:
+                    os.kill(int(pid), 0)
+                    return f"Firefox process {pid} ({target})"
+                except PermissionError:
+                    return f"Firefox process {pid} ({target})"
+                except OSError:
+                    pass  # Stale lock left behind by a crash
+
+        parent_lock = os.path.join(profile_path, ".parentlock")
+        if os.path.exists(parent_lock):
+            import fcntl
+            try:
+                with open(parent_lock, 'r+b') as f:
+                    fcntl.lockf(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    fcntl.lockf(f, fcntl.LOCK_UN)
+            except OSError:
+                return "Firefox (.parentlock is locked)"
+        return None
+
+    def format_pref_line(self, name, value):
+        if isinstance(value, bool):
+            literal = "true" if value else "false"
+        elif isinstance(value, int):
+            literal = str(value)
+        else:
+            literal = json.dumps(str(value), ensure_ascii=False)
+        return f'user_pref({json.dumps(name)}, {literal});'
+
+    def write_profile_prefs(self, profile_path, updates, filename="prefs.js", batch=None):
+        """Stream prefs.js or user.js into a temp file with updated values, then swap it in"""
+        target = os.path.join(profile_path, filename)
+        exists = os.path.exists(target)
+
+        def write(raw):
+            out = io.TextIOWrapper(raw, encoding='utf-8', errors='surrogateescape', newline='')
+            written = set()
+            newline = '\n'
+            line = ''
+            if exists:
+                with open(target, 'r', encoding='utf-8', errors='surrogateescape', newline='') as f:
+                    for line in f:
+                        match = PREF_LINE_RE.match(line) if line.startswith('user_pref(') else None
+                        if not match or match.group(1) not in updates:
+                            out.write(line)
+                            continue
+                        name = match.group(1)
+                        # Duplicate lines would win over ours, drop them
+                        if name not in written:
+                            newline = '\r\n' if line.endswith('\r\n') else '\n'
+                            out.write(self.format_pref_line(name, updates[name]) + newline)
+                            written.add(name)
+                    if line and not line.endswith('\n'):
+                        out.write(newline)
+            for name, value in updates.items():
+                if name not in written:
+                    out.write(self.format_pref_line(name, value) + newline)
+            out.flush()
+            out.detach()
+
+        # prefs.js and user.js are critical files, any batch writes them strictly
+        (batch or SyncBatch()).atomic_write(
+            target, write, finish=lambda tmp_path: shutil.copymode(target, tmp_path) if exists else None)
+
+    def toggle_disabled_scripts(self, current_value, enable, disable):
+        """Apply enable/disable sets to a userChromeJS.scriptsDisabled value"""
+        disabled = [name for name in str(current_value).split(",") if name and name not in enable]
+        for name in disable:
+            if name not in disabled:
+                disabled.append(name)
+        return ",".join(disabled)
+
+    def apply_script_toggles(self, profiles, enable, disable, loader_enabled=None, use_user_js=False):
+        """Apply the same script toggle set to several profiles"""
+        pref_names = [PREF_ENABLED, PREF_SCRIPTSDISABLED]
+        target_file = "user.js" if use_user_js else "prefs.js"
+        changed = 0
+        for profile in profiles:
+            profile_name = os.path.basename(profile)
+            owner = self.get_profile_lock_owner(profile)
+            if owner:
+                self.log_message(f"Skipped {profile_name}: profile is in use by {owner}", error=True)
+                continue
+            try:
+                # user.js overrides prefs.js on startup, so it decides the effective value
+                prefs = self.read_profile_prefs(profile, pref_names)
+                user_prefs = self.read_profile_prefs(profile, pref_names, "user.js")
+                prefs.update(user_prefs)
+
+                updates = {}
+                current = prefs.get(PREF_SCRIPTSDISABLED, "")
+                new_value = self.toggle_disabled_scripts(current, enable, disable)
+                if new_value != current:
+                    updates[PREF_SCRIPTSDISABLED] = new_value
+                if loader_enabled is not None and prefs.get(PREF_ENABLED, True) != loader_enabled:
+                    updates[PREF_ENABLED] = loader_enabled
+
+                if not updates:
+                    self.log_message(f"{profile_name}: already up to date")
+                    continue
+                self.write_profile_prefs(profile, updates, target_file)
+                changed += 1
+                self.log_message(f"{profile_name}: updated {', '.join(updates)} in {target_file}")
+                if not use_user_js and set(updates) & set(user_prefs):
+                    self.log_message(f"{profile_name}: user.js sets the same prefs and will override prefs.js", error=True)
+            except Exception as e:
+                self.log_message(f"Failed to update {profile_name}: {e}", error=True)
+
+        self.log_message(f"Script toggles applied to {changed} of {len(profiles)} profiles, changes apply on next Firefox start")
+
+    def hash_file(self, path):
+        """SHA-256 of a file, memory-mapping large files and streaming small ones"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size >= MMAP_HASH_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    digest.update(mapped)
+            else:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    def collect_verify_targets(self, repo_root, settings):
+        """List (label, source, target) pairs for program files, chrome/utils and copied custom files"""
+        firefox_path = self.get_program_target_path(settings['firefox_path'])
+        chrome_dir = os.path.join(settings['profile_path'], "chrome")
+        utils_dir = os.path.join(chrome_dir, "utils")
+
+        pairs = []
+        extras = []
+        for src_dir, dst_dir, check_extras in ((os.path.join(repo_root, "program"), firefox_path, False),
+                                               (os.path.join(repo_root, "profile", "chrome", "utils"), utils_dir, True)):
+            expected = set()
+            for root, dirs, files in os.walk(src_dir):
+                rel_root = os.path.relpath(root, src_dir)
+                for file in files:
+                    rel_path = os.path.normpath(os.path.join(rel_root, file))
+                    expected.add(rel_path)
+                    pairs.append((rel_path, os.path.join(root, file), os.path.join(dst_dir, rel_path)))
+            # Only chrome/utils is owned by fx-autoconfig, the Firefox
+            # directory is full of files we don't know about
+            if check_extras and os.path.isdir(dst_dir):
+                for root, dirs, files in os.walk(dst_dir):
+                    rel_root = os.path.relpath(root, dst_dir)
+                    if rel_root == '.':
+                        # Generated by the installer, checked against bundles.json below
+                        dirs[:] = [d for d in dirs if d != BUNDLE_DIR[-1]]
+                    for file in files:
+                        rel_path = os.path.normpath(os.path.join(rel_root, file))
+                        if rel_path not in expected:
+                            extras.append(os.path.join(root, file))
+                extras.extend(self.find_stale_bundle_files(chrome_dir))
+
+        # Copied custom files are compared with their source as well. JS/ and
+        # CSS/ also hold files from other places, so they have no extras.
+        if not settings.get('use_symlinks'):
+            for custom_path, dir_name in ((settings.get('custom_js_path'), "JS"),
+                                          (settings.get('custom_css_path'), "CSS")):
+                if not custom_path or not os.path.isdir(custom_path):
+                    continue
+                for root, dirs, files in IgnoreRules().walk(custom_path):
+                    rel_root = os.path.relpath(root, custom_path)
+                    for file in files:
+                        rel_path = os.path.normpath(os.path.join(dir_name, rel_root, file))
+                        pairs.append((rel_path, os.path.join(root, file), os.path.join(chrome_dir, rel_path)))
+        return pairs, extras
+
+    def find_stale_bundle_files(self, chrome_dir):
+        """Files in the bundle directory that bundles.json doesn't list"""
+        bundle_dir = os.path.join(chrome_dir, *BUNDLE_DIR)
+        if not os.path.isdir(bundle_dir):
+            return []
+        try:
+            with open(os.path.join(bundle_dir, BUNDLE_MANIFEST), 'r', encoding='utf-8') as f:
+                keep = {bundle['file'] for bundle in json.load(f)['bundles']} | {BUNDLE_MANIFEST}
+        except (OSError, ValueError, KeyError, TypeError):
+            # The loader can't use any bundle without a readable manifest
+            keep = set()
+        stale = []
+        for root, dirs, files in os.walk(bundle_dir):
+            for file in files:
+                path = os.path.join(root, file)
+                if os.path.relpath(path, bundle_dir) not in keep:
+                    stale.append(path)
+        return stale
+
+    def compare_file_pair(self, src_file, dst_file):
+        """Return 'ok', 'missing' or 'mismatch' for one installed file"""
+        if not os.path.isfile(dst_file):
+            return 'missing'
+        if os.path.getsize(src_file) != os.path.getsize(dst_file):
+            return 'mismatch'
+        return 'ok' if self.hash_file(src_file) == self.hash_file(dst_file) else 'mismatch'
+
+    def run_verification(self, repo_root, settings):
+        """Hash source and installed files in parallel and sort them by result"""
+        pairs, extras = self.collect_verify_targets(repo_root, settings)
+        results = {'ok': [], 'missing': [], 'mismatch': [], 'error': [], 'extra': extras}
+        with ThreadPoolExecutor() as executor:
+            futures = [(pair, executor.submit(self.compare_file_pair, pair[1], pair[2])) for pair in pairs]
+            for pair, future in futures:
+                try:
+                    results[future.result()].append(pair)
+                except OSError as e:
+                    results['error'].append(pair)
+                    self.log_message(f"Could not verify {pair[0]}: {e}", error=True)
+        return results
+
+    def find_chrome_garbage(self, chrome_dir, modified=None):
+        """List (path, reason) pairs the cleanup would remove, children before parents. Copies of
+        removed sources that were edited since they were installed are added to modified instead."""
+        manifest = self.load_install_manifest(chrome_dir)
+        modified = [] if modified is None else modified
+        garbage = []
+        for name in CLEANUP_DIRS:
+            top = os.path.join(chrome_dir, name)
+            if os.path.islink(top):
+                # Whole directory linked to a custom directory
+                if not os.path.exists(top):
+                    garbage.append((top, "dangling link"))
+                continue
+            if os.path.isdir(top):
+                self._sweep_chrome_directory(top, chrome_dir, manifest, garbage, modified)
+        return garbage
+
+    def _sweep_chrome_directory(self, path, chrome_dir, manifest, garbage, modified):
+        """One scandir pass over path, returns True if anything in it survives the cleanup"""
+        survives = False
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_symlink():
+                    # Followed by stat, so a link to a removed file or directory fails here
+                    if os.path.exists(entry.path):
+                        survives = True
+                    else:
+                        garbage.append((entry.path, "dangling link"))
+                elif entry.is_dir():
+                    if self._sweep_chrome_directory(entry.path, chrome_dir, manifest, garbage, modified):
+                        survives = True
+                    else:
+                        garbage.append((entry.path, "empty directory"))
+                else:
+                    record = manifest.get(self.manifest_key(chrome_dir, entry.path))
+                    if record and not os.path.exists(record['source']):
+                        if self.installed_copy_unchanged(entry.path, record):
+                            garbage.append((entry.path, f"source removed: {record['source']}"))
+                            continue
+                        # Possibly the only copy of the user's edits, never removed in bulk
+                        modified.append((entry.path, f"changed since install, source removed: {record['source']}"))
+                    survives = True
+        return survives
+
+    def remove_chrome_garbage(self, chrome_dir, garbage):
+        """Delete what find_chrome_garbage reported, returns the number of removed entries"""
+        removed = 0
+        manifest = self.load_install_manifest(chrome_dir)
+        for path, reason in garbage:
+            try:
+                if reason == "empty directory":
+                    os.rmdir(path)
+                    removed += 1
+                    continue
+                record = manifest.get(self.manifest_key(chrome_dir, path))
+                if (record and os.path.isfile(path) and not os.path.islink(path) and
+                        not self.installed_copy_unchanged(path, record)):
+                    # Edited after the sweep listed it
+                    self.log_message(f"Kept {path}, it was changed since it was installed", error=True)
+                    continue
+                os.unlink(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                # A directory stays if something new appeared in it since the sweep
+                self.log_message(f"Could not remove {path}: {e}", error=True)
+        kept = {key: entry for key, entry in manifest.items()
+                if os.path.lexists(os.path.join(chrome_dir, *key.split('/')))}
+        if kept != manifest:
+            batch = SyncBatch()
+            self.save_install_manifest(chrome_dir, kept, batch)
+            batch.flush()
+        return removed
+
+    def read_profile_prefs_matching(self, profile_path, prefixes, filename="prefs.js"):
+        """Read every user_pref() whose name starts with one of prefixes"""
+        prefs = {}
+        prefs_file = os.path.join(profile_path, filename)
+        if not os.path.exists(prefs_file):
+            return prefs
+        line_prefixes = tuple('user_pref("' + prefix for prefix in prefixes)
+        with open(prefs_file, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if not line.startswith(line_prefixes):
+                    continue
+                match = PREF_LINE_RE.match(line)
+                if match:
+                    prefs[match.group(1)] = self.parse_pref_value(match.group(2))
+        return prefs
+
+    def get_archive_write_mode(self, archive_path):
+        return "w|xz" if archive_path.endswith((".tar.xz", ".txz")) else "w|gz"
+
+    def _add_file_member(self, tar, path, arcname):
+        """Stream one regular file into the archive, tagged with its SHA-256"""
+        real_path = os.path.realpath(path)
+        info = tar.gettarinfo(real_path, arcname)
+        info.pax_headers = {EXPORT_HASH_HEADER: self.hash_file(real_path)}
+        with open(real_path, 'rb') as f:
+            tar.addfile(info, f)
+        self.track_progress(info.size)
+
+    def _add_link_member(self, tar, path, rel_path):
+        """Store a symlink as a link plus the content it currently points at"""
+        tar.addfile(tar.gettarinfo(path, "chrome/" + rel_path))
+        target = os.path.realpath(path)
+        linked_name = EXPORT_LINKED_PREFIX + rel_path
+        if os.path.isfile(target):
+            self._add_file_member(tar, target, linked_name)
+        elif os.path.isdir(target):
+            ignore_rules = IgnoreRules()
+            for root, dirs, files in ignore_rules.walk(target):
+                rel_root = os.path.relpath(root, target)
+                for name in files:
+                    file_path = os.path.join(root, name)
+                    if not os.path.isfile(file_path):
+                        continue
+                    arc_rel = name if rel_root == '.' else os.path.join(rel_root, name)
+                    self._add_file_member(tar, file_path, linked_name + "/" + arc_rel.replace(os.sep, '/'))
+        self.track_progress()
+
+    def export_chrome_setup(self, profile_path, archive_path):
+        """Write chrome/ and the loader prefs of a profile to a compressed tar stream"""
+        chrome_dir = os.path.join(profile_path, "chrome")
+        metadata = {
+            'format': EXPORT_FORMAT,
+            'installer_version': VERSION,
+            'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'profile': os.path.basename(os.path.normpath(profile_path)),
+            'prefs': self.read_profile_prefs_matching(profile_path, EXPORT_PREF_PREFIXES),
+        }
+        metadata_bytes = json.dumps(metadata, indent=2).encode('utf-8')
+
+        part_path = archive_path + ".part"
+        try:
+            with tarfile.open(part_path, self.get_archive_write_mode(archive_path),
+                              format=tarfile.PAX_FORMAT) as tar:
+                info = tarfile.TarInfo(EXPORT_METADATA_NAME)
+                info.size = len(metadata_bytes)
+                info.mtime = int(time.time())
+                tar.addfile(info, io.BytesIO(metadata_bytes))
+
+                ignore_rules = IgnoreRules()
+                for root, dirs, files in ignore_rules.walk(chrome_dir):
+                    rel_root = os.path.relpath(root, chrome_dir)
+                    rel_root = "" if rel_root == '.' else rel_root.replace(os.sep, '/') + "/"
+                    for name in list(dirs):
+                        dir_path = os.path.join(root, name)
+                        if os.path.islink(dir_path):
+                            self._add_link_member(tar, dir_path, rel_root + name)
+                    for name in files:
+                        file_path = os.path.join(root, name)
+                        rel_path = rel_root + name
+                        # Source paths in the install manifest only exist on this machine
+                        if rel_path == INSTALL_MANIFEST:
+                            continue
+                        if os.path.islink(file_path):
+                            self._add_link_member(tar, file_path, rel_path)
+                        elif os.path.isfile(file_path):
+                            self._add_file_member(tar, file_path, "chrome/" + rel_path)
+            os.replace(part_path, archive_path)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+        return metadata
+
+    def _archive_rel_parts(self, rel_path):
+        """Split an archive path below chrome/ or linked/, None if it could escape the profile"""
+        parts = rel_path.split('/')
+        if not rel_path or rel_path.startswith('/') or any(part in ('', '.', '..') for part in parts):
+            return None
+        if platform.system() == "Windows" and any(':' in part or '\\' in part for part in parts):
+            return None
+        return parts
+
+    def _import_file_member(self, tar, member, dst_path, stats, batch):
+        """Write one archived file unless an identical copy is already in place"""
+        expected = member.pax_headers.get(EXPORT_HASH_HEADER)
+        if (expected and os.path.isfile(dst_path) and not os.path.islink(dst_path)
+                and os.path.getsize(dst_path) == member.size and self.hash_file(dst_path) == expected):
+            # The stream skips over the member data without reading it into memory
+            stats['identical'] += 1
+            return
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        if os.path.islink(dst_path):
+            os.unlink(dst_path)
+
+        def set_metadata(tmp_path):
+            os.chmod(tmp_path, member.mode & 0o777 or 0o644)
+            os.utime(tmp_path, (member.mtime, member.mtime))
+
+        batch.atomic_write(dst_path, lambda out: shutil.copyfileobj(tar.extractfile(member), out, HASH_CHUNK_SIZE),
+                           finish=set_metadata)
+        stats['written'] += 1
+
+    def _import_link_member(self, member, dst_path, rel_path, can_link, stats):
+        """Recreate a symlink, True if its linked/ copy is not needed"""
+        target = member.linkname
+        if not os.path.isabs(target):
+            target = os.path.join(os.path.dirname(dst_path), target)
+        if not can_link:
+            self.log_message(f"Restoring a copy of {rel_path}, symlinks are not supported here")
+            return False
+        if not os.path.exists(target):
+            self.log_message(f"Restoring a copy of {rel_path}, link target {member.linkname} is not available")
+            return False
+        if os.path.islink(dst_path) and os.readlink(dst_path) == member.linkname:
+            stats['identical'] += 1
+            return True
+        if not self._can_replace_with_link(dst_path):
+            kind = "directory" if os.path.isdir(dst_path) else "regular file"
+            self.log_message(f"Kept the existing {kind} {rel_path} instead of restoring its link", error=True)
+            stats['skipped'] += 1
+            return True
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        self._replace_with_link(member.linkname, dst_path, os.path.isdir(target))
+        stats['links'] += 1
+        return True
+
+    def import_chrome_setup(self, profile_path, archive_path, durability=DURABILITY_BATCHED):
+        """Restore an exported setup into a profile, returns counts of what was done"""
+        batch = SyncBatch(durability)
+        chrome_dir = os.path.join(profile_path, "chrome")
+        os.makedirs(chrome_dir, exist_ok=True)
+        real_chrome_dir = os.path.realpath(chrome_dir)
+        can_link = self.can_create_symlinks()
+        stats = {'written': 0, 'identical': 0, 'links': 0, 'copied_links': 0, 'skipped': 0}
+        metadata = None
+        restored_links = set()
+
+        try:
+            with open(archive_path, 'rb') as raw:
+                read_pos = 0
+                with tarfile.open(fileobj=raw, mode="r|*") as tar:
+                    for member in tar:
+                        # Progress follows the compressed bytes consumed so far. Once the
+                        # first chrome/utils/ file is written the rest of them must follow.
+                        self.track_progress(raw.tell() - read_pos,
+                                            cancellable=not member.name.startswith("chrome/utils/"))
+                        read_pos = raw.tell()
+
+                        if member.name == EXPORT_METADATA_NAME:
+                            metadata = json.load(tar.extractfile(member))
+                            if metadata.get('format', 0) > EXPORT_FORMAT:
+                                raise ValueError("Archive was written by a newer installer")
+                            continue
+                        if member.name.startswith("chrome/"):
+                            parts = self._archive_rel_parts(member.name[len("chrome/"):])
+                            from_link = False
+                        elif member.name.startswith(EXPORT_LINKED_PREFIX):
+                            parts = self._archive_rel_parts(member.name[len(EXPORT_LINKED_PREFIX):])
+                            from_link = True
+                        else:
+                            parts = None
+                        if metadata is None:
+                            raise ValueError("Not an fx-autoconfig setup archive")
+                        if parts is None or not (member.isfile() or member.issym()):
+                            if not member.isdir():
+                                stats['skipped'] += 1
+                            continue
+                        # A restored link, or one kept out by existing files, needs none of its copied content
+                        if from_link and any('/'.join(parts[:i]) in restored_links
+                                             for i in range(1, len(parts) + 1)):
+                            continue
+
+                        dst_path = os.path.join(chrome_dir, *parts)
+                        # Never write through a symlinked directory, it would land outside chrome/
+                        real_parent = os.path.realpath(os.path.dirname(dst_path))
+                        if os.path.commonpath([real_parent, real_chrome_dir]) != real_chrome_dir:
+                            self.log_message(f"Skipped {member.name}: parent directory is a link", error=True)
+                            stats['skipped'] += 1
+                            continue
+
+                        if member.issym():
+                            if self._import_link_member(member, dst_path, '/'.join(parts), can_link, stats):
+                                restored_links.add('/'.join(parts))
+                            continue
+                        self._import_file_member(tar, member, dst_path, stats, batch)
+                        if from_link:
+                            stats['copied_links'] += 1
+        finally:
+            # Files written before a cancel or error are synced too
+            batch.flush()
+
+        if metadata is None:
+            raise ValueError("Not an fx-autoconfig setup archive")
+        prefs = metadata.get('prefs') or {}
+        current = self.read_profile_prefs(profile_path, list(prefs)) if prefs else {}
+        changed = {name: value for name, value in prefs.items() if current.get(name) != value}
+        if changed:
+            owner = self.get_profile_lock_owner(profile_path)
+            if owner:
+                self.log_message(f"Prefs not restored, profile is in use by {owner}", error=True)
+            else:
+                self.write_profile_prefs(profile_path, changed, batch=batch)
+        stats['prefs'] = len(changed)
+        return stats
+
+    def benchmark_durability(self, directory, file_count=200, file_size=32 * 1024):
+        """Time copying file_count files into directory at each durability level"""
+        results = {}
+        work_dir = tempfile.mkdtemp(prefix="fx-autoconfig-bench-", dir=directory)
+        try:
+            src_dir = os.path.join(work_dir, "src")
+            os.makedirs(src_dir)
+            for i in range(file_count):
+                with open(os.path.join(src_dir, f"file{i:04d}.uc.js"), 'wb') as f:
+                    f.write(os.urandom(file_size))
+            for level in DURABILITY_LEVELS:
+                dst_dir = os.path.join(work_dir, level)
+                os.makedirs(dst_dir)
+                batch = SyncBatch(level)
+                start = time.perf_counter()
+                for name in os.listdir(src_dir):
+                    batch.copy(os.path.join(src_dir, name), os.path.join(dst_dir, name))
+                batch.flush()
+                results[level] = time.perf_counter() - start
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        return results
+
+    def reflink_file(self, src, dst):
+        """Copy-on-write clone of a file, False if the filesystem can't do it"""
+        system = platform.system()
+        try:
+            if system == "Linux":
+                import fcntl
+                with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                    fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+                shutil.copystat(src, dst)
+                return True
+            if system == "Darwin":
+                import ctypes
+                libc = ctypes.CDLL("libc.dylib", use_errno=True)
+                return libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+        except (OSError, AttributeError):
+            if os.path.exists(dst):
+                os.remove(dst)
+        return False
+
+    def clone_file(self, src, dst, allow_hardlink, stats):
+        """Reflink, hardlink or copy one file, cheapest first"""
+        if os.path.lexists(dst):
+            os.remove(dst)
+        if stats.get('reflink', True) is not False and self.reflink_file(src, dst):
+            stats['reflinked'] = stats.get('reflinked', 0) + 1
+            return
+        # Don't retry reflinks for every file once the filesystem said no
+        stats['reflink'] = False
+        if allow_hardlink:
+            try:
+                os.link(src, dst)
+                stats['hardlinked'] = stats.get('hardlinked', 0) + 1
+                return
+            except OSError:
+                pass
+        shutil.copy2(src, dst)
+        stats['copied'] = stats.get('copied', 0) + 1
+
+    def clone_tree(self, src_dir, dst_dir, allow_hardlink, stats):
+        for root, dirs, files in os.walk(src_dir):
+            target_dir = os.path.normpath(os.path.join(dst_dir, os.path.relpath(root, src_dir)))
+            os.makedirs(target_dir, exist_ok=True)
+            for file in files:
+                self.clone_file(os.path.join(root, file), os.path.join(target_dir, file), allow_hardlink, stats)
+
+    def clone_test_profile(self, repo_root, template_chrome, profile_dir, stats):
+        """Create one profile from a test template plus the current profile/chrome/utils"""
+        clone_chrome = os.path.join(profile_dir, "chrome")
+        with os.scandir(template_chrome) as it:
+            for entry in it:
+                dst = os.path.join(clone_chrome, entry.name)
+                if entry.is_dir():
+                    self.clone_tree(entry.path, dst, entry.name in TEST_PROFILE_LINKABLE_DIRS, stats)
+                else:
+                    os.makedirs(clone_chrome, exist_ok=True)
+                    self.clone_file(entry.path, dst, False, stats)
+
+        # The template manifest points back into the repository with relative
+        # paths, bring those directories into the clone and point at them instead
+        utils_dir = os.path.join(clone_chrome, "utils")
+        repo_chrome = os.path.join(repo_root, "profile", "chrome")
+        lines = []
+        with open(os.path.join(template_chrome, "utils", "chrome.manifest"), 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 3:
+                    target = os.path.normpath(os.path.join(template_chrome, "utils", parts[-1]))
+                    if not target.startswith(template_chrome + os.sep) and target.startswith(repo_chrome + os.sep):
+                        local_dir = os.path.join(clone_chrome, os.path.relpath(target, repo_chrome))
+                        self.clone_tree(target, local_dir, True, stats)
+                        parts[-1] = os.path.relpath(local_dir, utils_dir).replace(os.sep, "/") + "/"
+                lines.append(" ".join(parts))
+
+        # Replace the directory entry rather than writing through a hardlink into the repository
+        SyncBatch(DURABILITY_NONE).atomic_write(os.path.join(utils_dir, "chrome.manifest"),
+                                                ("\n".join(lines) + "\n").encode('utf-8'))
+
+    def create_test_profiles(self, template_name, count):
+        """Create count throwaway profiles in a fresh temp directory, returns the profile paths"""
+        repo_root = self.get_repo_root()
+        template_dir = TEST_PROFILE_TEMPLATES[template_name]
+        template_chrome = os.path.realpath(os.path.join(repo_root, template_dir, "chrome"))
+        if not os.path.isdir(template_chrome):
+            raise FileNotFoundError(f"Test profile template not found: {template_chrome}")
+
+        root = tempfile.mkdtemp(prefix=TEST_PROFILE_PREFIX)
+        open(os.path.join(root, TEST_PROFILE_MARKER), 'w').close()
+        stats = {}
+        profiles = []
+        for index in range(1, count + 1):
+            profile_dir = os.path.join(root, f"{template_dir}-{index}")
+            self.clone_test_profile(repo_root, template_chrome, profile_dir, stats)
+            profiles.append(profile_dir)
+            self.track_progress()
+        self.log_message(f"Created {count} {template_name} test profiles in {root} "
+                         f"({stats.get('reflinked', 0)} files reflinked, {stats.get('hardlinked', 0)} hardlinked, "
+                         f"{stats.get('copied', 0)} copied)")
+        return profiles
+
+    def find_test_profile_roots(self):
+        roots = []
+        temp_dir = tempfile.gettempdir()
+        with os.scandir(temp_dir) as it:
+            for entry in it:
+                if (entry.name.startswith(TEST_PROFILE_PREFIX) and entry.is_dir(follow_symlinks=False)
+                        and os.path.exists(os.path.join(entry.path, TEST_PROFILE_MARKER))):
+                    roots.append(entry.path)
+        return roots
+
+    def is_admin(self):
+        """Check if the current process has admin privileges on Windows"""
+        if platform.system() != "Windows":
+            return True  # Non-Windows systems don't need UAC elevation
+        
+        try:
+            import ctypes
+            return ctypes.windll.shell32.IsUserAnAdmin()
+        except:
+            return False
+
+    def needs_elevation(self, firefox_path):
+        """Check if the Firefox installation path requires admin privileges"""
+        if platform.system() != "Windows":
+            return False
+        
+        # Common paths that typically require elevation
+        program_files_paths = [
+            "C:\\Program Files\\",
+            "C:\\Program Files (x86)\\",
+            os.environ.get('PROGRAMFILES', '').lower(),
+            os.environ.get('PROGRAMFILES(X86)', '').lower()        ]
+        
+        firefox_path_lower = firefox_path.lower()
+        return any(firefox_path_lower.startswith(path.lower()) for path in program_files_paths if path)
@@ -0,0 +1,103 @@
+"""gitignore-style .ucignore rules for custom directories"""
+
+import os
+import re
+
+# gitignore-style ignore file read from custom script/style directories
+IGNORE_FILENAME = ".ucignore"
+DEFAULT_IGNORE_PATTERNS = [
+    ".git/", ".hg/", ".svn/", "node_modules/", "__pycache__/", ".idea/", ".vscode/",
+    ".DS_Store", "Thumbs.db", "desktop.ini",
+    "*~", "*.swp", "*.swo", "*.tmp", ".#*", "#*#",
+    IGNORE_FILENAME,
+]
+
+
+class IgnoreRules:
+    """gitignore-style rules from .ucignore files plus built-in defaults, the last matching rule wins"""
+    def __init__(self, patterns=DEFAULT_IGNORE_PATTERNS):
+        self.rules = []
+        self.skipped = 0
+        self.add_patterns(patterns, "")
+
+    def add_patterns(self, lines, base):
+        for line in lines:
+            line = line.rstrip("\r\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            line = line.rstrip()
+            negate = line.startswith("!")
+            if negate or line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            regex = self._translate(line.lstrip("/"))
+            prefix = re.escape(base + "/") if base else ""
+            if not anchored:
+                prefix += "(?:.*/)?"
+            flags = re.IGNORECASE if os.name == "nt" else 0
+            self.rules.append((re.compile(f"^{prefix}{regex}$", flags), negate, dir_only))
+
+    def _translate(self, pattern):
+        regex = ""
+        i = 0
+        while i < len(pattern):
+            c = pattern[i]
+            if pattern.startswith("**/", i):
+                regex += "(?:.*/)?"
+                i += 3
+                continue
+            if pattern.startswith("**", i):
+                regex += ".*"
+                i += 2
+                continue
+            if c == "*":
+                regex += "[^/]*"
+            elif c == "?":
+                regex += "[^/]"
+            elif c == "[" and "]" in pattern[i + 1:]:
+                end = pattern.index("]", i + 1)
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                regex += f"[{body}]"
+                i = end
+            else:
+                regex += re.escape(c)
+            i += 1
+        return regex
+
+    def load_file(self, path, base):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            self.add_patterns(f, base)
+
+    def is_ignored(self, rel_path, is_dir):
+        rel_path = rel_path.replace(os.sep, "/")
+        ignored = False
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                ignored = not negate
+        return ignored
+
+    def walk(self, top, rel_base=""):
+        """os.walk() that prunes ignored directories instead of descending into them"""
+        for root, dirs, files in os.walk(top):
+            rel_root = os.path.normpath(os.path.join(rel_base, os.path.relpath(root, top)))
+            rel_root = "" if rel_root == "." else rel_root.replace(os.sep, "/")
+            if IGNORE_FILENAME in files:
+                self.load_file(os.path.join(root, IGNORE_FILENAME), rel_root)
+            # Pruning dirs in place stops os.walk from ever listing them
+            dirs[:] = [d for d in dirs if self._keep(rel_root, d, True)]
+            files[:] = [f for f in files if self._keep(rel_root, f, False)]
+            yield root, dirs, files
+
+    def _keep(self, rel_root, name, is_dir):
+        if self.is_ignored(f"{rel_root}/{name}" if rel_root else name, is_dir):
+            self.skipped += 1
+            return False
+        return True
@@ -0,0 +1,189 @@
+"""Installer jobs: progress, cancellation and per-target ordering"""
+
+import contextlib
+import os
+import threading
+import time
+
+
+class OperationCancelled(Exception):
+    """Raised at the next safe stopping point when the user cancels a running operation"""
+
+
+class OperationProgress:
+    """File and byte counters shared between a worker thread and the UI"""
+    def __init__(self, name):
+        self.name = name
+        self.total_files = 0
+        self.total_bytes = 0
+        self.files_done = 0
+        self.bytes_done = 0
+        self.start_time = time.monotonic()
+        self.cancel_event = threading.Event()
+        self.cancel_deferred = 0
+
+    def set_totals(self, total_files, total_bytes):
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.start_time = time.monotonic()
+
+    def advance(self, nbytes=0):
+        self.files_done += 1
+        self.bytes_done += nbytes
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set() and not self.cancel_deferred:
+            raise OperationCancelled()
+
+    @contextlib.contextmanager
+    def defer_cancel(self):
+        """Hold back cancellation until the block is done, for files that only work together"""
+        self.cancel_deferred += 1
+        try:
+            yield
+        finally:
+            self.cancel_deferred -= 1
+        self.check_cancelled()
+
+    def fraction(self):
+        # Bytes are the better measure for copies, deletions only have file counts
+        if self.total_bytes:
+            return min(self.bytes_done / self.total_bytes, 1.0)
+        if self.total_files:
+            return min(self.files_done / self.total_files, 1.0)
+        return 0.0
+
+    def describe(self):
+        elapsed = max(time.monotonic() - self.start_time, 1e-6)
+        # Imports only know the archive size up front, not the file count
+        total = f"/{self.total_files}" if self.total_files else ""
+        text = f"{self.name}: {self.files_done}{total} files"
+        if self.total_bytes:
+            rate = self.bytes_done / elapsed / (1024 * 1024)
+            text += (f", {self.bytes_done / (1024 * 1024):.1f}/{self.total_bytes / (1024 * 1024):.1f} MB"
+                     f", {rate:.1f} MB/s")
+        fraction = self.fraction()
+        if 0 < fraction < 1:
+            text += f", ETA {elapsed * (1 - fraction) / fraction:.0f}s"
+        return text
+
+
+class Job:
+    """One queued installer operation and the paths it writes to"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, name, targets, func, progress=None):
+        self.name = name
+        self.targets = frozenset(targets)
+        self.func = func
+        self.progress = progress
+        self.state = Job.QUEUED
+        self.error = None
+        self.finished = threading.Event()
+
+    def wait(self, timeout=None):
+        """Block until the job has ended, returns False on timeout"""
+        return self.finished.wait(timeout)
+
+
+class JobExecutor:
+    """Run jobs on worker threads, in submission order per target and in parallel across targets"""
+    def __init__(self, max_workers=4, on_change=None):
+        self.max_workers = max_workers
+        self.on_change = on_change
+        self._lock = threading.Lock()
+        self._queue = []
+        self._running = []
+        self._local = threading.local()
+        self._closed = False
+
+    @staticmethod
+    def target_key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def submit(self, name, targets, func, progress=None):
+        job = Job(name, [self.target_key(t) for t in targets if t], func, progress)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Installer is shutting down")
+            self._queue.append(job)
+            self._schedule_locked()
+        self._notify(job)
+        return job
+
+    def _notify(self, job):
+        # Called without the lock held, so listeners may call snapshot()
+        if self.on_change:
+            self.on_change(job)
+
+    def _schedule_locked(self):
+        busy = set()
+        for job in self._running:
+            busy |= job.targets
+        for job in list(self._queue):
+            if len(self._running) >= self.max_workers:
+                break
+            if job.targets & busy:
+                # Later jobs on the same targets must not overtake this one
+                busy |= job.targets
+                continue
+            self._queue.remove(job)
+            job.state = Job.RUNNING
+            self._running.append(job)
+            busy |= job.targets
+            threading.Thread(target=self._run, args=(job,), name=f"job: {job.name}").start()
+
+    def _run(self, job):
+        self._local.job = job
+        self._notify(job)
+        try:
+            job.func()
+            job.state = Job.DONE
+        except OperationCancelled:
+            job.state = Job.CANCELLED
+        except Exception as e:
+            job.state = Job.FAILED
+            job.error = e
+        finally:
+            self._local.job = None
+            with self._lock:
+                self._running.remove(job)
+                self._schedule_locked()
+            job.finished.set()
+            self._notify(job)
+
+    def current_job(self):
+        """The job running on the calling worker thread, if any"""
+        return getattr(self._local, 'job', None)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._running), list(self._queue)
+
+    def is_idle(self):
+        with self._lock:
+            return not self._running and not self._queue
+
+    def shutdown(self, cancel=False):
+        """Stop accepting jobs, with cancel also drop queued jobs and cancel running ones"""
+        dropped = []
+        with self._lock:
+            self._closed = True
+            if cancel:
+                for job in self._queue:
+                    job.state = Job.CANCELLED
+                    job.finished.set()
+                dropped = list(self._queue)
+                self._queue.clear()
+                for job in self._running:
+                    if job.progress:
+                        job.progress.cancel()
+        for job in dropped:
+            self._notify(job)
@@ -0,0 +1,149 @@
+"""SQLite index of a userscript library"""
+
+import contextlib
+import os
+import re
+import sqlite3
+
+from .ignore import IgnoreRules
+from .loader import (DESCRIPTION_HEADER_RE, INCLUDE_HEADER_RE, NAME_HEADER_RE, SCRIPT_HEADER_RE,
+                     STYLE_HEADER_RE, STYLEMODE_HEADER_RE, VERSION_HEADER_RE)
+from .presets import PresetStore
+
+# Header index of a userscript library, kept next to the presets. Only a
+# cache of the files on disk, an index with another schema is rebuilt.
+LIBRARY_INDEX_FILE = "library.sqlite3"
+LIBRARY_SCHEMA_VERSION = 1
+LIBRARY_FILENAME_RE = re.compile(r'^[A-Za-z0-9]+.*(\.uc\.js|\.uc\.mjs|\.sys\.mjs|\.uc\.css)$', re.IGNORECASE)
+# Stop looking for the end of a header after this many characters
+LIBRARY_HEADER_LIMIT = 64 * 1024
+# Index rows written per transaction, a cancelled refresh keeps what was committed
+LIBRARY_COMMIT_EVERY = 200
+
+
+class ScriptLibrary:
+    """Persistent SQLite index of the script and style headers in library directories"""
+    FIELDS = ("rel_path", "kind", "name", "description", "version", "include", "stylemode",
+              "size", "mtime_ns")
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(PresetStore.default_dir(), LIBRARY_INDEX_FILE)
+
+    def connect(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        if conn.execute("PRAGMA user_version").fetchone()[0] != LIBRARY_SCHEMA_VERSION:
+            conn.executescript(f"""
+                DROP TABLE IF EXISTS files;
+                CREATE TABLE files (
+                    root TEXT NOT NULL,
+                    rel_path TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    name TEXT,
+                    description TEXT,
+                    version TEXT,
+                    include TEXT,
+                    stylemode TEXT,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    PRIMARY KEY (root, rel_path)
+                );
+                PRAGMA user_version = {LIBRARY_SCHEMA_VERSION};
+            """)
+        return conn
+
+    @staticmethod
+    def normalize_root(root):
+        return os.path.normcase(os.path.abspath(root))
+
+    @staticmethod
+    def file_kind(filename):
+        lower = filename.lower()
+        if lower.endswith(".uc.css"):
+            return "style"
+        if lower.endswith(".sys.mjs"):
+            return "background module"
+        return "module" if lower.endswith(".mjs") else "script"
+
+    @staticmethod
+    def read_header(path):
+        """Header fields of a script or style, read only up to the end of its header"""
+        is_style = path.lower().endswith(".css")
+        content = ""
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            while len(content) < LIBRARY_HEADER_LIMIT:
+                chunk = f.read(4096)
+                if not chunk:
+                    break
+                content += chunk
+                if content.find('// ==/UserScript==') > 0:
+                    break
+        match = (STYLE_HEADER_RE if is_style else SCRIPT_HEADER_RE).search(content)
+        header_text = match.group(0) if match else ""
+
+        def field(regex):
+            found = regex.search(header_text)
+            return found.group(1) if found else None
+
+        return {
+            'name': field(NAME_HEADER_RE),
+            'description': field(DESCRIPTION_HEADER_RE),
+            'version': field(VERSION_HEADER_RE),
+            'include': "\n".join(INCLUDE_HEADER_RE.findall(header_text)) or None,
+            'stylemode': field(STYLEMODE_HEADER_RE) if is_style else None,
+        }
+
+    def refresh(self, root, progress=None):
+        """Bring the index of root up to date, returns added/updated/unchanged/removed counts"""
+        key = self.normalize_root(root)
+        counts = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+        with contextlib.closing(self.connect()) as conn, conn:
+            known = {row['rel_path']: (row['mtime_ns'], row['size']) for row in
+                     conn.execute("SELECT rel_path, mtime_ns, size FROM files WHERE root = ?", (key,))}
+            seen = set()
+            pending = 0
+            for dir_path, dirs, files in IgnoreRules().walk(root):
+                for filename in files:
+                    if not LIBRARY_FILENAME_RE.match(filename):
+                        continue
+                    if progress:
+                        progress.check_cancelled()
+                    path = os.path.join(dir_path, filename)
+                    rel_path = os.path.relpath(path, root).replace(os.sep, '/')
+                    try:
+                        file_stat = os.stat(path)
+                        seen.add(rel_path)
+                        if known.get(rel_path) == (file_stat.st_mtime_ns, file_stat.st_size):
+                            counts['unchanged'] += 1
+                            continue
+                        fields = self.read_header(path)
+                    except OSError:
+                        continue  # Vanished or unreadable, dropped below if it was indexed
+                    conn.execute(
+                        "INSERT OR REPLACE INTO files (root, rel_path, kind, name, description, version,"
+                        " include, stylemode, size, mtime_ns) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (key, rel_path, self.file_kind(filename), fields['name'], fields['description'],
+                         fields['version'], fields['include'], fields['stylemode'],
+                         file_stat.st_size, file_stat.st_mtime_ns))
+                    counts['updated' if rel_path in known else 'added'] += 1
+                    pending += 1
+                    if pending >= LIBRARY_COMMIT_EVERY:
+                        conn.commit()
+                        pending = 0
+            gone = [(key, rel_path) for rel_path in known if rel_path not in seen]
+            conn.executemany("DELETE FROM files WHERE root = ? AND rel_path = ?", gone)
+            counts['removed'] = len(gone)
+        return counts
+
+    def search(self, root, text=""):
+        """Indexed files of root whose name, description or path contain every word of text"""
+        sql = f"SELECT {', '.join(self.FIELDS)} FROM files WHERE root = ?"
+        params = [self.normalize_root(root)]
+        for word in text.split():
+            pattern = "%" + re.sub(r'([%_\\])', r'\\\1', word) + "%"
+            sql += (" AND (name LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\'"
+                    " OR rel_path LIKE ? ESCAPE '\\')")
+            params += [pattern] * 3
+        with contextlib.closing(self.connect()) as conn:
+            return [dict(row) for row in conn.execute(sql + " ORDER BY rel_path", params)]
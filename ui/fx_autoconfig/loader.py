@@ -0,0 +1,20 @@
+"""Loader prefs, filename rules and header fields, kept in sync with
+UserChrome_js.init() and ScriptData in profile/chrome/utils/boot.sys.mjs"""
+
+import re
+
+PREF_ENABLED = "userChromeJS.enabled"
+PREF_SCRIPTSDISABLED = "userChromeJS.scriptsDisabled"
+SCRIPT_FILENAME_RE = re.compile(r'^[A-Za-z0-9]+.*(\.uc\.js|\.uc\.mjs|\.sys\.mjs)$', re.IGNORECASE)
+STYLE_FILENAME_RE = re.compile(r'^[A-Za-z0-9]+.*\.uc\.css$', re.IGNORECASE)
+SCRIPT_HEADER_RE = re.compile(r'^// ==UserScript==\s*[\n\r]+(?:.*[\n\r]+)*?// ==/UserScript==\s*', re.MULTILINE)
+STYLE_HEADER_RE = re.compile(r'^/\* ==UserScript==\s*[\n\r]+(?:.*[\n\r]+)*?// ==/UserScript==\s*\*/', re.MULTILINE)
+BROWSER_CHROME_URL = "chrome://browser/content/browser.xhtml"
+PREF_LINE_RE = re.compile(r'^user_pref\("([^"]+)",\s*(.*)\);\s*$')
+VERSION_HEADER_RE = re.compile(r'^// @version\s+(.+?)\s*$', re.MULTILINE | re.IGNORECASE)
+ID_HEADER_RE = re.compile(r'^// @id\s+(.+?)\s*$', re.MULTILINE | re.IGNORECASE)
+AUTHOR_HEADER_RE = re.compile(r'^// @author\s+(.+?)\s*$', re.MULTILINE | re.IGNORECASE)
+NAME_HEADER_RE = re.compile(r'^// @name\s+(.+?)\s*$', re.MULTILINE | re.IGNORECASE)
+DESCRIPTION_HEADER_RE = re.compile(r'^// @description\s+(.+?)\s*$', re.MULTILINE | re.IGNORECASE)
+INCLUDE_HEADER_RE = re.compile(r'^// @include\s+(.+?)\s*$', re.MULTILINE)
+STYLEMODE_HEADER_RE = re.compile(r'^// @stylemode\s+(.+?)\s*$', re.MULTILINE | re.IGNORECASE)
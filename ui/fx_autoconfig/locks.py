@@ -0,0 +1,121 @@
+"""Inter-process locks on installer targets"""
+
+import hashlib
+import json
+import os
+import platform
+import tempfile
+import time
+
+# Advisory locks that keep installer processes of the same user from writing
+# to one profile chrome/ or Firefox directory at the same time
+LOCK_DIR_NAME = "fx-autoconfig-locks"
+# Seconds a job waits for a target held by another process, None waits forever
+LOCK_TIMEOUT = 120
+LOCK_POLL_INTERVAL = 0.2
+LOCK_WAIT_REPORT_INTERVAL = 10
+# Windows locks a byte range, keep it clear of the holder info at the start
+LOCK_BYTE_OFFSET = 1 << 20
+
+
+class TargetLockTimeout(Exception):
+    """Raised when another installer process holds a target for longer than the lock timeout"""
+    def __init__(self, target, holder):
+        super().__init__(f"{target} is locked by {TargetLock.describe_holder(holder)}")
+        self.target = target
+        self.holder = holder
+
+
+class TargetLock:
+    """Inter-process lock on one target directory, released by the OS when its holder exits"""
+    def __init__(self, target, operation=""):
+        self.target = self.normalize(target)
+        self.operation = operation
+        self.path = os.path.join(self.lock_dir(), hashlib.sha256(
+            self.target.encode('utf-8', 'surrogateescape')).hexdigest()[:32] + ".lock")
+        self._file = None
+
+    @staticmethod
+    def normalize(target):
+        return os.path.normcase(os.path.realpath(target))
+
+    @staticmethod
+    def lock_dir():
+        name = LOCK_DIR_NAME if os.name == "nt" else f"{LOCK_DIR_NAME}-{os.getuid()}"
+        return os.path.join(tempfile.gettempdir(), name)
+
+    @staticmethod
+    def describe_holder(holder):
+        if not holder:
+            return "another installer process"
+        return (f"{holder.get('operation') or 'an installer'} (process {holder.get('pid')} "
+                f"on {holder.get('host')}, since {holder.get('started')})")
+
+    def try_acquire(self):
+        """Take the lock if it is free, never blocks"""
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        f = os.fdopen(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600), 'r+b')
+        try:
+            if os.name == "nt":
+                import msvcrt
+                f.seek(LOCK_BYTE_OFFSET)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                # flock() locks conflict between threads too, lockf() ones don't
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        holder = {
+            'pid': os.getpid(),
+            'host': platform.node(),
+            'operation': self.operation,
+            'target': self.target,
+            'started': time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        f.seek(0)
+        f.truncate()
+        f.write(json.dumps(holder).encode('utf-8'))
+        f.flush()
+        self._file = f
+        return True
+
+    def holder(self):
+        """Holder info recorded in the lock file, None if unknown"""
+        try:
+            with open(self.path, 'rb') as f:
+                return json.loads(f.read(4096).decode('utf-8'))
+        except (OSError, ValueError):
+            return None  # Not created yet, or the holder is still writing it
+
+    def acquire(self, timeout=LOCK_TIMEOUT, on_wait=None, check_cancelled=None):
+        """Wait up to timeout seconds for the lock, 0 fails fast and None waits forever"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        reported = None
+        while not self.try_acquire():
+            holder = self.holder()
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                raise TargetLockTimeout(self.target, holder)
+            if on_wait and (reported is None or now - reported >= LOCK_WAIT_REPORT_INTERVAL):
+                on_wait(holder)
+                reported = now
+            if check_cancelled:
+                check_cancelled()
+            time.sleep(LOCK_POLL_INTERVAL)
+
+    def release(self):
+        if self._file is None:
+            return
+        try:
+            # Clear the holder info so waiters don't report a finished holder
+            self._file.seek(0)
+            self._file.truncate()
+            if os.name == "nt":
+                import msvcrt
+                self._file.seek(LOCK_BYTE_OFFSET)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,122 @@
+"""Named settings presets"""
+
+import json
+import os
+import platform
+import threading
+from pathlib import Path
+
+from .durability import DURABILITY_STRICT, SyncBatch
+
+# Settings used to live next to the script, they are migrated into the presets file
+CONFIG_FILE = "installer_config.json"
+CONFIG_DIR_NAME = "fx-autoconfig-installer"
+PRESETS_FILE = "presets.json"
+DEFAULT_PRESET = "Default"
+# Rapid changes within this many seconds are written to disk once
+PRESET_SAVE_DELAY = 0.5
+
+
+class PresetStore:
+    """Named settings presets, written atomically once a burst of changes has settled"""
+    def __init__(self, path=None, delay=PRESET_SAVE_DELAY):
+        self.path = path or os.path.join(self.default_dir(), PRESETS_FILE)
+        self.delay = delay
+        self.presets = {}
+        self.active = DEFAULT_PRESET
+        self.load_error = None
+        self._lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+        self.load()
+
+    @staticmethod
+    def default_dir():
+        system = platform.system()
+        if system == "Windows":
+            base = os.environ.get('APPDATA') or os.path.expanduser("~")
+        elif system == "Darwin":
+            base = os.path.expanduser("~/Library/Application Support")
+        else:
+            base = os.environ.get('XDG_CONFIG_HOME') or os.path.expanduser("~/.config")
+        return os.path.join(base, CONFIG_DIR_NAME)
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.presets = {name: dict(settings) for name, settings in data.get('presets', {}).items()}
+            self.active = data.get('active', DEFAULT_PRESET)
+        except FileNotFoundError:
+            legacy_path = Path(__file__).parent.parent / CONFIG_FILE
+            try:
+                with open(legacy_path, 'r') as f:
+                    self.presets = {DEFAULT_PRESET: json.load(f)}
+                self._dirty = True
+            except (OSError, ValueError):
+                pass
+        except (OSError, ValueError, AttributeError) as e:
+            self.load_error = e
+            # Keep the unreadable file for the user instead of overwriting it on the next save
+            try:
+                os.replace(self.path, self.path + ".corrupt")
+            except OSError:
+                pass
+        if not self.presets:
+            self.presets = {DEFAULT_PRESET: {}}
+        if self.active not in self.presets:
+            self.active = sorted(self.presets)[0]
+
+    def names(self):
+        with self._lock:
+            return sorted(self.presets)
+
+    def get(self, name):
+        with self._lock:
+            return dict(self.presets.get(name, {}))
+
+    def put(self, name, settings):
+        with self._lock:
+            if self.presets.get(name) == settings and self.active == name:
+                return
+            self.presets[name] = dict(settings)
+            self.active = name
+            self._schedule_locked()
+
+    def select(self, name):
+        with self._lock:
+            if name in self.presets and self.active != name:
+                self.active = name
+                self._schedule_locked()
+
+    def delete(self, name):
+        with self._lock:
+            if name not in self.presets or len(self.presets) == 1:
+                return False
+            del self.presets[name]
+            if self.active == name:
+                self.active = sorted(self.presets)[0]
+            self._schedule_locked()
+            return True
+
+    def _schedule_locked(self):
+        self._dirty = True
+        if self._timer:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """Write pending changes now"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            data = {'active': self.active, 'presets': self.presets}
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            SyncBatch(DURABILITY_STRICT).atomic_write(
+                self.path, json.dumps(data, indent=2, sort_keys=True).encode('utf-8'))
+            self._dirty = False
@@ -1,23 +1,215 @@
+
+
 #!/usr/bin/env python3
 """
 fx-autoconfig GUI Installer
 A cross-platform installer for Firefox userChrome.js manager
 """
 
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
 import os
+import re
 import sys
 import shutil
-import json
 import platform
+import queue
+import sqlite3
 import subprocess
+import tempfile
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import webbrowser
+import argparse
+
+try:
+    import tkinter as tk
+    from tkinter import ttk, filedialog, messagebox, scrolledtext, simpledialog
+except ImportError:
+    # --benchmark-durability works without Tk, only the GUI needs it
+    tk = None
+
+from fx_autoconfig import (DURABILITY_BATCHED, DURABILITY_LEVELS, DURABILITY_NONE, PREF_ENABLED,
+                           PREF_SCRIPTSDISABLED, TEST_PROFILE_TEMPLATES, VERSION, FxAutoconfigEngine,
+                           OperationCancelled, OperationProgress, PresetStore)
+
+
+# Profile picker: metadata workers and how often the dialog drains their results
+PROFILE_METADATA_WORKERS = 4
+PROFILE_PICKER_POLL_MS = 100
+
+
+class VirtualTable:
+    """Treeview that only holds the rows currently scrolled into view"""
+    def __init__(self, parent, columns, key, formatters=None, height=15):
+        # columns: (field, heading, width, anchor)
+        self.key = key
+        self.column_ids = [column[0] for column in columns]
+        self.formatters = formatters or {}
+        self.height = height
+        self.rows = []
+        self.visible = []
+        self.window = []
+        self.selected = set()
+        self.anchor = None
+        self.offset = 0
+        self.filter_text = ""
+        self.sort_column = None
+        self.sort_reverse = False
+        self.on_selection_change = None
+        self.on_activate = None
+
+        self.frame = ttk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=self.column_ids, show="headings",
+                                 height=height, selectmode="none")
+        for field, heading, width, anchor in columns:
+            self.tree.heading(field, text=heading, command=lambda f=field: self.sort_by(f))
+            self.tree.column(field, width=width, anchor=anchor, stretch=field == self.column_ids[-1])
+        self.tree.tag_configure("selected", background="#cce4ff")
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.on_scroll)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind("<Button-1>", self.on_click)
+        self.tree.bind("<Double-Button-1>", self.on_double_click)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll_by(-1 if e.delta > 0 else 1, 3))
+        self.tree.bind("<Button-4>", lambda e: self.scroll_by(-1, 3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_by(1, 3))
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<Control-a>", lambda e: self.select_all())
+
+    def format(self, field, row):
+        value = row.get(field)
+        formatter = self.formatters.get(field)
+        if formatter:
+            return formatter(value)
+        return "" if value is None else str(value)
+
+    def set_rows(self, rows):
+        self.rows = list(rows)
+        self.apply_order()
+
+    def add_rows(self, rows):
+        self.rows.extend(rows)
+        self.apply_order()
+
+    def update_row(self, key, fields):
+        """Change fields of a row, call refresh() once after a batch of updates"""
+        for row in self.rows:
+            if row[self.key] == key:
+                row.update(fields)
+                return
+
+    def set_filter(self, text):
+        self.filter_text = text.strip().lower()
+        self.offset = 0
+        self.apply_order()
+
+    def sort_by(self, field):
+        self.sort_reverse = not self.sort_reverse if self.sort_column == field else False
+        self.sort_column = field
+        self.apply_order()
+
+    def apply_order(self):
+        if self.sort_column:
+            column = self.sort_column
+            # Rows still waiting for a value sort last either way
+            present = [r for r in self.rows if r.get(column) is not None]
+            missing = [r for r in self.rows if r.get(column) is None]
+            present.sort(key=lambda r: r[column], reverse=self.sort_reverse)
+            self.rows = present + missing
+        if self.filter_text:
+            self.visible = [r for r in self.rows
+                            if any(self.filter_text in self.format(f, r).lower() for f in self.column_ids)]
+        else:
+            self.visible = list(self.rows)
+        self.refresh()
+
+    def refresh(self):
+        """Redraw the rows in view, reusing the existing tree items"""
+        total = len(self.visible)
+        self.offset = max(0, min(self.offset, total - self.height))
+        self.window = self.visible[self.offset:self.offset + self.height]
+        items = self.tree.get_children()
+        for i, row in enumerate(self.window):
+            values = [self.format(field, row) for field in self.column_ids]
+            tags = ("selected",) if row[self.key] in self.selected else ()
+            if i < len(items):
+                self.tree.item(items[i], values=values, tags=tags)
+            else:
+                self.tree.insert("", tk.END, values=values, tags=tags)
+        for item in items[len(self.window):]:
+            self.tree.delete(item)
+        if total:
+            self.scrollbar.set(self.offset / total, (self.offset + len(self.window)) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.offset = int(float(amount) * len(self.visible))
+            self.refresh()
+        else:
+            self.scroll_by(int(amount), self.height if unit == "pages" else 1)
+
+    def scroll_by(self, direction, step):
+        self.offset += direction * step
+        self.refresh()
+
+    def on_resize(self, event):
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        height = max(1, (event.height - row_height - 4) // row_height)
+        if height != self.height:
+            self.height = height
+            self.refresh()
+
+    def row_at(self, y):
+        item = self.tree.identify_row(y)
+        if not item:
+            return None
+        index = self.tree.index(item)
+        return self.window[index] if index < len(self.window) else None
+
+    def on_click(self, event):
+        if self.tree.identify_region(event.x, event.y) == "heading":
+            return None
+        row = self.row_at(event.y)
+        if row is None:
+            return "break"
+        key = row[self.key]
+        if event.state & 0x0001 and self.anchor is not None:  # Shift
+            keys = [r[self.key] for r in self.visible]
+            if self.anchor in keys:
+                start, end = sorted((keys.index(self.anchor), keys.index(key)))
+                self.selected = set(keys[start:end + 1])
+        elif event.state & 0x0004:  # Control
+            self.selected ^= {key}
+            self.anchor = key
+        else:
+            self.selected = {key}
+            self.anchor = key
+        self.tree.focus_set()
+        self.refresh()
+        if self.on_selection_change:
+            self.on_selection_change()
+        return "break"
+
+    def on_double_click(self, event):
+        row = self.row_at(event.y)
+        if row is not None and self.on_activate:
+            self.on_activate(row)
+        return "break"
+
+    def select_all(self):
+        self.selected = {r[self.key] for r in self.visible}
+        self.refresh()
+        if self.on_selection_change:
+            self.on_selection_change()
+        return "break"
+
+    def selected_rows(self):
+        return [r for r in self.rows if r[self.key] in self.selected]
 
-VERSION = "1.0.0"
-CONFIG_FILE = "installer_config.json"
 
 class FxAutoconfigInstaller:
     def __init__(self, root):
@@ -26,6 +218,8 @@ class FxAutoconfigInstaller:
         self.root.geometry("750x750")
         
         # Load configuration
+        self.presets = PresetStore()
+        self.applying_preset = False
         self.config = self.load_config()
         # Variables
         self.firefox_path = tk.StringVar(value=self.config.get('firefox_path', ''))
@@ -33,9 +227,23 @@ class FxAutoconfigInstaller:
         self.custom_js_path = tk.StringVar(value=self.config.get('custom_js_path', ''))
         self.custom_css_path = tk.StringVar(value=self.config.get('custom_css_path', ''))
         self.use_symlinks = tk.BooleanVar(value=self.config.get('use_symlinks', False))
+        self.link_directories = tk.BooleanVar(value=self.config.get('link_directories', False))
+        self.durability = tk.StringVar(value=self.config.get('durability', DURABILITY_BATCHED))
+        self.bundle_scripts = tk.BooleanVar(value=self.config.get('bundle_scripts', False))
+        self.library_path = tk.StringVar(value=self.config.get('library_path', ''))
+        # Paths relative to library_path, changed through show_library_picker()
+        self.library_selection = list(self.config.get('library_selection', []))
+        self.engine = FxAutoconfigEngine(on_event=self.handle_engine_event)
+        for var in self.get_setting_vars().values():
+            # Typed paths are saved too, the preset store coalesces the writes
+            var.trace_add("write", lambda *args: self.save_config())
         
         self.setup_ui()
+        if self.presets.load_error:
+            self.log_message(f"Could not load presets from {self.presets.path}: {self.presets.load_error}", error=True)
         self.center_window()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(200, self.refresh_progress)
         
         # Validate repository root early
         self.validate_repository()
@@ -71,6 +279,18 @@ class FxAutoconfigInstaller:
         
         # Separator
         ttk.Separator(parent, orient='horizontal').pack(fill=tk.X, padx=10, pady=5)
+
+        # Named presets
+        preset_frame = ttk.Frame(parent)
+        preset_frame.pack(fill=tk.X, padx=10, pady=(0, 5))
+        ttk.Label(preset_frame, text="Preset:").pack(side=tk.LEFT)
+        self.preset_var = tk.StringVar(value=self.presets.active)
+        self.preset_combo = ttk.Combobox(preset_frame, textvariable=self.preset_var,
+                                         values=self.presets.names(), state="readonly", width=30)
+        self.preset_combo.pack(side=tk.LEFT, padx=(5, 5))
+        self.preset_combo.bind("<<ComboboxSelected>>", self.on_preset_selected)
+        ttk.Button(preset_frame, text="Save As...", command=self.save_preset_as).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(preset_frame, text="Delete", command=self.delete_preset).pack(side=tk.LEFT)
         
         # Firefox installation path
         firefox_frame = ttk.LabelFrame(parent, text="Firefox Installation Directory", padding=10)
@@ -143,6 +363,28 @@ class FxAutoconfigInstaller:
         info_css_label = ttk.Label(custom_css_frame, text="Styles (.uc.css) will be copied/linked to chrome/CSS/, other files to chrome/resources/",
                                   font=('Arial', 9), foreground='gray')
         info_css_label.pack(anchor=tk.W, pady=(2, 0))
+
+        # Script library, only the chosen files are installed
+        library_frame = ttk.LabelFrame(parent, text="Script Library (Optional)", padding=10)
+        library_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        library_entry_frame = ttk.Frame(library_frame)
+        library_entry_frame.pack(fill=tk.X)
+
+        self.library_entry = ttk.Entry(library_entry_frame, textvariable=self.library_path,
+                                       font=('Arial', 10))
+        self.library_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+
+        ttk.Button(library_entry_frame, text="Choose Files...",
+                   command=self.show_library_picker).pack(side=tk.RIGHT, padx=(0, 5))
+        ttk.Button(library_entry_frame, text="Browse",
+                   command=self.browse_library_path).pack(side=tk.RIGHT, padx=(0, 5))
+        ttk.Button(library_entry_frame, text="Clear",
+                   command=self.clear_library_path).pack(side=tk.RIGHT)
+
+        self.library_status_label = ttk.Label(library_frame, font=('Arial', 9), foreground='gray')
+        self.library_status_label.pack(anchor=tk.W, pady=(2, 0))
+        self.update_library_status()
         
         # Custom files options (applies to both JS and CSS)
         options_frame = ttk.LabelFrame(parent, text="Custom Files Options", padding=10)
@@ -151,6 +393,24 @@ class FxAutoconfigInstaller:
         self.symlink_check = ttk.Checkbutton(options_frame, text="Create symlinks instead of copying files (preserves live editing, applies to both scripts and styles)",
                                            variable=self.use_symlinks, command=self.save_config)
         self.symlink_check.pack(anchor=tk.W)
+
+        self.link_dirs_check = ttk.Checkbutton(options_frame, text="Link whole directories when symlinking (new files appear without reinstalling)",
+                                              variable=self.link_directories, command=self.save_config)
+        self.link_dirs_check.pack(anchor=tk.W)
+
+        self.bundle_check = ttk.Checkbutton(options_frame, text="Bundle per-window scripts at install time (one file per window, reinstall after editing scripts)",
+                                            variable=self.bundle_scripts, command=self.save_config)
+        self.bundle_check.pack(anchor=tk.W)
+
+        durability_frame = ttk.Frame(options_frame)
+        durability_frame.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(durability_frame, text="Write safety:").pack(side=tk.LEFT)
+        self.durability_combo = ttk.Combobox(durability_frame, textvariable=self.durability,
+                                             values=DURABILITY_LEVELS, state="readonly", width=10)
+        self.durability_combo.pack(side=tk.LEFT, padx=(5, 5))
+        self.durability_combo.bind("<<ComboboxSelected>>", lambda e: self.save_config())
+        ttk.Label(durability_frame, text="(batched flushes to disk once per step, loader files are always flushed)",
+                  font=('Arial', 9), foreground='gray').pack(side=tk.LEFT)
         
         # Action buttons
         action_frame = ttk.LabelFrame(parent, text="Actions", padding=10)
@@ -177,9 +437,63 @@ class FxAutoconfigInstaller:
         self.open_profile_btn = ttk.Button(button_frame2, text="Open Profile Folder", 
                                           command=self.open_profile_folder)
         self.open_profile_btn.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        button_frame3 = ttk.Frame(action_frame)
+        button_frame3.pack(fill=tk.X, pady=(5, 0))
+
+        self.analyze_btn = ttk.Button(button_frame3, text="Analyze Startup Overhead",
+                                     command=self.analyze_startup_overhead)
+        self.analyze_btn.pack(side=tk.LEFT, padx=(0, 5), fill=tk.X, expand=True)
+
+        self.manage_scripts_btn = ttk.Button(button_frame3, text="Enable/Disable Scripts",
+                                            command=self.manage_scripts)
+        self.manage_scripts_btn.pack(side=tk.LEFT, padx=(0, 5), fill=tk.X, expand=True)
+
+        self.verify_btn = ttk.Button(button_frame3, text="Verify Installation",
+                                    command=self.verify_installation)
+        self.verify_btn.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        button_frame4 = ttk.Frame(action_frame)
+        button_frame4.pack(fill=tk.X, pady=(5, 0))
+
+        self.create_test_profiles_btn = ttk.Button(button_frame4, text="Create Test Profiles",
+                                                  command=self.show_test_profile_dialog)
+        self.create_test_profiles_btn.pack(side=tk.LEFT, padx=(0, 5), fill=tk.X, expand=True)
+
+        self.remove_test_profiles_btn = ttk.Button(button_frame4, text="Remove Test Profiles",
+                                                  command=self.remove_test_profiles)
+        self.remove_test_profiles_btn.pack(side=tk.LEFT, padx=(0, 5), fill=tk.X, expand=True)
+
+        self.cleanup_btn = ttk.Button(button_frame4, text="Clean Up chrome/",
+                                     command=self.cleanup_chrome)
+        self.cleanup_btn.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        button_frame5 = ttk.Frame(action_frame)
+        button_frame5.pack(fill=tk.X, pady=(5, 0))
+
+        self.export_btn = ttk.Button(button_frame5, text="Export Setup...",
+                                    command=self.export_setup)
+        self.export_btn.pack(side=tk.LEFT, padx=(0, 5), fill=tk.X, expand=True)
+
+        self.import_btn = ttk.Button(button_frame5, text="Import Setup...",
+                                    command=self.import_setup)
+        self.import_btn.pack(side=tk.LEFT, fill=tk.X, expand=True)
           # Status
         status_frame = ttk.LabelFrame(parent, text="Status", padding=10)
         status_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        progress_frame = ttk.Frame(status_frame)
+        progress_frame.pack(fill=tk.X, pady=(0, 5))
+
+        self.cancel_btn = ttk.Button(progress_frame, text="Cancel", state='disabled',
+                                    command=self.cancel_operation)
+        self.cancel_btn.pack(side=tk.RIGHT, padx=(5, 0))
+
+        self.progress_bar = ttk.Progressbar(progress_frame, mode='determinate', maximum=100)
+        self.progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        self.progress_label = ttk.Label(status_frame, text="", font=('Arial', 9), foreground='gray')
+        self.progress_label.pack(anchor=tk.W, pady=(0, 5))
         
         self.status_text = scrolledtext.ScrolledText(status_frame, height=8, 
                                                     font=('Consolas', 9))
@@ -245,30 +559,89 @@ The installer provides an easy way to set up fx-autoconfig for Firefox userChrom
         self.root.geometry(f"+{x}+{y}")
         
     def load_config(self):
-        try:
-            config_path = Path(__file__).parent / CONFIG_FILE
-            if config_path.exists():
-                with open(config_path, 'r') as f:
-                    return json.load(f)
-        except Exception as e:
-            self.log_message(f"Could not load config: {e}")
-        return {}
-        
+        return self.presets.get(self.presets.active)
+
+    def get_setting_vars(self):
+        return {
+            'firefox_path': self.firefox_path,
+            'profile_path': self.profile_path,
+            'custom_js_path': self.custom_js_path,
+            'custom_css_path': self.custom_css_path,
+            'use_symlinks': self.use_symlinks,
+            'link_directories': self.link_directories,
+            'durability': self.durability,
+            'bundle_scripts': self.bundle_scripts,
+            'library_path': self.library_path
+        }
+        
+    def get_settings(self):
+        """Plain-value snapshot of the UI state, safe to hand to worker threads"""
+        return {
+            'firefox_path': self.firefox_path.get(),
+            'profile_path': self.profile_path.get(),
+            'custom_js_path': self.custom_js_path.get(),
+            'custom_css_path': self.custom_css_path.get(),
+            'use_symlinks': self.use_symlinks.get(),
+            'link_directories': self.link_directories.get(),
+            'durability': self.durability.get(),
+            'bundle_scripts': self.bundle_scripts.get(),
+            'library_path': self.library_path.get(),
+            'library_selection': list(self.library_selection)
+        }
+
     def save_config(self):
+        # Setting several variables from a preset would store half-applied states
+        if self.applying_preset:
+            return
+        self.presets.put(self.presets.active, self.get_settings())
+
+    def apply_preset(self, name):
+        settings = self.presets.get(name)
+        defaults = {'use_symlinks': False, 'link_directories': False, 'durability': DURABILITY_BATCHED,
+                    'bundle_scripts': False}
+        self.applying_preset = True
         try:
-            config = {
-                'firefox_path': self.firefox_path.get(),
-                'profile_path': self.profile_path.get(),
-                'custom_js_path': self.custom_js_path.get(),
-                'custom_css_path': self.custom_css_path.get(),
-                'use_symlinks': self.use_symlinks.get()
-            }
-            config_path = Path(__file__).parent / CONFIG_FILE
-            with open(config_path, 'w') as f:
-                json.dump(config, f, indent=2)
-        except Exception as e:
-            self.log_message(f"Could not save config: {e}")
+            for key, var in self.get_setting_vars().items():
+                var.set(settings.get(key, defaults.get(key, '')))
+            self.library_selection = list(settings.get('library_selection', []))
+        finally:
+            self.applying_preset = False
+        self.update_library_status()
+        self.presets.select(name)
+        self.log_message(f"Loaded preset: {name}")
+
+    def on_preset_selected(self, event=None):
+        name = self.preset_var.get()
+        if name != self.presets.active:
+            self.apply_preset(name)
+
+    def save_preset_as(self):
+        name = simpledialog.askstring("Save Preset", "Name for the current settings:", parent=self.root)
+        if not name or not name.strip():
+            return
+        name = name.strip()
+        self.presets.put(name, self.get_settings())
+        self.preset_combo.config(values=self.presets.names())
+        self.preset_var.set(name)
+        self.log_message(f"Saved preset: {name}")
+
+    def delete_preset(self):
+        name = self.preset_var.get()
+        if len(self.presets.names()) == 1:
+            self.log_message("The last preset can't be deleted", error=True)
+            return
+        if not messagebox.askyesno("Delete Preset", f"Delete preset '{name}'?"):
+            return
+        self.presets.delete(name)
+        self.preset_combo.config(values=self.presets.names())
+        self.preset_var.set(self.presets.active)
+        self.apply_preset(self.presets.active)
             
+    def handle_engine_event(self, kind, data):
+        # Progress and job state are polled by refresh_progress()
+        if kind == "log":
+            self.log_message(data['message'], data['error'])
+
     def log_message(self, message, error=False):
         timestamp = ""  # Keep it simple for now
         prefix = "❌ " if error else "✅ "
@@ -283,7 +656,7 @@ The installer provides an easy way to set up fx-autoconfig for Firefox userChrom
         if path:
             self.firefox_path.set(path)
             self.save_config()
-            if self.is_valid_firefox_path(path):
+            if self.engine.is_valid_firefox_path(path):
                 self.log_message(f"Firefox installation found: {path}")
             else:
                 self.log_message(f"Warning: firefox executable not found in {path}", error=True)
@@ -293,7 +666,7 @@ The installer provides an easy way to set up fx-autoconfig for Firefox userChrom
         if path:
             self.profile_path.set(path)
             self.save_config()
-            if self.is_valid_profile_path(path):
+            if self.engine.is_valid_profile_path(path):
                 self.log_message(f"Firefox profile found: {path}")
             else:
                 self.log_message(f"Warning: prefs.js not found in {path}", error=True)
@@ -321,177 +694,394 @@ The installer provides an easy way to set up fx-autoconfig for Firefox userChrom
         self.custom_css_path.set("")
         self.save_config()
         self.log_message("Custom styles directory cleared")
+
+    def browse_library_path(self):
+        path = filedialog.askdirectory(title="Select Script Library Directory")
+        if path:
+            if path != self.library_path.get():
+                # Selections are relative to the library they were made in
+                self.library_selection = []
+            self.library_path.set(path)
+            self.update_library_status()
+            self.log_message(f"Script library selected: {path}")
+
+    def clear_library_path(self):
+        self.library_selection = []
+        self.library_path.set("")
+        self.update_library_status()
+        self.log_message("Script library cleared")
+
+    def update_library_status(self):
+        if not self.library_path.get():
+            text = "Index a large script collection and install only the files you choose"
+        elif self.library_selection:
+            text = f"{len(self.library_selection)} files chosen, only these are installed from the library"
+        else:
+            text = "No files chosen, Install removes files it installed from this library earlier"
+        self.library_status_label.config(text=text)
+
+    def show_library_picker(self):
+        library_path = self.library_path.get()
+        if not library_path or not os.path.isdir(library_path):
+            self.log_message("Please select a script library directory", error=True)
+            return
+        library = self.engine.library
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Choose Library Files")
+        dialog.geometry("920x520")
+        dialog.transient(self.root)
+        dialog.grab_set()
+
+        ttk.Label(dialog, text="Choose the scripts and styles to install:",
+                  font=('Arial', 12, 'bold')).pack(pady=(10, 5))
+
+        filter_frame = ttk.Frame(dialog)
+        filter_frame.pack(fill=tk.X, padx=20)
+        ttk.Label(filter_frame, text="Search:").pack(side=tk.LEFT)
+        filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(filter_frame, textvariable=filter_var)
+        filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+        status_label = ttk.Label(dialog, font=('Arial', 9), foreground='gray')
+        status_label.pack(anchor=tk.W, padx=20, pady=(5, 0))
+
+        table = VirtualTable(dialog, [("name", "Name", 170, tk.W),
+                                      ("kind", "Type", 80, tk.W),
+                                      ("version", "Version", 70, tk.W),
+                                      ("target", "Loads into", 150, tk.W),
+                                      ("description", "Description", 220, tk.W),
+                                      ("rel_path", "File", 200, tk.W)],
+                             key="rel_path")
+        table.frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=5)
+        table.selected = set(self.library_selection)
+        results = queue.Queue()
+        state = {'closed': False, 'indexing': True}
+
+        def load_rows():
+            rows = library.search(library_path)
+            for row in rows:
+                if row['kind'] == "style":
+                    row['target'] = row['stylemode'] or "author sheet"
+                elif row['kind'] == "background module":
+                    row['target'] = "background"
+                else:
+                    row['target'] = (row['include'] or "main").replace("\n", ", ")
+            table.set_rows(rows)
+            return rows
+
+        def describe():
+            text = f"{len(table.rows)} files, {len(table.selected)} chosen. Ctrl/Shift-click to choose several"
+            if state['indexing']:
+                text += ". Updating index..."
+            status_label.config(text=text)
+
+        def index_thread():
+            try:
+                results.put(("done", library.refresh(library_path)))
+            except Exception as e:
+                results.put(("error", e))
+                raise
+
+        def poll():
+            if state['closed']:
+                return
+            try:
+                kind, data = results.get_nowait()
+            except queue.Empty:
+                dialog.after(PROFILE_PICKER_POLL_MS, poll)
+                return
+            state['indexing'] = False
+            if kind == "error":
+                self.log_message(f"Could not index the script library: {data}", error=True)
+            else:
+                load_rows()
+                if data['added'] or data['updated'] or data['removed']:
+                    self.log_message(f"Library index updated: {data['added']} new, {data['updated']} changed, "
+                                     f"{data['removed']} removed, {data['unchanged']} unchanged")
+            describe()
+
+        def close():
+            state['closed'] = True
+            dialog.destroy()
+
+        def on_use():
+            known = {row['rel_path'] for row in table.rows}
+            self.library_selection = sorted(key for key in table.selected if key in known)
+            self.save_config()
+            self.update_library_status()
+            self.log_message(f"{len(self.library_selection)} library files chosen, they are installed with Install")
+            close()
+
+        def on_add_shown():
+            table.selected |= {row['rel_path'] for row in table.visible}
+            table.refresh()
+            describe()
+
+        def on_clear():
+            table.selected = set()
+            table.refresh()
+            describe()
+
+        table.on_selection_change = describe
+        filter_timer = {'id': None}
+
+        def on_filter_change(*args):
+            if filter_timer['id']:
+                dialog.after_cancel(filter_timer['id'])
+            filter_timer['id'] = dialog.after(150, lambda: table.set_filter(filter_var.get()))
+
+        filter_var.trace_add("write", on_filter_change)
+
+        button_frame = ttk.Frame(dialog)
+        button_frame.pack(pady=10)
+        ttk.Button(button_frame, text="Use Chosen Files", command=on_use).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Choose All Shown", command=on_add_shown).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Choose None", command=on_clear).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Cancel", command=close).pack(side=tk.LEFT, padx=5)
+        dialog.protocol("WM_DELETE_WINDOW", close)
+
+        # Center the dialog
+        dialog.update_idletasks()
+        x = (dialog.winfo_screenwidth() // 2) - (dialog.winfo_width() // 2)
+        y = (dialog.winfo_screenheight() // 2) - (dialog.winfo_height() // 2)
+        dialog.geometry(f"+{x}+{y}")
+        filter_entry.focus_set()
+
+        # Show what is already indexed right away, the refresh only adds what changed
+        try:
+            load_rows()
+        except sqlite3.Error as e:
+            self.log_message(f"Could not read the library index: {e}", error=True)
+        if self.engine.submit_job("Index script library", [library.path], index_thread):
+            dialog.after(PROFILE_PICKER_POLL_MS, poll)
+        else:
+            state['indexing'] = False
+        describe()
         
     def detect_firefox_path(self):
-        paths = self.get_firefox_paths()
+        paths = self.engine.get_firefox_paths()
         
         for path in paths:
-            if self.is_valid_firefox_path(path):
+            if self.engine.is_valid_firefox_path(path):
                 self.firefox_path.set(path)
                 self.save_config()
                 self.log_message(f"Firefox installation detected: {path}")
                 return                
         self.log_message("Could not auto-detect Firefox installation", error=True)
         
-    def get_firefox_paths(self):
-        system = platform.system()
-        paths = []
-        
-        if system == "Windows":
-            # Check common installation directories
-            search_dirs = [
-                "C:\\Program Files",
-                "C:\\Program Files (x86)",
-                os.environ.get('LOCALAPPDATA', ''),
-            ]
-            
-            for search_dir in search_dirs:
-                if os.path.exists(search_dir):
-                    try:
-                        for item in os.listdir(search_dir):
-                            if "firefox" in item.lower():
-                                full_path = os.path.join(search_dir, item)
-                                if os.path.isdir(full_path):
-                                    paths.append(full_path)
-                    except (PermissionError, OSError):
-                        continue
-                        
-        elif system == "Darwin":  # macOS
-            # Check Applications directory
-            apps_dir = "/Applications"
-            if os.path.exists(apps_dir):
-                try:
-                    for item in os.listdir(apps_dir):
-                        if "firefox" in item.lower() and item.endswith(".app"):
-                            app_path = os.path.join(apps_dir, item, "Contents", "MacOS")
-                            if os.path.exists(app_path):
-                                paths.append(app_path)
-                except (PermissionError, OSError):
-                    pass
-                    
-        elif system == "Linux":
-            # Check common Linux installation directories
-            search_dirs = [
-                "/usr/lib",
-                "/usr/lib64", 
-                "/opt",
-                "/snap",
-                "/usr/bin",
-            ]
-            
-            for search_dir in search_dirs:
-                if os.path.exists(search_dir):
-                    try:
-                        for item in os.listdir(search_dir):
-                            if "firefox" in item.lower():
-                                full_path = os.path.join(search_dir, item)
-                                if os.path.isdir(full_path):
-                                    # For snap, check if it's the current version
-                                    if "snap" in search_dir and "firefox" in item:
-                                        current_path = os.path.join(full_path, "current")
-                                        if os.path.exists(current_path):
-                                            paths.append(current_path)
-                                        else:
-                                            paths.append(full_path)
-                                    else:
-                                        paths.append(full_path)
-                    except (PermissionError, OSError):
-                        continue
-            
-        # Remove duplicates and return only valid Firefox paths
-        unique_paths = []
-        for path in paths:
-            if path not in unique_paths and self.is_valid_firefox_path(path):
-                unique_paths.append(path)
-                
-        return unique_paths
-        
-    def is_valid_firefox_path(self, path):
-        executable = "firefox.exe" if platform.system() == "Windows" else "firefox"
-        return os.path.exists(os.path.join(path, executable))
-        
     def detect_profiles(self):
-        profiles = self.get_profile_paths()
-        
-        if not profiles:
-            self.log_message("No Firefox profiles found", error=True)
-            return
-            
-        if len(profiles) == 1:
-            self.profile_path.set(profiles[0])
-            self.save_config()
-            self.log_message(f"Profile selected: {os.path.basename(profiles[0])}")
-            return
-            
-        # Multiple profiles - show selection dialog
-        self.show_profile_selector(profiles)
+        # Profiles are discovered by the selector itself, on a worker
+        self.show_profile_selector()
         
-    def get_profile_paths(self):
-        system = platform.system()
-        
-        if system == "Windows":
-            profiles_dir = os.path.join(os.environ.get('APPDATA', ''), 
-                                       "Mozilla", "Firefox", "Profiles")
-        elif system == "Darwin":  # macOS
-            profiles_dir = os.path.expanduser(
-                "~/Library/Application Support/Firefox/Profiles")
-        elif system == "Linux":
-            profiles_dir = os.path.expanduser("~/.mozilla/firefox")
-        else:
-            return []
-            
-        profiles = []
-        if os.path.exists(profiles_dir):
-            for item in os.listdir(profiles_dir):
-                profile_path = os.path.join(profiles_dir, item)
-                if os.path.isdir(profile_path) and self.is_valid_profile_path(profile_path):
-                    profiles.append(profile_path)
-                    
-        return profiles
-        
-    def is_valid_profile_path(self, path):
-        return os.path.exists(os.path.join(path, "prefs.js"))
-        
-    def show_profile_selector(self, profiles):
+    def show_profile_selector(self):
         dialog = tk.Toplevel(self.root)
         dialog.title("Select Firefox Profile")
-        dialog.geometry("500x300")
+        dialog.geometry("820x460")
         dialog.transient(self.root)
         dialog.grab_set()
         
         ttk.Label(dialog, text="Select a Firefox profile:", 
-                 font=('Arial', 12, 'bold')).pack(pady=10)
-        
-        listbox = tk.Listbox(dialog, font=('Arial', 10))
-        listbox.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
-        
-        for profile in profiles:
-            display_name = f"{os.path.basename(profile)} ({profile})"
-            listbox.insert(tk.END, display_name)
-            
-        def on_select():
-            selection = listbox.curselection()
-            if selection:
-                selected_profile = profiles[selection[0]]
-                self.profile_path.set(selected_profile)
-                self.save_config()
-                self.log_message(f"Profile selected: {os.path.basename(selected_profile)}")
-                dialog.destroy()
-                
-        def on_cancel():
+                 font=('Arial', 12, 'bold')).pack(pady=(10, 5))
+
+        filter_frame = ttk.Frame(dialog)
+        filter_frame.pack(fill=tk.X, padx=20)
+        ttk.Label(filter_frame, text="Filter:").pack(side=tk.LEFT)
+        filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(filter_frame, textvariable=filter_var)
+        filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+        status_label = ttk.Label(dialog, text="Looking for profiles...", font=('Arial', 9), foreground='gray')
+        status_label.pack(anchor=tk.W, padx=20, pady=(5, 0))
+
+        def format_time(value):
+            return "…" if value is None else time.strftime("%Y-%m-%d %H:%M", time.localtime(value))
+
+        def format_size(value):
+            return "…" if value is None else f"{value / (1024 * 1024):.1f} MB"
+
+        table = VirtualTable(dialog, [("name", "Profile", 170, tk.W),
+                                      ("last_used", "Last used", 120, tk.W),
+                                      ("status", "fx-autoconfig", 100, tk.W),
+                                      ("size", "chrome/ size", 90, tk.E),
+                                      ("path", "Path", 300, tk.W)],
+                             key="path",
+                             formatters={'last_used': format_time, 'size': format_size,
+                                         'status': lambda v: "…" if v is None else v})
+        table.frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=5)
+
+        updates = queue.Queue()
+        stop = threading.Event()
+        state = {'found': 0, 'described': 0, 'done': False, 'touched': False}
+
+        def discover():
+            names = self.engine.get_profile_names()
+
+            def describe(path):
+                if not stop.is_set():
+                    try:
+                        updates.put(("meta", path, self.engine.get_profile_metadata(path)))
+                    except OSError:
+                        updates.put(("meta", path, {'status': "unreadable"}))
+
+            with ThreadPoolExecutor(max_workers=PROFILE_METADATA_WORKERS) as pool:
+                for path in self.engine.iter_profile_paths(names):
+                    if stop.is_set():
+                        break
+                    name = names.get(os.path.normcase(os.path.abspath(path)))
+                    updates.put(("add", path, name or os.path.basename(path).partition('.')[2] or os.path.basename(path)))
+                    pool.submit(describe, path)
+            updates.put(("done", None, None))
+
+        def poll():
+            if stop.is_set():
+                return
+            added = []
+            changed = False
+            try:
+                # Bounded per tick so a burst of results can't stall the dialog
+                for _ in range(500):
+                    kind, path, data = updates.get_nowait()
+                    if kind == "add":
+                        added.append({'path': path, 'name': data, 'last_used': None, 'status': None, 'size': None})
+                    elif kind == "meta":
+                        table.update_row(path, data)
+                        state['described'] += 1
+                        changed = True
+                    elif kind == "done":
+                        state['done'] = True
+            except queue.Empty:
+                pass
+            if added:
+                state['found'] += len(added)
+                table.add_rows(added)
+            elif changed and table.sort_column:
+                # Re-sort, the sorted column may just have got its values
+                table.apply_order()
+            elif changed:
+                table.refresh()
+
+            if state['done']:
+                if state['found'] == 0:
+                    self.log_message("No Firefox profiles found", error=True)
+                    close()
+                    return
+                if state['found'] == 1 and not state['touched']:
+                    use_profile(table.rows[0]['path'])
+                    return
+                status_label.config(text=f"{state['found']} profiles. Ctrl/Shift-click to select several for bulk actions")
+                return
+            status_label.config(text=f"Found {state['found']} profiles, read details of {state['described']}...")
+            dialog.after(PROFILE_PICKER_POLL_MS, poll)
+
+        def close():
+            stop.set()
             dialog.destroy()
-            
+
+        def use_profile(path):
+            self.profile_path.set(path)
+            self.save_config()
+            self.log_message(f"Profile selected: {os.path.basename(path)}")
+            close()
+
+        def on_select():
+            rows = table.selected_rows()
+            if len(rows) != 1:
+                messagebox.showinfo("Select Profile", "Select exactly one profile to use.", parent=dialog)
+                return
+            use_profile(rows[0]['path'])
+
+        def on_install():
+            rows = table.selected_rows()
+            if not rows:
+                return
+            firefox_path = self.firefox_path.get()
+            if not firefox_path or not self.engine.is_valid_firefox_path(firefox_path):
+                self.log_message("Please select Firefox installation directory", error=True)
+                return
+            if not messagebox.askyesno("Install to Selected Profiles",
+                                       f"Install fx-autoconfig into {len(rows)} profiles?", parent=dialog):
+                return
+            for row in rows:
+                settings = self.get_settings()
+                settings['profile_path'] = row['path']
+                self.submit_profile_install(settings, row['name'])
+
+        def on_clear_cache():
+            rows = table.selected_rows()
+            if not rows or not messagebox.askyesno(
+                    "Clear Startup Cache",
+                    f"Delete the startup cache of {len(rows)} profiles?\n\nFirefox must be closed. Continue?",
+                    parent=dialog):
+                return
+            for row in rows:
+                path = row['path']
+                cache_dir = self.engine.get_startup_cache_path(path)
+
+                def clear_thread(path=path, name=row['name']):
+                    try:
+                        self.engine.clear_startup_cache(path)
+                    except Exception as e:
+                        self.log_message(f"Failed to clear startup cache of {name}: {str(e)}", error=True)
+
+                self.engine.submit_job(f"Clear startup cache ({row['name']})",
+                                       [os.path.join(path, "chrome"), cache_dir], clear_thread)
+
+        def on_selection_change():
+            state['touched'] = True
+            count = len(table.selected)
+            select_btn.config(state=tk.NORMAL if count == 1 else tk.DISABLED)
+            install_btn.config(state=tk.NORMAL if count else tk.DISABLED)
+            clear_btn.config(state=tk.NORMAL if count else tk.DISABLED)
+
+        table.on_selection_change = on_selection_change
+        table.on_activate = lambda row: use_profile(row['path'])
+
+        filter_timer = {'id': None}
+
+        def on_filter_change(*args):
+            state['touched'] = True
+            # Debounced, so typing into a long list does not refilter on every key
+            if filter_timer['id']:
+                dialog.after_cancel(filter_timer['id'])
+            filter_timer['id'] = dialog.after(150, lambda: table.set_filter(filter_var.get()))
+
+        filter_var.trace_add("write", on_filter_change)
+
         button_frame = ttk.Frame(dialog)
         button_frame.pack(pady=10)
         
-        ttk.Button(button_frame, text="Select", command=on_select).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text="Cancel", command=on_cancel).pack(side=tk.LEFT, padx=5)
+        select_btn = ttk.Button(button_frame, text="Use Profile", command=on_select, state=tk.DISABLED)
+        select_btn.pack(side=tk.LEFT, padx=5)
+        install_btn = ttk.Button(button_frame, text="Install to Selected", command=on_install, state=tk.DISABLED)
+        install_btn.pack(side=tk.LEFT, padx=5)
+        clear_btn = ttk.Button(button_frame, text="Clear Startup Cache", command=on_clear_cache, state=tk.DISABLED)
+        clear_btn.pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Close", command=close).pack(side=tk.LEFT, padx=5)
+        dialog.protocol("WM_DELETE_WINDOW", close)
         
         # Center the dialog
         dialog.update_idletasks()
         x = (dialog.winfo_screenwidth() // 2) - (dialog.winfo_width() // 2)
         y = (dialog.winfo_screenheight() // 2) - (dialog.winfo_height() // 2)
         dialog.geometry(f"+{x}+{y}")
+        filter_entry.focus_set()
+
+        threading.Thread(target=discover, name="profile discovery", daemon=True).start()
+        dialog.after(PROFILE_PICKER_POLL_MS, poll)
+
+    def submit_profile_install(self, settings, name):
+        """Queue an install into one more profile with the current Firefox and custom file settings"""
+        progress = OperationProgress(f"Installing ({name})")
+
+        def install_thread():
+            try:
+                self.engine.install(settings)
+            except OperationCancelled:
+                self.log_message(f"Installation into {name} cancelled", error=True)
+                raise
+            except Exception as e:
+                self.log_message(f"Installation into {name} failed: {str(e)}", error=True)
+                raise
+
+        self.engine.submit_job(f"Install ({name})", self.engine.get_job_targets(settings), install_thread, progress)
         
     def validate_paths(self):
         if not self.firefox_path.get():
@@ -502,11 +1092,11 @@ The installer provides an easy way to set up fx-autoconfig for Firefox userChrom
             self.log_message("Please select Firefox profile directory", error=True)
             return False
         
-        if not self.is_valid_firefox_path(self.firefox_path.get()):
+        if not self.engine.is_valid_firefox_path(self.firefox_path.get()):
             self.log_message("Invalid Firefox installation directory", error=True)
             return False
         
-        if not self.is_valid_profile_path(self.profile_path.get()):
+        if not self.engine.is_valid_profile_path(self.profile_path.get()):
             self.log_message("Invalid Firefox profile directory", error=True)
             return False
         
@@ -518,7 +1108,7 @@ The installer provides an easy way to set up fx-autoconfig for Firefox userChrom
         
         # Check if we need elevation for Windows Program Files installation
         firefox_path = self.firefox_path.get()
-        if platform.system() == "Windows" and self.needs_elevation(firefox_path) and not self.is_admin():
+        if platform.system() == "Windows" and self.engine.needs_elevation(firefox_path) and not self.engine.is_admin():
             result = messagebox.askyesno(
                 "Administrator Privileges Required",
                 f"Firefox is installed in:\n{firefox_path}\n\n"
@@ -539,174 +1129,78 @@ The installer provides an easy way to set up fx-autoconfig for Firefox userChrom
             else:
                 self.log_message("Continuing without elevation (installation may fail)...", error=True)
             
+        settings = self.get_settings()
+        progress = OperationProgress("Installing")
+
         def install_thread():
             try:
-                self.log_message("Starting fx-autoconfig installation...")
-                  # Install program files
-                self.install_program_files()
-                self.log_message("Program files installed successfully")
-                
-                # Install profile files
-                self.install_profile_files()
-                self.log_message("Profile files installed successfully")
-                
-                # Copy/link custom files if specified
-                if self.custom_js_path.get() or self.custom_css_path.get():
-                    self.install_custom_files()
-                    self.log_message("Custom files processed successfully")
-                
-                self.log_message("fx-autoconfig installed successfully!")
+                self.engine.install(settings)
                 self.log_message("IMPORTANT: Clear startup cache and restart Firefox to complete installation")
                 
+            except OperationCancelled:
+                self.log_message(f"Installation cancelled after {progress.files_done} of {progress.total_files} files. "
+                                 "Run Install again to finish or Uninstall to remove the partial installation", error=True)
+                raise
             except Exception as e:
                 self.log_message(f"Installation failed: {str(e)}", error=True)
+                raise
                 
-        # Run installation in separate thread to prevent UI freezing
-        threading.Thread(target=install_thread, daemon=True).start()
-        
-    def install_program_files(self):
-        firefox_path = self.firefox_path.get()
-        
-        # Get repository root directory
-        repo_root = self.get_repo_root()
-        program_src = os.path.join(repo_root, "program")
-        
-        if not os.path.exists(program_src):
-            raise FileNotFoundError(f"Could not find program directory at {program_src}")
+        # Run installation on a worker to prevent UI freezing
+        self.engine.submit_job("Install", self.engine.get_job_targets(settings), install_thread, progress)
         
-        # On macOS, files should go to Contents/Resources/, not Contents/MacOS/
-        # According to README: "Copy defaults/ and config.js to /Applications/Firefox.app/Contents/Resources/"        if platform.system() == "Darwin" and firefox_path.endswith("MacOS"):
-            # Convert MacOS path to Resources path
-            firefox_path = firefox_path.replace("MacOS", "Resources")
-        
-        # Copy the contents of the program directory (not the directory itself)
-        # This follows the manual installation instructions from the README
-        self.copy_directory(program_src, firefox_path)
-    
-    def install_profile_files(self):
-        """Copy fx-autoconfig profile files from repository to Firefox profile"""
-        profile_path = self.profile_path.get()
-        chrome_dir = os.path.join(profile_path, "chrome")
-        
-        # Get repository root directory
-        repo_root = self.get_repo_root()
-        if not repo_root:
-            raise Exception("Could not find fx-autoconfig repository root")
-            
-        profile_src = os.path.join(repo_root, "profile", "chrome")
-        if not os.path.exists(profile_src):
-            raise Exception(f"Profile source directory not found: {profile_src}")
-        
-        # Copy the contents of the profile/chrome directory (not the directory itself)
-        # This follows the manual installation instructions from the README
-        self.log_message(f"Copying fx-autoconfig profile files from: {profile_src}")
-        self.copy_directory(profile_src, chrome_dir)
-        
-    def get_repo_root(self):
-        # Start from the directory containing this script
-        current_dir = Path(__file__).parent.absolute()
-        
-        # Look for program and profile directories to identify repository root
-        for i in range(10):  # Limit search depth
-            program_path = current_dir / "program"
-            profile_path = current_dir / "profile"
-            if program_path.exists() and profile_path.exists():
-                return str(current_dir)
-                
-            parent = current_dir.parent
-            if parent == current_dir:
-                break  # Reached filesystem root
-            current_dir = parent
-            
-        # Try fallback: assume we're in ui directory
-        fallback = Path(__file__).parent.parent
-        program_path = fallback / "program"
-        profile_path = fallback / "profile"
-        if program_path.exists() and profile_path.exists():
-            return str(fallback)
-            
-        # Repository root not found
-        return None
-        
-    def copy_directory(self, src, dst):
-        for root, dirs, files in os.walk(src):
-            # Calculate relative path
-            rel_path = os.path.relpath(root, src)
-            
-            # Create destination directory
-            if rel_path != '.':
-                dst_dir = os.path.join(dst, rel_path)
-            else:
-                dst_dir = dst
-            os.makedirs(dst_dir, exist_ok=True)
-              # Copy files
-            for file in files:
-                src_file = os.path.join(root, file)
-                dst_file = os.path.join(dst_dir, file)
-                shutil.copy2(src_file, dst_file)
-
-    def install_custom_files(self):
-        """Copy or symlink custom files from user-specified directories"""
-        profile_path = self.profile_path.get()
-        chrome_dir = os.path.join(profile_path, "chrome")
-        js_dir = os.path.join(chrome_dir, "JS")
-        css_dir = os.path.join(chrome_dir, "CSS")
-        
-        use_symlinks = self.use_symlinks.get()
-        
-        # Check if symlinks are supported if user wants to use them
-        if use_symlinks and not self.can_create_symlinks():
-            self.log_message("Warning: Symlinks not supported on this system, copying files instead")
-            use_symlinks = False
-        
-        # Process JS files directory - copy all contents to chrome/JS/
-        custom_js_path = self.custom_js_path.get()
-        if custom_js_path and os.path.exists(custom_js_path):
-            self.log_message(f"Processing scripts from: {custom_js_path}")
-            self._process_custom_directory(custom_js_path, js_dir, use_symlinks, 'scripts')
-          # Process CSS files directory - copy all contents to chrome/CSS/
-        custom_css_path = self.custom_css_path.get()
-        if custom_css_path and os.path.exists(custom_css_path):
-            self.log_message(f"Processing styles from: {custom_css_path}")
-            self._process_custom_directory(custom_css_path, css_dir, use_symlinks, 'styles')
-    
-    def _process_custom_directory(self, src_dir, dst_dir, use_symlinks, file_type):
-        """Helper method to copy all contents from a custom directory to destination"""
-        for root, dirs, files in os.walk(src_dir):
-            # Calculate relative path from source directory
-            rel_path = os.path.relpath(root, src_dir)
-            
-            # Create corresponding directory structure in destination
-            if rel_path == '.':
-                target_dir = dst_dir
-            else:
-                target_dir = os.path.join(dst_dir, rel_path)
-            
-            os.makedirs(target_dir, exist_ok=True)
-            
-            # Process all files in this directory
-            for file in files:
-                src_file = os.path.join(root, file)
-                dst_file = os.path.join(target_dir, file)
-                
-                # Remove existing file/link if it exists
-                if os.path.exists(dst_file) or os.path.islink(dst_file):
-                    if os.path.islink(dst_file):
-                        os.unlink(dst_file)
-                    else:
-                        os.remove(dst_file)
-                
-                # Create symlink or copy file
-                try:
-                    if use_symlinks:
-                        os.symlink(src_file, dst_file)
-                        self.log_message(f"Symlinked {file_type}: {file}")
-                    else:
-                        shutil.copy2(src_file, dst_file)
-                        self.log_message(f"Copied {file_type}: {file}")
-                except Exception as e:
-                    self.log_message(f"Failed to process {file}: {e}", error=True)
-                
+    def get_tracked_jobs(self):
+        """Running jobs that report progress, most recently started last"""
+        running, queued = self.engine.jobs.snapshot()
+        return [job for job in running if job.progress], running, queued
+
+    def refresh_progress(self):
+        """Poll the job executor from the Tk thread"""
+        tracked, running, queued = self.get_tracked_jobs()
+        if tracked:
+            progress = tracked[-1].progress
+            self.progress_bar['value'] = progress.fraction() * 100
+            text = progress.describe()
+            self.cancel_btn.config(state='disabled' if progress.cancel_event.is_set() else 'normal')
+        else:
+            self.progress_bar['value'] = 0
+            text = ", ".join(f"{job.name}: running" for job in running)
+            self.cancel_btn.config(state='disabled')
+        if queued:
+            text += f"{' | ' if text else ''}{len(queued)} queued: {', '.join(job.name for job in queued)}"
+        self.progress_label.config(text=text)
+        self.root.after(200, self.refresh_progress)
+
+    def cancel_operation(self):
+        tracked, running, queued = self.get_tracked_jobs()
+        if tracked:
+            tracked[-1].progress.cancel()
+            self.cancel_btn.config(state='disabled')
+            self.log_message("Cancelling after the current file...")
+
+    def on_close(self):
+        """Let queued work drain, or cancel it at a file boundary, before closing"""
+        if self.engine.jobs.is_idle():
+            self.root.destroy()
+            return
+        result = messagebox.askyesnocancel(
+            "Operations Running",
+            "Installer operations are still running or queued.\n\n"
+            "Yes: finish them, then close\n"
+            "No: cancel them after the current file, then close\n"
+            "Cancel: keep the installer open"
+        )
+        if result is None:
+            return
+        self.engine.jobs.shutdown(cancel=not result)
+        self.log_message("Closing when running operations have stopped...")
+        self.wait_for_jobs_then_close()
+
+    def wait_for_jobs_then_close(self):
+        if self.engine.jobs.is_idle():
+            self.root.destroy()
+        else:
+            self.root.after(200, self.wait_for_jobs_then_close)
+
     def uninstall_autoconfig(self):
         if not self.validate_paths():
             return
@@ -803,11 +1297,9 @@ The installer provides an easy way to set up fx-autoconfig for Firefox userChrom
     
     def _perform_uninstall(self, complete_uninstall=False):
         """Perform the actual uninstallation"""
-        uninstall_type = "complete" if complete_uninstall else "partial"
-        
         # Check if we need elevation for Windows Program Files uninstallation
         firefox_path = self.firefox_path.get()
-        if platform.system() == "Windows" and self.needs_elevation(firefox_path) and not self.is_admin():
+        if platform.system() == "Windows" and self.engine.needs_elevation(firefox_path) and not self.engine.is_admin():
             result = messagebox.askyesno(
                 "Administrator Privileges Required",
                 f"Firefox is installed in:\n{firefox_path}\n\n"
@@ -847,232 +1339,36 @@ The installer provides an easy way to set up fx-autoconfig for Firefox userChrom
             if not result:
                 return
         
+        settings = self.get_settings()
+        progress = OperationProgress("Uninstalling")
+
         def uninstall_thread():
             try:
-                self.log_message(f"Starting {uninstall_type} fx-autoconfig uninstallation...")
-                  # Remove program files - only remove files that exist in the repository
-                firefox_path = self.firefox_path.get()
-                
-                # On macOS, files are in Contents/Resources/, not Contents/MacOS/
-                if platform.system() == "Darwin" and firefox_path.endswith("MacOS"):
-                    firefox_path = firefox_path.replace("MacOS", "Resources")
-                
-                # Remove only the specific files that fx-autoconfig installs
-                repo_root = self.get_repo_root()
-                if repo_root:
-                    self._remove_program_files(firefox_path, repo_root)
-                else:
-                    self.log_message("Warning: Could not find repository root, skipping program file removal", error=True)
-                  # Handle profile files based on uninstall type
-                profile_path = self.profile_path.get()
-                chrome_dir = os.path.join(profile_path, "chrome")
-                
-                if complete_uninstall:
-                    # Carefully remove only fx-autoconfig files, preserve existing user files
-                    self._remove_fx_autoconfig_files(chrome_dir)
-                else:
-                    # Remove only utils directory (preserve user scripts)
-                    utils_dir = os.path.join(chrome_dir, "utils")
-                    if os.path.exists(utils_dir):
-                        self._safe_remove_directory(utils_dir)
-                        self.log_message("Removed utils directory (user scripts preserved)")
-                
-                self.log_message(f"fx-autoconfig {uninstall_type} uninstallation completed successfully")
+                self.engine.uninstall(settings, complete_uninstall)
                 
                 if complete_uninstall:
                     self.log_message("fx-autoconfig files removed while preserving existing user files")
                 else:
                     self.log_message("Your custom scripts and styles have been preserved")
                 
+            except OperationCancelled:
+                self.log_message(f"Uninstallation cancelled after {progress.files_done} of {progress.total_files} files. "
+                                 "Run Uninstall again to finish or Install to restore the removed files", error=True)
+                raise
             except Exception as e:
                 self.log_message(f"Uninstallation failed: {str(e)}", error=True)
+                raise
                 
-        threading.Thread(target=uninstall_thread, daemon=True).start()
-        
-    def _safe_remove_directory(self, directory_path):
-        """Safely remove a directory, handling symlinks properly"""
-        if not os.path.exists(directory_path):
-            return
-            
-        # Walk through all files and subdirectories
-        for root, dirs, files in os.walk(directory_path, topdown=False):
-            # Remove files (handle symlinks properly)
-            for file in files:
-                file_path = os.path.join(root, file)
-                if os.path.islink(file_path):
-                    # Remove symlink, not the target
-                    os.unlink(file_path)
-                    self.log_message(f"Removed symlink: {file}")
-                else:
-                    # Remove regular file
-                    os.remove(file_path)
-                    self.log_message(f"Removed file: {file}")
-            
-            # Remove empty directories
-            for dir_name in dirs:
-                dir_path = os.path.join(root, dir_name)
-                if os.path.islink(dir_path):
-                    # Remove directory symlink
-                    os.unlink(dir_path)
-                    self.log_message(f"Removed directory symlink: {dir_name}")
-                else:
-                    try:
-                        os.rmdir(dir_path)
-                        self.log_message(f"Removed directory: {dir_name}")
-                    except OSError:
-                        # Directory not empty, skip
-                        pass
-        
-        # Finally remove the root directory if empty
-        try:
-            os.rmdir(directory_path)
-        except OSError:
-            # Directory not empty, that's okay
-            pass
-    
-    def _remove_fx_autoconfig_files(self, chrome_dir):
-        """Remove fx-autoconfig files based on correct assumptions:
-        1. CSS/ and JS/ folders can be completely removed (user-provided files)
-        2. Other files: only remove if they exist in fx-autoconfig repository
-        """
-        if not os.path.exists(chrome_dir):
-            self.log_message("Chrome directory does not exist")
-            return
-        
-        removed_count = 0
-        
-        # 1. Completely remove CSS and JS directories (user-provided files)
-        user_dirs = ['CSS', 'JS']
-        for dir_name in user_dirs:
-            dir_path = os.path.join(chrome_dir, dir_name)
-            if os.path.exists(dir_path):
-                file_count = sum([len(files) for r, d, files in os.walk(dir_path)])
-                self._safe_remove_directory(dir_path)
-                self.log_message(f"Removed {dir_name}/ directory with {file_count} files")
-                removed_count += file_count
-        
-        # 2. Get repository root to check what files fx-autoconfig actually installs
-        repo_root = self.get_repo_root()
-        profile_src = os.path.join(repo_root, "profile", "chrome")
-        
-        if not os.path.exists(profile_src):
-            self.log_message("Warning: Could not find fx-autoconfig profile source for comparison")
-            return
-        
-        # 3. Remove only files that exist in the fx-autoconfig repository
-        for root, dirs, files in os.walk(profile_src):
-            # Calculate relative path from profile/chrome/
-            rel_path = os.path.relpath(root, profile_src)
-            
-            # Skip CSS and JS directories (already handled above)
-            if rel_path.startswith('CSS') or rel_path.startswith('JS'):
-                continue
-            
-            # Determine target directory in user's profile
-            if rel_path == '.':
-                target_dir = chrome_dir
-            else:
-                target_dir = os.path.join(chrome_dir, rel_path)
-            
-            # Remove files that exist in fx-autoconfig repository
-            for file in files:
-                target_file = os.path.join(target_dir, file)
-                if os.path.exists(target_file) or os.path.islink(target_file):
-                    if os.path.islink(target_file):
-                        os.unlink(target_file)
-                        self.log_message(f"Removed fx-autoconfig symlink: {os.path.join(rel_path, file)}")
-                    else:
-                        os.remove(target_file)
-                        self.log_message(f"Removed fx-autoconfig file: {os.path.join(rel_path, file)}")
-                    removed_count += 1
-        
-        # 4. Remove empty directories that were created by fx-autoconfig
-        # Walk through repository structure to identify fx-autoconfig directories
-        for root, dirs, files in os.walk(profile_src, topdown=False):
-            rel_path = os.path.relpath(root, profile_src)
-            
-            # Skip CSS and JS directories (already removed)
-            if rel_path.startswith('CSS') or rel_path.startswith('JS') or rel_path == '.':
-                continue
-            
-            target_dir = os.path.join(chrome_dir, rel_path)
-            if os.path.exists(target_dir):
-                try:
-                    # Only remove if directory is empty (no user files)
-                    if not os.listdir(target_dir):
-                        os.rmdir(target_dir)
-                        self.log_message(f"Removed empty fx-autoconfig directory: {rel_path}")
-                    else:
-                        remaining = os.listdir(target_dir)
-                        self.log_message(f"Preserved directory {rel_path}/ with {len(remaining)} user files")
-                except OSError:
-                    pass
-        
-        # 5. Check if chrome directory itself can be removed
-        try:
-            if os.path.exists(chrome_dir) and not os.listdir(chrome_dir):
-                os.rmdir(chrome_dir)
-                self.log_message("Removed empty chrome directory")
-            elif os.path.exists(chrome_dir):
-                remaining = os.listdir(chrome_dir)
-                self.log_message(f"Preserved chrome directory with {len(remaining)} user items")
-        except OSError:
-            pass
-        
-        self.log_message(f"Complete uninstall summary: {removed_count} fx-autoconfig files removed")
-    
-    def _remove_program_files(self, firefox_path, repo_root):
-        """Remove only program files that exist in the fx-autoconfig repository"""
-        program_src = os.path.join(repo_root, "program")
+        self.engine.submit_job("Uninstall", self.engine.get_job_targets(settings), uninstall_thread, progress)
         
-        # Walk through the repository program directory to find what files to remove
-        for root, dirs, files in os.walk(program_src):
-            rel_path = os.path.relpath(root, program_src)
-            
-            # Calculate target directory in Firefox installation
-            if rel_path == '.':
-                target_dir = firefox_path
-            else:
-                target_dir = os.path.join(firefox_path, rel_path)
-            
-            # Remove files that exist in the repository
-            for file in files:
-                target_file = os.path.join(target_dir, file)
-                
-                if os.path.exists(target_file):
-                    try:
-                        os.remove(target_file)
-                        self.log_message(f"Removed program file: {os.path.join(rel_path, file) if rel_path != '.' else file}")
-                    except Exception as e:
-                        self.log_message(f"Failed to remove {target_file}: {e}", error=True)
-        
-        # Clean up empty directories that we created (but don't remove existing directories)
-        # Only remove the specific subdirectories that fx-autoconfig created
-        defaults_pref_dir = os.path.join(firefox_path, "defaults", "pref")
-        defaults_dir = os.path.join(firefox_path, "defaults")
-        
-        # Remove defaults/pref if it's empty and was created by fx-autoconfig
-        if os.path.exists(defaults_pref_dir) and not os.listdir(defaults_pref_dir):
-            try:
-                os.rmdir(defaults_pref_dir)
-                self.log_message("Removed empty defaults/pref directory")
-            except Exception as e:
-                self.log_message(f"Could not remove defaults/pref directory: {e}")
-        
-        # Remove defaults if it's empty and was created by fx-autoconfig
-        if os.path.exists(defaults_dir) and not os.listdir(defaults_dir):
-            try:
-                os.rmdir(defaults_dir)
-                self.log_message("Removed empty defaults directory")
-            except Exception as e:                self.log_message(f"Could not remove defaults directory: {e}")
-    
     def clear_startup_cache(self):
         if not self.profile_path.get():
             self.log_message("Please select a profile directory first", error=True)
             return
         
         # Get the correct startup cache location based on platform
-        cache_dir = self.get_startup_cache_path()
+        profile_path = self.profile_path.get()
+        cache_dir = self.engine.get_startup_cache_path(profile_path)
         
         if not cache_dir:
             self.log_message("Could not determine startup cache location", error=True)
@@ -1090,35 +1386,16 @@ The installer provides an easy way to set up fx-autoconfig for Firefox userChrom
         
         if not result:
             return
-            
-        try:
-            shutil.rmtree(cache_dir)
-            self.log_message("Startup cache cleared successfully")
-            self.log_message("Restart Firefox to apply changes")
-        except Exception as e:
-            self.log_message(f"Failed to clear startup cache: {str(e)}", error=True)
+
+        def clear_cache_thread():
+            try:
+                self.engine.clear_startup_cache(profile_path)
+                self.log_message("Restart Firefox to apply changes")
+            except Exception as e:
+                self.log_message(f"Failed to clear startup cache: {str(e)}", error=True)
+
+        self.engine.submit_job("Clear startup cache", [os.path.join(profile_path, "chrome"), cache_dir], clear_cache_thread)
     
-    def get_startup_cache_path(self):
-        """Get the correct startup cache path for the current platform"""
-        profile_path = self.profile_path.get()
-        if not profile_path:
-            return None
-        
-        system = platform.system()
-        
-        if system == "Windows":
-            # On Windows, startup cache is in Local AppData, not Roaming
-            profile_name = os.path.basename(profile_path)
-            cache_dir = os.path.join(
-                os.environ.get('LOCALAPPDATA', ''),
-                "Mozilla", "Firefox", "Profiles", profile_name, "startupCache"
-            )
-        else:
-            # On macOS and Linux, startup cache is in the profile directory
-            cache_dir = os.path.join(profile_path, "startupCache")
-        
-        return cache_dir
-            
     def open_profile_folder(self):
         if not self.profile_path.get():
             self.log_message("Please select a profile directory first", error=True)
@@ -1150,10 +1427,372 @@ The installer provides an easy way to set up fx-autoconfig for Firefox userChrom
             
         except Exception as e:
             self.log_message(f"Failed to open file manager: {str(e)}", error=True)
-    
+
+    def analyze_startup_overhead(self):
+        if not self.profile_path.get():
+            self.log_message("Please select a profile directory first", error=True)
+            return
+
+        profile_path = self.profile_path.get()
+
+        def analyze_thread():
+            try:
+                report = self.engine.collect_startup_overhead(profile_path)
+                self.engine.log_startup_overhead_report(report)
+            except Exception as e:
+                self.log_message(f"Startup analysis failed: {str(e)}", error=True)
+
+        self.engine.submit_job("Analyze startup overhead", [os.path.join(profile_path, "chrome")], analyze_thread)
+
+    def manage_scripts(self):
+        if not self.profile_path.get():
+            self.log_message("Please select a profile directory first", error=True)
+            return
+
+        current_profile = self.profile_path.get()
+        prefs = self.engine.read_profile_prefs(current_profile, [PREF_ENABLED, PREF_SCRIPTSDISABLED])
+        disabled_scripts = set(filter(None, str(prefs.get(PREF_SCRIPTSDISABLED, "")).split(",")))
+        filenames = sorted({os.path.basename(p) for p, _ in self.engine.iter_loader_files(current_profile)} | disabled_scripts)
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Enable / Disable Scripts")
+        dialog.geometry("650x600")
+        dialog.transient(self.root)
+        dialog.grab_set()
+
+        main_frame = ttk.Frame(dialog, padding=10)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(main_frame, text="Scripts and styles (double-click to cycle the action):",
+                  font=('Arial', 10, 'bold')).pack(anchor=tk.W)
+
+        tree = ttk.Treeview(main_frame, columns=('state', 'action'), height=12)
+        tree.heading('#0', text="File")
+        tree.heading('state', text="Current")
+        tree.heading('action', text="Action")
+        tree.column('#0', width=380)
+        tree.column('state', width=90)
+        tree.column('action', width=90)
+        tree.pack(fill=tk.BOTH, expand=True, pady=(5, 5))
+        for filename in filenames:
+            state = "disabled" if filename in disabled_scripts else "enabled"
+            tree.insert('', tk.END, iid=filename, text=filename, values=(state, "keep"))
+
+        def set_action(action):
+            for item in tree.selection():
+                tree.set(item, 'action', action)
+
+        def cycle_action(event):
+            item = tree.identify_row(event.y)
+            if item:
+                next_action = {"keep": "enable", "enable": "disable", "disable": "keep"}
+                tree.set(item, 'action', next_action[tree.set(item, 'action')])
+
+        tree.bind('<Double-1>', cycle_action)
+
+        action_frame = ttk.Frame(main_frame)
+        action_frame.pack(fill=tk.X)
+        ttk.Button(action_frame, text="Enable selected", command=lambda: set_action("enable")).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(action_frame, text="Disable selected", command=lambda: set_action("disable")).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(action_frame, text="Keep selected", command=lambda: set_action("keep")).pack(side=tk.LEFT)
+
+        loader_state = tk.StringVar(value="keep")
+        loader_frame = ttk.Frame(main_frame)
+        loader_frame.pack(fill=tk.X, pady=(10, 0))
+        current_loader = "enabled" if prefs.get(PREF_ENABLED, True) is not False else "disabled"
+        ttk.Label(loader_frame, text=f"Loader ({PREF_ENABLED}, currently {current_loader}):").pack(side=tk.LEFT)
+        for text, value in (("Keep", "keep"), ("Enable", "enable"), ("Disable", "disable")):
+            ttk.Radiobutton(loader_frame, text=text, variable=loader_state, value=value).pack(side=tk.LEFT, padx=(5, 0))
+
+        ttk.Label(main_frame, text="Apply to profiles (Ctrl/Shift-click to select several):",
+                  font=('Arial', 10, 'bold')).pack(anchor=tk.W, pady=(10, 0))
+        profiles = self.engine.get_profile_paths()
+        if current_profile not in profiles:
+            profiles.insert(0, current_profile)
+        profile_list = tk.Listbox(main_frame, selectmode=tk.EXTENDED, height=5, font=('Arial', 10))
+        profile_list.pack(fill=tk.X, pady=(5, 5))
+        for index, profile in enumerate(profiles):
+            profile_list.insert(tk.END, f"{os.path.basename(profile)} ({profile})")
+            if profile == current_profile:
+                profile_list.selection_set(index)
+
+        use_user_js = tk.BooleanVar(value=False)
+        ttk.Checkbutton(main_frame, text="Write to user.js instead of prefs.js (overrides in-browser toggles on every start)",
+                        variable=use_user_js).pack(anchor=tk.W)
+
+        def on_apply():
+            enable = [i for i in tree.get_children() if tree.set(i, 'action') == "enable"]
+            disable = [i for i in tree.get_children() if tree.set(i, 'action') == "disable"]
+            targets = [profiles[i] for i in profile_list.curselection()]
+            loader_enabled = {"keep": None, "enable": True, "disable": False}[loader_state.get()]
+            if not targets:
+                messagebox.showwarning("No Profiles Selected", "Select at least one profile.", parent=dialog)
+                return
+            write_user_js = use_user_js.get()
+            dialog.destroy()
+            # Profile directories are the job targets, as for an import that also writes prefs.js
+            self.engine.submit_job("Enable/disable scripts", targets,
+                                   lambda: self.engine.apply_script_toggles(targets, enable, disable,
+                                                                            loader_enabled, write_user_js))
+
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=(10, 0))
+        ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.RIGHT, padx=(5, 0))
+        ttk.Button(button_frame, text="Apply", command=on_apply).pack(side=tk.RIGHT)
+
+    def verify_installation(self):
+        if not self.validate_paths():
+            return
+        repo_root = self.engine.get_repo_root()
+        if not repo_root:
+            self.log_message("Could not find fx-autoconfig repository root", error=True)
+            return
+        settings = self.get_settings()
+        targets = self.engine.get_job_targets(settings)
+
+        def verify_thread():
+            try:
+                self.log_message("Verifying installed fx-autoconfig files...")
+                results = self.engine.run_verification(repo_root, settings)
+                for label, key in (("Mismatched", 'mismatch'), ("Missing", 'missing')):
+                    for rel_path, src_file, dst_file in results[key]:
+                        self.log_message(f"{label}: {dst_file}", error=True)
+                for extra in results['extra']:
+                    self.log_message(f"Extra file not shipped by fx-autoconfig: {extra}", error=True)
+                self.log_message(f"Verification finished: {len(results['ok'])} ok, {len(results['mismatch'])} mismatched, "
+                                 f"{len(results['missing'])} missing, {len(results['extra'])} extra")
+                broken = results['mismatch'] + results['missing']
+                if broken:
+                    self.root.after(0, lambda: self.offer_repair(broken, targets))
+            except Exception as e:
+                self.log_message(f"Verification failed: {str(e)}", error=True)
+
+        self.engine.submit_job("Verify installation", targets, verify_thread)
+
+    def offer_repair(self, broken, targets):
+        settings = self.get_settings()
+        result = messagebox.askyesno(
+            "Repair Installation",
+            f"{len(broken)} installed files are missing or differ from their source.\n\n"
+            "Copy just these files again?"
+        )
+        if not result:
+            return
+
+        def repair_thread():
+            repaired = 0
+            batch = self.engine.new_sync_batch(settings)
+            for rel_path, src_file, dst_file in broken:
+                try:
+                    os.makedirs(os.path.dirname(dst_file), exist_ok=True)
+                    batch.copy(src_file, dst_file)
+                    repaired += 1
+                    self.log_message(f"Repaired: {dst_file}")
+                except Exception as e:
+                    self.log_message(f"Failed to repair {dst_file}: {e}", error=True)
+            batch.flush()
+            self.log_message(f"Repaired {repaired} of {len(broken)} files")
+
+        self.engine.submit_job("Repair installation", targets, repair_thread)
+
+    def cleanup_chrome(self):
+        if not self.profile_path.get():
+            self.log_message("Please select a profile directory first", error=True)
+            return
+        chrome_dir = os.path.join(self.profile_path.get(), "chrome")
+        if not os.path.isdir(chrome_dir):
+            self.log_message(f"No chrome directory in {self.profile_path.get()}", error=True)
+            return
+
+        def scan_thread():
+            modified = []
+            try:
+                garbage = self.engine.find_chrome_garbage(chrome_dir, modified)
+            except Exception as e:
+                self.log_message(f"Cleanup scan failed: {str(e)}", error=True)
+                return
+            for path, reason in modified:
+                self.log_message(f"Kept {os.path.relpath(path, chrome_dir)} ({reason}), "
+                                 f"delete it yourself if the changes are not needed", error=True)
+            if not garbage:
+                self.log_message(f"Nothing to clean up in {chrome_dir}")
+                return
+            for path, reason in garbage:
+                self.log_message(f"Would remove {os.path.relpath(path, chrome_dir)} ({reason})")
+            self.root.after(0, lambda: self.confirm_chrome_cleanup(chrome_dir, garbage))
+
+        self.engine.submit_job("Clean up chrome/", [chrome_dir], scan_thread)
+
+    def confirm_chrome_cleanup(self, chrome_dir, garbage):
+        links = sum(1 for path, reason in garbage if reason == "dangling link")
+        dirs = sum(1 for path, reason in garbage if reason == "empty directory")
+        orphans = len(garbage) - links - dirs
+        result = messagebox.askyesno(
+            "Clean Up chrome/",
+            f"Found {links} dangling links, {orphans} copies of removed custom files "
+            f"and {dirs} empty directories (listed in the status log).\n\n"
+            "Remove them all?"
+        )
+        if not result:
+            self.log_message("Cleanup cancelled, nothing was removed")
+            return
+
+        def remove_thread():
+            removed = self.engine.remove_chrome_garbage(chrome_dir, garbage)
+            self.log_message(f"Removed {removed} of {len(garbage)} entries from {chrome_dir}")
+
+        self.engine.submit_job("Clean up chrome/", [chrome_dir], remove_thread)
+
+    def export_setup(self):
+        if not self.profile_path.get():
+            self.log_message("Please select a profile directory first", error=True)
+            return
+        profile_path = self.profile_path.get()
+        chrome_dir = os.path.join(profile_path, "chrome")
+        if not os.path.isdir(chrome_dir):
+            self.log_message(f"No chrome directory in {profile_path}", error=True)
+            return
+        archive_path = filedialog.asksaveasfilename(
+            title="Export fx-autoconfig Setup",
+            defaultextension=".tar.gz",
+            initialfile=f"fx-autoconfig-{os.path.basename(os.path.normpath(profile_path))}.tar.gz",
+            filetypes=[("gzip tar archive", "*.tar.gz"), ("xz tar archive", "*.tar.xz")]
+        )
+        if not archive_path:
+            return
+        progress = OperationProgress("Exporting")
+
+        def export_thread():
+            try:
+                progress.set_totals(*self.engine.scan_directory(chrome_dir))
+                self.engine.export_chrome_setup(profile_path, archive_path)
+                self.log_message(f"Exported {progress.files_done} files to {archive_path}")
+            except OperationCancelled:
+                self.log_message("Export cancelled, no archive was written", error=True)
+                raise
+            except Exception as e:
+                self.log_message(f"Export failed: {str(e)}", error=True)
+                raise
+
+        self.engine.submit_job("Export setup", [chrome_dir], export_thread, progress)
+
+    def import_setup(self):
+        if not self.profile_path.get():
+            self.log_message("Please select a profile directory first", error=True)
+            return
+        profile_path = self.profile_path.get()
+        archive_path = filedialog.askopenfilename(
+            title="Import fx-autoconfig Setup",
+            filetypes=[("tar archives", "*.tar.gz *.tgz *.tar.xz *.txz"), ("All files", "*.*")]
+        )
+        if not archive_path:
+            return
+        chrome_dir = os.path.join(profile_path, "chrome")
+        durability = self.durability.get()
+        progress = OperationProgress("Importing")
+
+        def import_thread():
+            try:
+                progress.set_totals(0, os.path.getsize(archive_path))
+                stats = self.engine.import_chrome_setup(profile_path, archive_path, durability)
+                self.log_message(f"Imported {archive_path}: {stats['written']} files written, "
+                                 f"{stats['identical']} already identical, {stats['links']} links restored, "
+                                 f"{stats['copied_links']} files copied in place of unavailable links, "
+                                 f"{stats['prefs']} prefs changed")
+                if stats['skipped']:
+                    self.log_message(f"Skipped {stats['skipped']} archive entries that do not belong in chrome/",
+                                     error=True)
+                self.log_message("Clear startup cache and restart Firefox to load the imported setup")
+            except OperationCancelled:
+                self.log_message("Import cancelled, files restored so far were kept", error=True)
+                raise
+            except Exception as e:
+                self.log_message(f"Import failed: {str(e)}", error=True)
+                raise
+
+        # prefs.js lives next to chrome/, a script toggle job on this profile must not run alongside
+        self.engine.submit_job("Import setup", [profile_path, chrome_dir], import_thread, progress)
+
+    def show_test_profile_dialog(self):
+        if not self.engine.get_repo_root():
+            self.log_message("Could not find fx-autoconfig repository root", error=True)
+            return
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Create Test Profiles")
+        dialog.transient(self.root)
+        dialog.grab_set()
+
+        main_frame = ttk.Frame(dialog, padding=20)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(main_frame, text="Template:").grid(row=0, column=0, sticky=tk.W)
+        template = tk.StringVar(value="Firefox")
+        ttk.Combobox(main_frame, textvariable=template, values=list(TEST_PROFILE_TEMPLATES),
+                     state='readonly', width=15).grid(row=0, column=1, sticky=tk.W, padx=(5, 0))
+
+        ttk.Label(main_frame, text="Number of profiles:").grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        count = tk.IntVar(value=4)
+        ttk.Spinbox(main_frame, from_=1, to=200, textvariable=count, width=6).grid(
+            row=1, column=1, sticky=tk.W, padx=(5, 0), pady=(5, 0))
+
+        def on_create():
+            try:
+                number = count.get()
+            except tk.TclError:
+                number = 0
+            if number < 1:
+                messagebox.showwarning("Invalid Number", "Enter a number of profiles.", parent=dialog)
+                return
+            template_name = template.get()
+            dialog.destroy()
+            progress = OperationProgress("Creating test profiles")
+            progress.set_totals(number, 0)
+
+            def create_thread():
+                try:
+                    profiles = self.engine.create_test_profiles(template_name, number)
+                    executable = "thunderbird" if template_name == "Thunderbird" else "firefox"
+                    for profile in profiles[:3]:
+                        self.log_message(f'Run: {executable} -no-remote -profile "{profile}"')
+                except OperationCancelled:
+                    self.log_message("Creating test profiles cancelled, use Remove Test Profiles to clean up", error=True)
+                    raise
+                except Exception as e:
+                    self.log_message(f"Failed to create test profiles: {e}", error=True)
+                    raise
+
+            self.engine.submit_job("Create test profiles", [tempfile.gettempdir()], create_thread, progress)
+
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=2, column=0, columnspan=2, sticky=tk.E, pady=(15, 0))
+        ttk.Button(button_frame, text="Create", command=on_create).pack(side=tk.LEFT)
+        ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=(5, 0))
+
+    def remove_test_profiles(self):
+        roots = self.engine.find_test_profile_roots()
+        if not roots:
+            self.log_message("No test profiles to remove")
+            return
+        result = messagebox.askyesno(
+            "Remove Test Profiles",
+            f"Delete {len(roots)} test profile directories from {tempfile.gettempdir()}?\n\n"
+            "Firefox must not be running with any of them."
+        )
+        if not result:
+            return
+
+        def remove_thread():
+            for root in roots:
+                # rmtree only drops hardlinks, the repository files are untouched
+                shutil.rmtree(root, ignore_errors=True)
+                self.log_message(f"Removed test profiles: {root}")
+
+        self.engine.submit_job("Remove test profiles", [tempfile.gettempdir()], remove_thread)
+
     def validate_repository(self):
         """Validate that the fx-autoconfig repository structure is available"""
-        repo_root = self.get_repo_root()
+        repo_root = self.engine.get_repo_root()
         if not repo_root:
             self.show_repository_error()
             return False
@@ -1220,32 +1859,6 @@ The installer provides an easy way to set up fx-autoconfig for Firefox userChrom
         
         return content.strip()
     
-    def is_admin(self):
-        """Check if the current process has admin privileges on Windows"""
-        if platform.system() != "Windows":
-            return True  # Non-Windows systems don't need UAC elevation
-        
-        try:
-            import ctypes
-            return ctypes.windll.shell32.IsUserAnAdmin()
-        except:
-            return False
-    
-    def needs_elevation(self, firefox_path):
-        """Check if the Firefox installation path requires admin privileges"""
-        if platform.system() != "Windows":
-            return False
-        
-        # Common paths that typically require elevation
-        program_files_paths = [
-            "C:\\Program Files\\",
-            "C:\\Program Files (x86)\\",
-            os.environ.get('PROGRAMFILES', '').lower(),
-            os.environ.get('PROGRAMFILES(X86)', '').lower()        ]
-        
-        firefox_path_lower = firefox_path.lower()
-        return any(firefox_path_lower.startswith(path.lower()) for path in program_files_paths if path)
-    
     def request_elevation(self):
         """Restart the application with elevated privileges"""
         if platform.system() != "Windows":
@@ -1285,9 +1898,25 @@ The installer provides an easy way to set up fx-autoconfig for Firefox userChrom
             return False
 
 def main():
+    parser = argparse.ArgumentParser(description="fx-autoconfig GUI installer")
+    parser.add_argument("--benchmark-durability", metavar="DIR", nargs="?", const=tempfile.gettempdir(),
+                        help="time copying files at each durability level in DIR and exit")
+    args = parser.parse_args()
+    if args.benchmark_durability:
+        engine = FxAutoconfigEngine()
+        results = engine.benchmark_durability(args.benchmark_durability)
+        baseline = results[DURABILITY_NONE] or 1e-9
+        for level, seconds in results.items():
+            print(f"{level:>8}: {seconds * 1000:8.1f} ms ({seconds / baseline:.1f}x)")
+        return
+
+    if tk is None:
+        sys.exit("The installer GUI needs Tkinter, install your distribution's python3-tk package")
     root = tk.Tk()
     app = FxAutoconfigInstaller(root)
     root.mainloop()
+    # Preset writes are debounced, don't lose the last change
+    app.presets.flush()
 
 if __name__ == "__main__":
     main()
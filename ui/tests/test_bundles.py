@@ -0,0 +1,137 @@
+import json
+import os
+import tempfile
+import unittest
+
+from fx_autoconfig import PREF_SCRIPTSDISABLED, FxAutoconfigEngine
+from fx_autoconfig.engine import BUNDLE_DIR, BUNDLE_MANIFEST, JS_LINE_BREAK_RE
+
+BODY = "(() => {\n  window.ran = (window.ran || 0) + 1;\n})();\n"
+
+
+def script(*header_lines, body=BODY):
+    lines = ["// ==UserScript==", "// @name test"] + list(header_lines) + ["// ==/UserScript==", ""]
+    return "\n".join(lines) + body
+
+
+class BundleGroupTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.profile = self.tmp.name
+        self.js_dir = os.path.join(self.profile, "chrome", "JS")
+        os.makedirs(self.js_dir)
+        self.engine = FxAutoconfigEngine()
+        self.engine.log_message = lambda message, error=False: None
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, filename, text):
+        with open(os.path.join(self.js_dir, filename), 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+
+    def group_names(self):
+        groups = self.engine.collect_bundle_groups(self.profile)
+        return {pattern: [entry['filename'] for entry in scripts] for pattern, scripts in groups.items()}
+
+    def test_groups_follow_include_exclude_and_load_order(self):
+        self.write("a.uc.js", script("// @include main", "// @loadOrder 20"))
+        self.write("b.uc.js", script("// @include main"))
+        self.write("c.uc.js", script())
+        self.write("d.uc.js", script("// @include main", "// @exclude chrome://browser/content/places/*"))
+        self.write("e.uc.js", script("// @include chrome://browser/content/places/*"))
+        groups = self.group_names()
+        self.assertEqual(sorted(groups.values()), [["b.uc.js", "c.uc.js", "a.uc.js"], ["d.uc.js"], ["e.uc.js"]])
+
+    def test_skips_scripts_the_loader_handles_alone(self):
+        self.write("a.uc.js", script())
+        self.write("b.uc.js", script("// @onlyonce"))
+        self.write("c.uc.js", script("// @backgroundmodule"))
+        self.write("d.uc.js", script("// @ignorecache"))
+        self.write("e.uc.js", script(body="var shared = 1;\n"))
+        self.write("f.uc.js", script(body=""))
+        self.write("g.uc.js", script())
+        self.write("h.uc.mjs", script())
+        self.engine.write_profile_prefs(self.profile, {PREF_SCRIPTSDISABLED: "g.uc.js"})
+        self.assertEqual(list(self.group_names().values()), [["a.uc.js"]])
+
+    def test_build_writes_bundles_and_removes_stale_ones(self):
+        self.write("a.uc.js", script())
+        self.write("b.uc.js", script(body="(() => {})();"))
+        self.write("c.uc.js", script("// @include chrome://browser/content/places/*"))
+        bundle_dir = os.path.join(self.profile, "chrome", *BUNDLE_DIR)
+        os.makedirs(bundle_dir)
+        with open(os.path.join(bundle_dir, "bundle-0000000000000000.js"), 'w') as f:
+            f.write("[]")
+
+        self.engine.build_script_bundles({'profile_path': self.profile})
+        with open(os.path.join(bundle_dir, BUNDLE_MANIFEST), encoding='utf-8') as f:
+            manifest = json.load(f)
+        # A group with a single script is not worth a bundle
+        self.assertEqual(len(manifest['bundles']), 1)
+        bundle = manifest['bundles'][0]
+        self.assertEqual([entry['filename'] for entry in bundle['scripts']], ["a.uc.js", "b.uc.js"])
+        self.assertEqual(sorted(os.listdir(bundle_dir)), sorted([BUNDLE_MANIFEST, bundle['file']]))
+
+
+class RenderBundleTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = FxAutoconfigEngine()
+
+    def render(self, *sources):
+        scripts = [{'filename': f"s{i}.uc.js", 'source': source, 'size': len(source), 'mtime': i}
+                   for i, source in enumerate(sources)]
+        return self.engine.render_script_bundle(scripts)
+
+    def test_sources_are_kept_verbatim_at_their_line(self):
+        sources = ['// a\r\nx = "a\u2028b";\ry = 2;\n', "z = 3; // no line break at the end", "w = 4; "]
+        text, entries = self.render(*sources)
+        self.assertEqual([entry['lines'] for entry in entries], [4, 1, 1])
+        start = 0
+        for source, entry in zip(sources, entries):
+            start = text.index(source, start)
+            # Lines as JavaScript counts them, the way error line numbers are reported
+            self.assertEqual(len(JS_LINE_BREAK_RE.findall(text[:start])) + 1, entry['line'])
+            header_line = text[:start].splitlines()[-1]
+            self.assertEqual(header_line, f'[{json.dumps(entry["filename"])}, {entry["line"]}, function(){{')
+            start += len(source)
+        self.assertTrue(text.endswith("}]\n]\n"))
+        # A line comment at the very end must not swallow the closing bracket
+        self.assertIn("// no line break at the end\n}],\n", text)
+
+
+class GlobalDeclarationTest(unittest.TestCase):
+    CASES = {
+        "(function(){ var a = 1; function b(){} })();": None,
+        "window.A = class { m() { var x; } };": None,
+        "UC.f = { m(a) { var b = a; }, class: 'x' };": None,
+        "UC.f = (a) => { let b = a; };": None,
+        "!function(){ var q; }();": None,
+        "{ let a = 1; }": None,
+        "s = 'var a'; t = `${ {a: 1}.a } var`; r = /var[/]x/g; n = a / 2;": None,
+        "var a = 1;": "var",
+        "if (x) { var a = 1; }": "var",
+        "for (var i = 0; i < 2; i++) {}": "var",
+        "try { run(); } catch (e) { var failed = true; }": "var",
+        "function foo() {}": "function",
+        "if (x) { function foo() {} }": "function",
+        "let a = 1;": "let",
+        "const { Test } = ChromeUtils;": "const",
+        "class A {}": "class",
+        "a = `unterminated": "template",
+        "a = (1;": "unbalanced",
+    }
+
+    def test_cases(self):
+        engine = FxAutoconfigEngine()
+        for source, expected in self.CASES.items():
+            with self.subTest(source=source):
+                reason = engine.find_global_declaration(source)
+                if expected is None:
+                    self.assertIsNone(reason)
+                else:
+                    self.assertIn(expected, reason)
+
+
+if __name__ == '__main__':
+    unittest.main()
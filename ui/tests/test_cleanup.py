@@ -0,0 +1,108 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from fx_autoconfig import FxAutoconfigEngine
+from fx_autoconfig.engine import INSTALL_MANIFEST
+
+
+class ChromeCleanupTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.custom = os.path.join(self.tmp.name, "myjs")
+        self.profile = os.path.join(self.tmp.name, "profile")
+        self.chrome = os.path.join(self.profile, "chrome")
+        for rel_path in ("a.uc.js", "b.uc.js", "sub/c.uc.js"):
+            self.write(os.path.join(self.custom, *rel_path.split("/")), rel_path)
+        os.makedirs(self.chrome)
+        self.engine = FxAutoconfigEngine()
+        self.engine.install_custom_files({
+            'profile_path': self.profile, 'custom_js_path': self.custom, 'custom_css_path': '',
+            'use_symlinks': False, 'link_directories': False})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def relative(self, entries):
+        return sorted((os.path.relpath(path, self.chrome).replace(os.sep, "/"), reason.split(":")[0])
+                      for path, reason in entries)
+
+    def test_nothing_to_clean_while_sources_exist(self):
+        self.write(os.path.join(self.chrome, "JS", "mine.uc.js"), "mine")
+        self.assertEqual(self.engine.find_chrome_garbage(self.chrome), [])
+
+    def test_manifest_records_copy_hash(self):
+        with open(os.path.join(self.chrome, INSTALL_MANIFEST), encoding='utf-8') as f:
+            entry = json.load(f)['files']['JS/a.uc.js']
+        self.assertEqual(entry['source'], os.path.join(self.custom, "a.uc.js"))
+        self.assertEqual(entry['sha256'], self.engine.hash_file(os.path.join(self.chrome, "JS", "a.uc.js")))
+
+    def test_orphans_and_empty_directories(self):
+        shutil.rmtree(self.custom)
+        os.makedirs(os.path.join(self.chrome, "resources", "empty"))
+        garbage = self.engine.find_chrome_garbage(self.chrome)
+        self.assertEqual(self.relative(garbage), [
+            ("JS/a.uc.js", "source removed"),
+            ("JS/b.uc.js", "source removed"),
+            ("JS/sub", "empty directory"),
+            ("JS/sub/c.uc.js", "source removed"),
+            ("resources/empty", "empty directory"),
+        ])
+        # Children come before their parents so removal can go in order
+        paths = [path for path, reason in garbage]
+        self.assertLess(paths.index(os.path.join(self.chrome, "JS", "sub", "c.uc.js")),
+                        paths.index(os.path.join(self.chrome, "JS", "sub")))
+        self.assertEqual(self.engine.remove_chrome_garbage(self.chrome, garbage), 5)
+        self.assertEqual(os.listdir(os.path.join(self.chrome, "JS")), [])
+        self.assertFalse(os.path.exists(os.path.join(self.chrome, INSTALL_MANIFEST)))
+
+    def test_edited_orphan_is_listed_separately_and_kept(self):
+        edited = os.path.join(self.chrome, "JS", "sub", "c.uc.js")
+        self.write(edited, "changed in the profile")
+        shutil.rmtree(self.custom)
+        modified = []
+        garbage = self.engine.find_chrome_garbage(self.chrome, modified)
+        self.assertEqual(self.relative(modified), [("JS/sub/c.uc.js", "changed since install, source removed")])
+        self.assertNotIn(edited, [path for path, reason in garbage])
+        # Its directory is not empty, so it is not reported either
+        self.assertNotIn(os.path.dirname(edited), [path for path, reason in garbage])
+        self.engine.remove_chrome_garbage(self.chrome, garbage)
+        self.assertTrue(os.path.isfile(edited))
+
+    def test_file_edited_after_the_scan_is_kept(self):
+        shutil.rmtree(self.custom)
+        garbage = self.engine.find_chrome_garbage(self.chrome)
+        edited = os.path.join(self.chrome, "JS", "a.uc.js")
+        self.write(edited, "edited meanwhile")
+        self.engine.remove_chrome_garbage(self.chrome, garbage)
+        self.assertTrue(os.path.isfile(edited))
+
+    def test_old_manifest_entries_are_never_removed(self):
+        with open(os.path.join(self.chrome, INSTALL_MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump({'files': {'JS/a.uc.js': os.path.join(self.custom, "a.uc.js")}}, f)
+        shutil.rmtree(self.custom)
+        modified = []
+        self.assertEqual(self.engine.find_chrome_garbage(self.chrome, modified), [])
+        self.assertEqual(self.relative(modified), [("JS/a.uc.js", "changed since install, source removed")])
+
+    @unittest.skipUnless(FxAutoconfigEngine().can_create_symlinks(), "symlinks not supported here")
+    def test_dangling_links(self):
+        target = os.path.join(self.tmp.name, "gone.uc.js")
+        self.write(target, "x")
+        os.symlink(target, os.path.join(self.chrome, "JS", "link.uc.js"))
+        os.symlink(os.path.join(self.tmp.name, "gone"), os.path.join(self.chrome, "CSS"),
+                   target_is_directory=True)
+        os.remove(target)
+        self.assertEqual(self.relative(self.engine.find_chrome_garbage(self.chrome)),
+                         [("CSS", "dangling link"), ("JS/link.uc.js", "dangling link")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from fx_autoconfig import DURABILITY_BATCHED, DURABILITY_LEVELS, DURABILITY_NONE, DURABILITY_STRICT, SyncBatch
+
+
+class SyncBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "source.txt")
+        with open(self.src, 'wb') as f:
+            f.write(b"source")
+        self.chrome = os.path.join(self.tmp.name, "profile", "chrome")
+        for name in ("utils", "JS"):
+            os.makedirs(os.path.join(self.chrome, name))
+        patcher = mock.patch("fx_autoconfig.durability.os.fsync")
+        self.fsync = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_critical_files(self):
+        for path in ("config.js", os.path.join("defaults", "pref", "config-prefs.js"),
+                     os.path.join("profile", "prefs.js"), os.path.join("profile", "user.js"),
+                     os.path.join(self.chrome, "utils", "boot.sys.mjs"),
+                     os.path.join(self.chrome, "utils", "sub", "file.txt")):
+            with self.subTest(path=path):
+                self.assertTrue(SyncBatch.is_critical(path))
+        for path in (os.path.join(self.chrome, "JS", "a.uc.js"), os.path.join(self.chrome, "utilsx", "a.js"),
+                     os.path.join(self.chrome, "utils")):
+            with self.subTest(path=path):
+                self.assertFalse(SyncBatch.is_critical(path))
+
+    def test_critical_files_are_strict_at_every_level(self):
+        for level in DURABILITY_LEVELS:
+            with self.subTest(level=level):
+                self.fsync.reset_mock()
+                batch = SyncBatch(level)
+                batch.copy(self.src, os.path.join(self.chrome, "utils", "boot.sys.mjs"))
+                batch.atomic_write(os.path.join(self.tmp.name, "config.js"), b"// config")
+                # File and directory of both, before the phase ends
+                self.assertEqual(self.fsync.call_count, 4)
+                self.assertEqual((batch.files, batch.dirs), ([], set()))
+
+    def test_batched_syncs_on_flush(self):
+        batch = SyncBatch(DURABILITY_BATCHED)
+        batch.copy(self.src, os.path.join(self.chrome, "JS", "a.uc.js"))
+        batch.atomic_write(os.path.join(self.chrome, "JS", "b.uc.js"), b"// b")
+        self.fsync.assert_not_called()
+        batch.flush()
+        # Two files, then their shared directory once
+        self.assertEqual(self.fsync.call_count, 3)
+        self.fsync.reset_mock()
+        batch.flush()
+        self.fsync.assert_not_called()
+
+    def test_strict_syncs_every_file(self):
+        batch = SyncBatch(DURABILITY_STRICT)
+        batch.copy(self.src, os.path.join(self.chrome, "JS", "a.uc.js"))
+        self.assertEqual(self.fsync.call_count, 2)
+
+    def test_none_never_syncs(self):
+        batch = SyncBatch(DURABILITY_NONE)
+        batch.copy(self.src, os.path.join(self.chrome, "JS", "a.uc.js"))
+        batch.atomic_write(os.path.join(self.chrome, "JS", "b.uc.js"), b"// b")
+        batch.flush()
+        self.fsync.assert_not_called()
+        with open(os.path.join(self.chrome, "JS", "a.uc.js"), 'rb') as f:
+            self.assertEqual(f.read(), b"source")
+
+    def test_failed_atomic_write_keeps_old_file(self):
+        target = os.path.join(self.chrome, "JS", "a.uc.js")
+        with open(target, 'wb') as f:
+            f.write(b"old")
+
+        def fail(out):
+            out.write(b"partial")
+            raise OSError("disk full")
+        for level in DURABILITY_LEVELS:
+            with self.subTest(level=level):
+                with self.assertRaises(OSError):
+                    SyncBatch(level).atomic_write(target, fail)
+                with open(target, 'rb') as f:
+                    self.assertEqual(f.read(), b"old")
+                self.assertEqual(os.listdir(os.path.dirname(target)), ["a.uc.js"])
+
+    def test_unknown_level(self):
+        with self.assertRaises(ValueError):
+            SyncBatch("sometimes")
+
+
+if __name__ == '__main__':
+    unittest.main()
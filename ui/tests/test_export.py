@@ -0,0 +1,130 @@
+import io
+import json
+import os
+import tarfile
+import tempfile
+import unittest
+from unittest import mock
+
+from fx_autoconfig import PREF_ENABLED, PREF_SCRIPTSDISABLED, FxAutoconfigEngine
+from fx_autoconfig.durability import SyncBatch
+from fx_autoconfig.engine import EXPORT_HASH_HEADER, EXPORT_LINKED_PREFIX, EXPORT_METADATA_NAME, INSTALL_MANIFEST
+
+FILES = {
+    "JS/a.uc.js": "// a\n",
+    "JS/lib/b.js": "b" * 70000,
+    "CSS/c.uc.css": "/* c */\n",
+    "userChrome.css": "#nav-bar{}\n",
+}
+
+
+class ExportImportTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "source")
+        self.target = os.path.join(self.tmp.name, "target")
+        os.makedirs(self.target)
+        for rel_path, text in FILES.items():
+            self.write(os.path.join(self.source, "chrome", *rel_path.split("/")), text)
+        self.write(os.path.join(self.source, "chrome", INSTALL_MANIFEST), "{}")
+        self.write(os.path.join(self.source, "chrome", "JS", ".git", "HEAD"), "ref")
+        self.engine = FxAutoconfigEngine()
+        self.engine.write_profile_prefs(self.source, {PREF_ENABLED: True, PREF_SCRIPTSDISABLED: "a.uc.js",
+                                                      "browser.startup.page": 3})
+        self.archive = os.path.join(self.tmp.name, "setup.tar.gz")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path, encoding='utf-8', newline='') as f:
+            return f.read()
+
+    def test_members_carry_sha256(self):
+        self.engine.export_chrome_setup(self.source, self.archive)
+        with tarfile.open(self.archive) as tar:
+            members = {member.name: member for member in tar}
+            self.assertIn(EXPORT_METADATA_NAME, members)
+            names = sorted(name for name in members if name.startswith("chrome/"))
+            self.assertEqual(names, sorted("chrome/" + rel_path for rel_path in FILES))
+            for rel_path in FILES:
+                member = members["chrome/" + rel_path]
+                self.assertEqual(member.pax_headers[EXPORT_HASH_HEADER], self.engine.hash_file(
+                    os.path.join(self.source, "chrome", *rel_path.split("/"))))
+            metadata = json.load(tar.extractfile(members[EXPORT_METADATA_NAME]))
+        self.assertEqual(metadata['prefs'], {PREF_ENABLED: True, PREF_SCRIPTSDISABLED: "a.uc.js"})
+
+    def test_round_trip(self):
+        self.engine.export_chrome_setup(self.source, self.archive)
+        stats = self.engine.import_chrome_setup(self.target, self.archive)
+        self.assertEqual((stats['written'], stats['identical'], stats['prefs']), (len(FILES), 0, 2))
+        for rel_path, text in FILES.items():
+            self.assertEqual(self.read(os.path.join(self.target, "chrome", *rel_path.split("/"))), text)
+        self.assertEqual(self.engine.read_profile_prefs(self.target, [PREF_ENABLED, PREF_SCRIPTSDISABLED]),
+                         {PREF_ENABLED: True, PREF_SCRIPTSDISABLED: "a.uc.js"})
+
+        # Identical files are recognised by their hash and not written again
+        stats = self.engine.import_chrome_setup(self.target, self.archive)
+        self.assertEqual((stats['written'], stats['identical'], stats['prefs']), (0, len(FILES), 0))
+
+        changed = os.path.join(self.target, "chrome", "JS", "a.uc.js")
+        self.write(changed, "// edited\n")
+        stats = self.engine.import_chrome_setup(self.target, self.archive)
+        self.assertEqual(stats['written'], 1)
+        self.assertEqual(self.read(changed), FILES["JS/a.uc.js"])
+
+    def test_rejects_unsafe_member_paths(self):
+        data = json.dumps({'format': 1, 'prefs': {}}).encode('utf-8')
+        with tarfile.open(self.archive, "w:gz", format=tarfile.PAX_FORMAT) as tar:
+            for name in (EXPORT_METADATA_NAME, "chrome/../escape.txt", "chrome//abs.txt"):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        stats = self.engine.import_chrome_setup(self.target, self.archive)
+        self.assertEqual((stats['written'], stats['skipped']), (0, 2))
+        self.assertFalse(os.path.exists(os.path.join(self.target, "escape.txt")))
+
+    def test_rejects_foreign_archive(self):
+        with tarfile.open(self.archive, "w:gz") as tar:
+            tar.addfile(tarfile.TarInfo("chrome/x.uc.js"), io.BytesIO(b""))
+        with mock.patch.object(SyncBatch, 'flush') as flush:
+            with self.assertRaises(ValueError):
+                self.engine.import_chrome_setup(self.target, self.archive)
+        # Whatever was written before the failure is still synced
+        flush.assert_called_once()
+
+    @unittest.skipUnless(FxAutoconfigEngine().can_create_symlinks(), "symlinks not supported")
+    def test_existing_file_is_kept_instead_of_link(self):
+        link_target = os.path.join(self.tmp.name, "shared.uc.js")
+        self.write(link_target, "// shared\n")
+        existing = os.path.join(self.target, "chrome", "JS", "shared.uc.js")
+        self.write(existing, "// mine\n")
+        data = json.dumps({'format': 1, 'prefs': {}}).encode('utf-8')
+        copy = b"// copy\n"
+        with tarfile.open(self.archive, "w:gz", format=tarfile.PAX_FORMAT) as tar:
+            info = tarfile.TarInfo(EXPORT_METADATA_NAME)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+            info = tarfile.TarInfo("chrome/JS/shared.uc.js")
+            info.type = tarfile.SYMTYPE
+            info.linkname = link_target
+            tar.addfile(info)
+            info = tarfile.TarInfo(EXPORT_LINKED_PREFIX + "JS/shared.uc.js")
+            info.size = len(copy)
+            tar.addfile(info, io.BytesIO(copy))
+        messages = []
+        self.engine.log_message = lambda message, error=False: messages.append(message)
+        stats = self.engine.import_chrome_setup(self.target, self.archive)
+        self.assertEqual((stats['links'], stats['written'], stats['skipped']), (0, 0, 1))
+        self.assertEqual(self.read(existing), "// mine\n")
+        self.assertTrue(any("Kept the existing regular file JS/shared.uc.js" in m for m in messages))
+        self.assertFalse(any("not available" in m for m in messages))
+
+
+if __name__ == '__main__':
+    unittest.main()
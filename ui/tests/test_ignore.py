@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+from fx_autoconfig import IgnoreRules
+
+
+class IgnoreRulesTest(unittest.TestCase):
+    def test_defaults(self):
+        rules = IgnoreRules()
+        self.assertTrue(rules.is_ignored(".git", True))
+        self.assertTrue(rules.is_ignored("sub/node_modules", True))
+        self.assertTrue(rules.is_ignored("script.uc.js~", False))
+        self.assertTrue(rules.is_ignored(".ucignore", False))
+        self.assertFalse(rules.is_ignored("script.uc.js", False))
+
+    def test_directory_only_pattern(self):
+        rules = IgnoreRules(["build/"])
+        self.assertTrue(rules.is_ignored("build", True))
+        self.assertFalse(rules.is_ignored("build", False))
+
+    def test_anchored_pattern_and_base(self):
+        rules = IgnoreRules([])
+        rules.add_patterns(["/dist", "docs/*.md"], "lib")
+        self.assertTrue(rules.is_ignored("lib/dist", True))
+        self.assertFalse(rules.is_ignored("lib/sub/dist", True))
+        self.assertFalse(rules.is_ignored("dist", True))
+        self.assertTrue(rules.is_ignored("lib/docs/readme.md", False))
+        self.assertFalse(rules.is_ignored("lib/docs/deep/readme.md", False))
+
+    def test_globs(self):
+        rules = IgnoreRules(["**/tmp/**", "file?.js", "[ab].css", "[!c]x.css"])
+        self.assertTrue(rules.is_ignored("a/tmp/b/c.js", False))
+        self.assertTrue(rules.is_ignored("file1.js", False))
+        self.assertFalse(rules.is_ignored("file10.js", False))
+        self.assertTrue(rules.is_ignored("b.css", False))
+        self.assertFalse(rules.is_ignored("c.css", False))
+        self.assertTrue(rules.is_ignored("dx.css", False))
+        self.assertFalse(rules.is_ignored("cx.css", False))
+
+    def test_last_matching_rule_wins(self):
+        rules = IgnoreRules(["*.js", "!keep.js", "# comment", "", r"\#literal"])
+        self.assertTrue(rules.is_ignored("drop.js", False))
+        self.assertFalse(rules.is_ignored("keep.js", False))
+        self.assertTrue(rules.is_ignored("#literal", False))
+
+    def test_walk_prunes_and_reads_nested_files(self):
+        with tempfile.TemporaryDirectory() as top:
+            for rel_path in ("a.uc.js", "notes.txt", ".git/config", "lib/b.js", "lib/big.js", "lib/out/c.js"):
+                path = os.path.join(top, *rel_path.split("/"))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                open(path, 'w').close()
+            with open(os.path.join(top, ".ucignore"), 'w') as f:
+                f.write("*.txt\n")
+            with open(os.path.join(top, "lib", ".ucignore"), 'w') as f:
+                f.write("out/\nbig.js\n")
+            rules = IgnoreRules()
+            found = []
+            for root, dirs, files in rules.walk(top):
+                rel_root = os.path.relpath(root, top).replace(os.sep, "/")
+                found += [name if rel_root == "." else f"{rel_root}/{name}" for name in files]
+            self.assertEqual(sorted(found), ["a.uc.js", "lib/b.js"])
+            # .git/, notes.txt, lib/out/, lib/big.js and both .ucignore files
+            self.assertEqual(rules.skipped, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
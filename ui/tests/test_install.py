@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from fx_autoconfig import FxAutoconfigEngine, Job, OperationProgress
+
+TIMEOUT = 10
+
+
+class InstallCancelTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.firefox = os.path.join(self.tmp.name, "firefox")
+        self.profile = os.path.join(self.tmp.name, "profile")
+        self.custom = os.path.join(self.tmp.name, "myjs")
+        for path in (self.firefox, self.profile, self.custom):
+            os.makedirs(path)
+        for i in range(20):
+            with open(os.path.join(self.custom, f"script{i:02d}.uc.js"), 'w') as f:
+                f.write("x")
+        self.engine = FxAutoconfigEngine()
+        self.repo_root = self.engine.get_repo_root()
+        self.settings = {'firefox_path': self.firefox, 'profile_path': self.profile,
+                         'custom_js_path': self.custom, 'custom_css_path': '', 'use_symlinks': False,
+                         'link_directories': False, 'bundle_scripts': False}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_install(self, cancel_after):
+        progress = OperationProgress("Installing")
+        track_progress = self.engine.track_progress
+
+        def track_and_cancel(*args, **kwargs):
+            if progress.files_done + 1 >= cancel_after:
+                progress.cancel()
+            return track_progress(*args, **kwargs)
+        self.engine.track_progress = track_and_cancel
+        job = self.engine.submit_job("Install", self.engine.get_job_targets(self.settings),
+                                     lambda: self.engine.install(self.settings), progress)
+        self.assertTrue(job.wait(TIMEOUT))
+        return job
+
+    def listing(self, *parts):
+        return sorted(os.listdir(os.path.join(*parts)))
+
+    def test_loader_files_are_installed_together(self):
+        job = self.run_install(cancel_after=1)
+        self.assertEqual(job.state, Job.CANCELLED)
+        self.assertEqual(self.listing(self.firefox), self.listing(self.repo_root, "program"))
+        self.assertEqual(self.listing(self.profile, "chrome", "utils"),
+                         self.listing(self.repo_root, "profile", "chrome", "utils"))
+        self.assertFalse(os.path.exists(os.path.join(self.profile, "chrome", "JS")))
+
+    def test_cancel_stops_at_the_next_custom_file(self):
+        program_files = self.engine.scan_directory(os.path.join(self.repo_root, "program"), False)[0]
+        profile_files = self.engine.scan_directory(os.path.join(self.repo_root, "profile", "chrome"), False)[0]
+        job = self.run_install(cancel_after=program_files + profile_files + 3)
+        self.assertEqual(job.state, Job.CANCELLED)
+        self.assertEqual(len(self.listing(self.custom)), 20)
+        custom_copied = [name for name in self.listing(self.profile, "chrome", "JS") if name.startswith("script")]
+        self.assertEqual(len(custom_copied), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
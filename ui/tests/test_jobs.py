@@ -0,0 +1,100 @@
+import threading
+import unittest
+
+from fx_autoconfig import Job, JobExecutor, OperationCancelled, OperationProgress
+
+TIMEOUT = 5
+
+
+class JobExecutorTest(unittest.TestCase):
+    def setUp(self):
+        self.executor = JobExecutor(max_workers=4)
+
+    def tearDown(self):
+        self.executor.shutdown(cancel=True)
+
+    def test_same_target_runs_in_submission_order(self):
+        order = []
+        release = threading.Event()
+        first = self.executor.submit("first", ["/tmp/a"], lambda: (release.wait(TIMEOUT), order.append(1)))
+        second = self.executor.submit("second", ["/tmp/a"], lambda: order.append(2))
+        self.assertEqual(second.state, Job.QUEUED)
+        release.set()
+        self.assertTrue(second.wait(TIMEOUT))
+        self.assertEqual(order, [1, 2])
+        self.assertEqual((first.state, second.state), (Job.DONE, Job.DONE))
+
+    def test_later_job_does_not_overtake_queued_one(self):
+        order = []
+        release = threading.Event()
+        self.executor.submit("a", ["/tmp/a"], lambda: release.wait(TIMEOUT))
+        self.executor.submit("a+b", ["/tmp/a", "/tmp/b"], lambda: order.append("a+b"))
+        late = self.executor.submit("b", ["/tmp/b"], lambda: order.append("b"))
+        self.assertEqual(late.state, Job.QUEUED)
+        release.set()
+        self.assertTrue(late.wait(TIMEOUT))
+        self.assertEqual(order, ["a+b", "b"])
+
+    def test_different_targets_run_in_parallel(self):
+        both_running = threading.Barrier(2, timeout=TIMEOUT)
+        jobs = [self.executor.submit(name, [f"/tmp/{name}"], both_running.wait) for name in "ab"]
+        for job in jobs:
+            self.assertTrue(job.wait(TIMEOUT))
+            self.assertEqual(job.state, Job.DONE)
+
+    def test_failure_and_cancel_states(self):
+        def fail():
+            raise ValueError("broken")
+        failed = self.executor.submit("fail", ["/tmp/a"], fail)
+        cancelled = self.executor.submit("cancel", ["/tmp/a"], self.raise_cancelled)
+        self.assertTrue(cancelled.wait(TIMEOUT))
+        self.assertEqual(failed.state, Job.FAILED)
+        self.assertIsInstance(failed.error, ValueError)
+        self.assertEqual(cancelled.state, Job.CANCELLED)
+
+    def raise_cancelled(self):
+        raise OperationCancelled()
+
+    def test_current_job(self):
+        seen = []
+        job = self.executor.submit("job", ["/tmp/a"], lambda: seen.append(self.executor.current_job()))
+        self.assertTrue(job.wait(TIMEOUT))
+        self.assertEqual(seen, [job])
+        self.assertIsNone(self.executor.current_job())
+
+    def test_shutdown_drops_queued_jobs(self):
+        release = threading.Event()
+        progress = OperationProgress("running")
+        running = self.executor.submit("running", ["/tmp/a"], lambda: release.wait(TIMEOUT), progress)
+        queued = self.executor.submit("queued", ["/tmp/a"], lambda: None)
+        self.executor.shutdown(cancel=True)
+        release.set()
+        self.assertTrue(running.wait(TIMEOUT))
+        self.assertEqual(queued.state, Job.CANCELLED)
+        self.assertTrue(progress.cancel_event.is_set())
+        with self.assertRaises(RuntimeError):
+            self.executor.submit("late", ["/tmp/a"], lambda: None)
+
+
+class OperationProgressTest(unittest.TestCase):
+    def test_cancel_waits_for_deferred_block(self):
+        progress = OperationProgress("test")
+        steps = []
+        with self.assertRaises(OperationCancelled):
+            with progress.defer_cancel():
+                progress.cancel()
+                progress.check_cancelled()
+                with progress.defer_cancel():
+                    steps.append("inner")
+                steps.append("outer")
+        self.assertEqual(steps, ["inner", "outer"])
+
+    def test_fraction_prefers_bytes(self):
+        progress = OperationProgress("test")
+        progress.set_totals(4, 100)
+        progress.advance(50)
+        self.assertEqual(progress.fraction(), 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from fx_autoconfig import FxAutoconfigEngine, OperationCancelled, OperationProgress, ScriptLibrary
+from fx_autoconfig.engine import INSTALL_MANIFEST
+
+
+def header(name, description):
+    return (f"// ==UserScript==\n// @name {name}\n// @description {description}\n"
+            f"// @version 1.0\n// ==/UserScript==\n")
+
+
+class ScriptLibraryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "library")
+        self.library = ScriptLibrary(os.path.join(self.tmp.name, "index", "library.sqlite3"))
+        self.write("tabs/tab_tools.uc.js", header("Tab tools", "Extra tab context menu items"))
+        self.write("urlbar.uc.js", header("Urlbar", "Shows 100% of the URL"))
+        self.write("theme.uc.css", "/* ==UserScript==\n// @name Theme\n// @stylemode agent_sheet\n"
+                                   "// ==/UserScript== */\n")
+        self.write("readme.md", "not indexed")
+        self.write("node_modules/dep.uc.js", header("Dependency", "ignored by default"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path, text):
+        path = os.path.join(self.root, *rel_path.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        return path
+
+    def indexed(self):
+        return [row['rel_path'] for row in self.library.search(self.root)]
+
+    def test_refresh_detects_changes(self):
+        counts = self.library.refresh(self.root)
+        self.assertEqual((counts['added'], counts['updated'], counts['unchanged'], counts['removed']), (3, 0, 0, 0))
+        self.assertEqual(self.indexed(), ["tabs/tab_tools.uc.js", "theme.uc.css", "urlbar.uc.js"])
+
+        path = self.write("urlbar.uc.js", header("Address bar", "Renamed"))
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        os.remove(os.path.join(self.root, "theme.uc.css"))
+        self.write("new.uc.mjs", header("Module", "New"))
+        counts = self.library.refresh(self.root)
+        self.assertEqual((counts['added'], counts['updated'], counts['unchanged'], counts['removed']), (1, 1, 1, 1))
+        rows = {row['rel_path']: row for row in self.library.search(self.root)}
+        self.assertEqual(sorted(rows), ["new.uc.mjs", "tabs/tab_tools.uc.js", "urlbar.uc.js"])
+        self.assertEqual(rows["urlbar.uc.js"]['name'], "Address bar")
+        self.assertEqual(rows["new.uc.mjs"]['kind'], "module")
+
+    def test_cancelled_refresh_keeps_committed_rows(self):
+        progress = OperationProgress("Indexing")
+        check_cancelled = progress.check_cancelled
+        calls = []
+
+        def cancel_at_third_file():
+            calls.append(None)
+            if len(calls) == 3:
+                progress.cancel()
+            check_cancelled()
+        progress.check_cancelled = cancel_at_third_file
+        with mock.patch("fx_autoconfig.library.LIBRARY_COMMIT_EVERY", 1):
+            with self.assertRaises(OperationCancelled):
+                self.library.refresh(self.root, progress)
+        self.assertEqual(len(self.indexed()), 2)
+        counts = self.library.refresh(self.root)
+        self.assertEqual((counts['added'], counts['unchanged']), (1, 2))
+
+    def test_search(self):
+        self.library.refresh(self.root)
+        self.assertEqual([row['name'] for row in self.library.search(self.root, "tab")], ["Tab tools"])
+        self.assertEqual([row['rel_path'] for row in self.library.search(self.root, "CONTEXT items")],
+                         ["tabs/tab_tools.uc.js"])
+        # LIKE wildcards in the search text are matched literally
+        self.assertEqual([row['name'] for row in self.library.search(self.root, "100%")], ["Urlbar"])
+        self.assertEqual(self.library.search(self.root, "o_s"), [])
+        self.assertEqual(self.library.search(self.root, "tab missing"), [])
+        self.assertEqual(self.library.search(os.path.join(self.tmp.name, "other")), [])
+
+
+class LibrarySelectionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.library = os.path.join(self.tmp.name, "library")
+        self.profile = os.path.join(self.tmp.name, "profile")
+        os.makedirs(self.profile)
+        for rel_path in ("a.uc.js", "styles/b.uc.css"):
+            path = os.path.join(self.library, *rel_path.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(f"// {rel_path}\n")
+        self.engine = FxAutoconfigEngine()
+        self.engine.log_message = lambda message, error=False: None
+        self.settings = {'library_path': self.library, 'profile_path': self.profile, 'use_symlinks': False,
+                         'library_selection': ["a.uc.js", "styles/b.uc.css"]}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def chrome(self, *parts):
+        return os.path.join(self.profile, "chrome", *parts)
+
+    def test_deselected_files_are_removed(self):
+        self.engine.install_library_selection(self.settings)
+        self.assertTrue(os.path.isfile(self.chrome("JS", "a.uc.js")))
+        self.assertTrue(os.path.isfile(self.chrome("CSS", "b.uc.css")))
+
+        self.settings['library_selection'] = ["a.uc.js"]
+        self.engine.install_library_selection(self.settings)
+        self.assertTrue(os.path.isfile(self.chrome("JS", "a.uc.js")))
+        self.assertFalse(os.path.exists(self.chrome("CSS", "b.uc.css")))
+        self.assertEqual(list(self.engine.load_install_manifest(self.chrome())), ["JS/a.uc.js"])
+
+    def test_edited_copy_is_kept(self):
+        self.engine.install_library_selection(self.settings)
+        with open(self.chrome("CSS", "b.uc.css"), 'a') as f:
+            f.write("/* local edit */\n")
+        self.settings['library_selection'] = []
+        self.engine.install_library_selection(self.settings)
+        self.assertFalse(os.path.exists(self.chrome("JS", "a.uc.js")))
+        self.assertTrue(os.path.isfile(self.chrome("CSS", "b.uc.css")))
+        self.assertFalse(os.path.exists(self.chrome(INSTALL_MANIFEST)))
+
+
+if __name__ == '__main__':
+    unittest.main()
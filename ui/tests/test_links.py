@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from fx_autoconfig import FxAutoconfigEngine
+
+ENGINE = FxAutoconfigEngine()
+
+
+@unittest.skipUnless(ENGINE.can_create_symlinks(), "symlinks not supported here")
+class LinkCustomDirectoryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.custom = os.path.join(self.tmp.name, "myjs")
+        self.profile = os.path.join(self.tmp.name, "profile")
+        self.js_dir = os.path.join(self.profile, "chrome", "JS")
+        os.makedirs(os.path.join(self.custom, "lib"))
+        os.makedirs(os.path.dirname(self.js_dir))
+        self.write(os.path.join(self.custom, "a.uc.js"), "a")
+        self.write(os.path.join(self.custom, "lib", "b.js"), "b")
+        self.messages = []
+        self.engine = FxAutoconfigEngine(on_event=lambda kind, data: self.messages.append(data.get('message')))
+        self.samples = os.path.join(self.engine.get_repo_root(), "profile", "chrome", "JS")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def link(self):
+        self.engine._link_custom_directory(self.custom, self.js_dir, 'scripts')
+
+    def settings(self):
+        return {'firefox_path': os.path.join(self.tmp.name, "firefox"), 'profile_path': self.profile,
+                'custom_js_path': self.custom, 'custom_css_path': '', 'use_symlinks': True,
+                'link_directories': True, 'bundle_scripts': False}
+
+    def test_links_whole_directory_when_missing(self):
+        self.link()
+        self.assertTrue(os.path.islink(self.js_dir))
+        self.assertEqual(os.path.realpath(self.js_dir), os.path.realpath(self.custom))
+
+    def test_relinking_is_a_no_op(self):
+        self.link()
+        self.link()
+        self.assertTrue(any("already linked" in message for message in self.messages))
+
+    def test_replaces_unmodified_samples_and_copies(self):
+        shutil.copytree(self.samples, self.js_dir)
+        shutil.copy2(os.path.join(self.custom, "a.uc.js"), self.js_dir)
+        self.link()
+        self.assertTrue(os.path.islink(self.js_dir))
+
+    def test_links_entries_next_to_user_files(self):
+        self.write(os.path.join(self.js_dir, "mine.uc.js"), "mine")
+        self.link()
+        self.assertFalse(os.path.islink(self.js_dir))
+        self.assertTrue(os.path.islink(os.path.join(self.js_dir, "a.uc.js")))
+        self.assertTrue(os.path.islink(os.path.join(self.js_dir, "lib")))
+        self.assertTrue(os.path.isfile(os.path.join(self.js_dir, "mine.uc.js")))
+
+    def test_keeps_edited_top_level_file(self):
+        self.write(os.path.join(self.js_dir, "a.uc.js"), "edited in the profile")
+        self.link()
+        dst = os.path.join(self.js_dir, "a.uc.js")
+        self.assertFalse(os.path.islink(dst))
+        with open(dst, encoding='utf-8') as f:
+            self.assertEqual(f.read(), "edited in the profile")
+
+    def test_replaces_identical_top_level_file(self):
+        self.write(os.path.join(self.js_dir, "mine.uc.js"), "mine")
+        shutil.copy2(os.path.join(self.custom, "a.uc.js"), self.js_dir)
+        self.link()
+        self.assertTrue(os.path.islink(os.path.join(self.js_dir, "a.uc.js")))
+
+    def test_install_leaves_samples_out_of_linked_directory(self):
+        self.engine.install(self.settings())
+        self.assertTrue(os.path.islink(self.js_dir))
+        self.assertEqual(sorted(os.listdir(self.custom)), ["a.uc.js", "lib"])
+
+    def test_profile_copy_never_writes_through_links(self):
+        os.symlink(self.custom, self.js_dir, target_is_directory=True)
+        settings = dict(self.settings(), link_directories=False)
+        self.engine.install_profile_files(settings, include=("JS",))
+        self.assertEqual(sorted(os.listdir(self.custom)), ["a.uc.js", "lib"])
+
+
+if __name__ == '__main__':
+    unittest.main()
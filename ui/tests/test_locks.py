@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from fx_autoconfig import OperationCancelled, TargetLock, TargetLockTimeout
+
+UI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOLD_LOCK = """
+import sys
+from fx_autoconfig import TargetLock
+lock = TargetLock(sys.argv[1], "Holding")
+lock.acquire(5)
+print("locked", flush=True)
+sys.stdin.read()
+lock.release()
+"""
+
+
+class TargetLockTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.target = self.tmp.name
+        self.locks = []
+
+    def tearDown(self):
+        for lock in self.locks:
+            lock.release()
+        self.tmp.cleanup()
+
+    def lock(self, target=None, operation="Test"):
+        lock = TargetLock(target or self.target, operation)
+        self.locks.append(lock)
+        return lock
+
+    def test_second_lock_waits_for_release(self):
+        first = self.lock(operation="Install")
+        self.assertTrue(first.try_acquire())
+        second = self.lock()
+        self.assertFalse(second.try_acquire())
+        self.assertEqual(second.holder()['operation'], "Install")
+        self.assertEqual(second.holder()['pid'], os.getpid())
+        first.release()
+        self.assertTrue(second.try_acquire())
+
+    def test_timeout_reports_holder(self):
+        self.assertTrue(self.lock(operation="Install").try_acquire())
+        with self.assertRaises(TargetLockTimeout) as raised:
+            self.lock().acquire(timeout=0)
+        self.assertEqual(raised.exception.holder['operation'], "Install")
+        self.assertIn("Install", str(raised.exception))
+
+    def test_waiting_can_be_cancelled(self):
+        self.assertTrue(self.lock().try_acquire())
+        waits = []
+
+        def check_cancelled():
+            raise OperationCancelled()
+        with self.assertRaises(OperationCancelled):
+            self.lock().acquire(timeout=None, on_wait=waits.append, check_cancelled=check_cancelled)
+        self.assertEqual(len(waits), 1)
+
+    def test_same_directory_spelled_differently(self):
+        spelled = os.path.join(self.target, "sub", "..")
+        os.makedirs(os.path.join(self.target, "sub"))
+        self.assertEqual(self.lock().path, self.lock(spelled).path)
+
+    def test_other_process_holds_lock(self):
+        child = subprocess.Popen([sys.executable, "-c", HOLD_LOCK, self.target], cwd=UI_DIR,
+                                 stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        try:
+            self.assertEqual(child.stdout.readline().strip(), "locked")
+            lock = self.lock()
+            self.assertFalse(lock.try_acquire())
+            self.assertEqual(lock.holder()['pid'], child.pid)
+        finally:
+            child.stdin.close()
+            child.wait(5)
+        self.assertTrue(self.lock().try_acquire())
+
+
+if __name__ == '__main__':
+    unittest.main()
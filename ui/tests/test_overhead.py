@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+from fx_autoconfig import PREF_ENABLED, PREF_SCRIPTSDISABLED, FxAutoconfigEngine
+
+
+def header(*lines, style=False):
+    lines = ("// @name test",) + lines + ("// ==/UserScript==",)
+    if style:
+        return "\n".join(("/* ==UserScript==",) + lines) + " */\n"
+    return "\n".join(("// ==UserScript==",) + lines) + "\n"
+
+
+BODY = "(() => {\n  console.log('loaded');\n})();\n"
+
+
+class StartupOverheadTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.profile = self.tmp.name
+        self.write("JS/window.uc.js", header() + BODY)
+        self.write("JS/once.uc.js", header("// @onlyonce") + BODY)
+        self.write("JS/places.uc.js", header("// @include chrome://browser/content/places/*") + BODY)
+        self.write("JS/disabled.uc.js", header() + BODY)
+        self.write("JS/background.sys.mjs", header() + "export const x = 1;\n")
+        self.write("JS/legacy.uc.js", header("// @backgroundmodule") + BODY)
+        # Fewer characters than bytes: one byte after the header still makes it header-only
+        self.write("JS/header_only.uc.js", header("// @description " + "é" * 20) + "\n")
+        self.write("JS/empty.uc.js", "")
+        self.write("JS/notes.txt", BODY)
+        self.write("CSS/author.uc.css", header(style=True) + "#nav-bar { color: red; }\n")
+        self.write("CSS/agent.uc.css", header("// @stylemode agent_sheet", style=True) + "* {}\n")
+        self.engine = FxAutoconfigEngine()
+        self.engine.write_profile_prefs(self.profile, {PREF_SCRIPTSDISABLED: "disabled.uc.js"})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path, text):
+        path = os.path.join(self.profile, "chrome", *rel_path.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+
+    def test_classification(self):
+        report = self.engine.collect_startup_overhead(self.profile)
+        self.assertTrue(report['enabled'])
+        kinds = {entry['filename']: entry['kind'] for entry in report['entries']}
+        self.assertEqual(kinds, {
+            "window.uc.js": "per-window script",
+            "once.uc.js": "@onlyonce",
+            "places.uc.js": "per-window script",
+            "disabled.uc.js": "per-window script",
+            "background.sys.mjs": "background module",
+            "legacy.uc.js": "refused (not ESM)",
+            "header_only.uc.js": "no-op (header only)",
+            "empty.uc.js": "no-op (header only)",
+            "author.uc.css": "author sheet",
+            "agent.uc.css": "agent sheet",
+        })
+
+    def test_costs(self):
+        entries = {entry['filename']: entry for entry in self.engine.collect_startup_overhead(self.profile)['entries']}
+        # Every file costs a header read at startup
+        self.assertTrue(all(entry['startup_ms'] > 0 for entry in entries.values()))
+        self.assertGreater(entries["window.uc.js"]['per_window_ms'], 0)
+        self.assertGreater(entries["once.uc.js"]['first_window_ms'], entries["once.uc.js"]['startup_ms'])
+        self.assertGreater(entries["author.uc.css"]['first_window_ms'], 0)
+        self.assertGreater(entries["agent.uc.css"]['startup_ms'], entries["author.uc.css"]['startup_ms'])
+        self.assertGreater(entries["background.sys.mjs"]['startup_ms'], entries["legacy.uc.js"]['startup_ms'])
+        for filename in ("places.uc.js", "disabled.uc.js", "header_only.uc.js", "legacy.uc.js"):
+            with self.subTest(filename=filename):
+                self.assertEqual(entries[filename]['per_window_ms'], 0)
+        self.assertEqual(entries["disabled.uc.js"]['first_window_ms'], 0)
+
+    def test_report_is_sorted_by_cost(self):
+        entries = self.engine.collect_startup_overhead(self.profile)['entries']
+        self.assertEqual(entries[0]['filename'], "window.uc.js")
+        keys = [(e['per_window_ms'], e['first_window_ms'], e['startup_ms']) for e in entries]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_loader_disabled(self):
+        self.engine.write_profile_prefs(self.profile, {PREF_ENABLED: False})
+        self.assertFalse(self.engine.collect_startup_overhead(self.profile)['enabled'])
+
+
+if __name__ == '__main__':
+    unittest.main()
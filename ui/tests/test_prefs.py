@@ -0,0 +1,80 @@
+import os
+import stat
+import tempfile
+import unittest
+
+from fx_autoconfig import PREF_ENABLED, PREF_SCRIPTSDISABLED, FxAutoconfigEngine
+
+
+class ProfilePrefsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.profile = self.tmp.name
+        self.prefs_file = os.path.join(self.profile, "prefs.js")
+        self.engine = FxAutoconfigEngine()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_prefs(self, text):
+        with open(self.prefs_file, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+
+    def read_prefs_text(self):
+        with open(self.prefs_file, 'r', encoding='utf-8', newline='') as f:
+            return f.read()
+
+    def test_read_selected_prefs(self):
+        self.write_prefs('// Mozilla User Preferences\n'
+                         'user_pref("browser.startup.page", 3);\n'
+                         f'user_pref("{PREF_ENABLED}", false);\n'
+                         f'user_pref("{PREF_SCRIPTSDISABLED}", "a.uc.js,b.uc.js");\n')
+        prefs = self.engine.read_profile_prefs(self.profile, [PREF_ENABLED, PREF_SCRIPTSDISABLED])
+        self.assertEqual(prefs, {PREF_ENABLED: False, PREF_SCRIPTSDISABLED: "a.uc.js,b.uc.js"})
+
+    def test_read_missing_file(self):
+        self.assertEqual(self.engine.read_profile_prefs(self.profile, [PREF_ENABLED]), {})
+
+    def test_write_replaces_in_place_and_appends_new(self):
+        self.write_prefs('user_pref("a.pref", 1);\r\n'
+                         f'user_pref("{PREF_ENABLED}", true);\r\n'
+                         'user_pref("z.pref", "x");\r\n')
+        self.engine.write_profile_prefs(self.profile, {PREF_ENABLED: False, PREF_SCRIPTSDISABLED: "a.uc.js"})
+        self.assertEqual(self.read_prefs_text(),
+                         'user_pref("a.pref", 1);\r\n'
+                         f'user_pref("{PREF_ENABLED}", false);\r\n'
+                         'user_pref("z.pref", "x");\r\n'
+                         f'user_pref("{PREF_SCRIPTSDISABLED}", "a.uc.js");\r\n')
+
+    def test_write_drops_duplicate_lines(self):
+        self.write_prefs(f'user_pref("{PREF_ENABLED}", true);\n'
+                         f'user_pref("{PREF_ENABLED}", true);\n')
+        self.engine.write_profile_prefs(self.profile, {PREF_ENABLED: False})
+        self.assertEqual(self.read_prefs_text(), f'user_pref("{PREF_ENABLED}", false);\n')
+
+    def test_write_completes_last_line(self):
+        self.write_prefs('user_pref("a.pref", 1);')
+        self.engine.write_profile_prefs(self.profile, {PREF_ENABLED: True})
+        self.assertEqual(self.read_prefs_text(),
+                         f'user_pref("a.pref", 1);\nuser_pref("{PREF_ENABLED}", true);\n')
+
+    def test_write_creates_file_and_round_trips(self):
+        updates = {PREF_ENABLED: True, PREF_SCRIPTSDISABLED: 'quote".uc.js'}
+        self.engine.write_profile_prefs(self.profile, updates, filename="user.js")
+        self.assertEqual(self.engine.read_profile_prefs(self.profile, list(updates), "user.js"), updates)
+
+    @unittest.skipIf(os.name == "nt", "POSIX permissions")
+    def test_write_keeps_file_mode(self):
+        self.write_prefs('user_pref("a.pref", 1);\n')
+        os.chmod(self.prefs_file, 0o640)
+        self.engine.write_profile_prefs(self.profile, {PREF_ENABLED: True})
+        self.assertEqual(stat.S_IMODE(os.stat(self.prefs_file).st_mode), 0o640)
+        self.assertEqual([name for name in os.listdir(self.profile) if name != "prefs.js"], [])
+
+    def test_toggle_disabled_scripts(self):
+        value = self.engine.toggle_disabled_scripts("a.uc.js,b.uc.js", enable={"a.uc.js"}, disable={"c.uc.js"})
+        self.assertEqual(value, "b.uc.js,c.uc.js")
+
+
+if __name__ == '__main__':
+    unittest.main()
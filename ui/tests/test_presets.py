@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from fx_autoconfig import PresetStore
+from fx_autoconfig.presets import DEFAULT_PRESET
+
+
+class PresetStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "config", "presets.json")
+        self.write_presets({'active': DEFAULT_PRESET, 'presets': {DEFAULT_PRESET: {}}})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_presets(self, data):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def read_presets(self):
+        with open(self.path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_changes_are_written_once_settled(self):
+        store = PresetStore(self.path, delay=0.2)
+        for i in range(5):
+            store.put("Work", {'profile_path': f"/profiles/{i}"})
+        self.assertEqual(self.read_presets()['presets'], {DEFAULT_PRESET: {}})
+        deadline = time.monotonic() + 5
+        while "Work" not in self.read_presets()['presets'] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(self.read_presets(), {'active': "Work", 'presets': {
+            DEFAULT_PRESET: {}, "Work": {'profile_path': "/profiles/4"}}})
+
+    def test_flush_writes_immediately(self):
+        store = PresetStore(self.path, delay=60)
+        store.put("Work", {'bundle_scripts': True})
+        store.flush()
+        self.assertEqual(self.read_presets()['active'], "Work")
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["presets.json"])
+        reloaded = PresetStore(self.path)
+        self.assertEqual(reloaded.names(), [DEFAULT_PRESET, "Work"])
+        self.assertEqual(reloaded.get("Work"), {'bundle_scripts': True})
+
+    def test_last_preset_cannot_be_deleted(self):
+        store = PresetStore(self.path, delay=60)
+        self.assertFalse(store.delete(DEFAULT_PRESET))
+        store.put("Work", {})
+        self.assertTrue(store.delete("Work"))
+        self.assertEqual(store.active, DEFAULT_PRESET)
+        store.flush()
+
+    def test_corrupt_file_is_kept_aside(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write("{not json")
+        store = PresetStore(self.path, delay=60)
+        self.assertIsNotNone(store.load_error)
+        self.assertEqual(store.names(), [DEFAULT_PRESET])
+        self.assertTrue(os.path.exists(self.path + ".corrupt"))
+
+
+if __name__ == '__main__':
+    unittest.main()
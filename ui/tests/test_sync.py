@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from fx_autoconfig import FxAutoconfigEngine
+
+OLD = 1_600_000_000 * 10**9
+NEW = OLD + 60 * 10**9
+
+
+def script(version=None, script_id=None, body="console.log(1);"):
+    header = ["// ==UserScript=="]
+    if version:
+        header.append(f"// @version {version}")
+    if script_id:
+        header.append(f"// @id {script_id}")
+    return "\n".join(header + ["// ==/UserScript==", body, ""])
+
+
+class CompareVersionsTest(unittest.TestCase):
+    def test_order(self):
+        engine = FxAutoconfigEngine()
+        for older, newer in (("1.0", "1.1"), ("1.9", "1.10"), ("1.0b1", "1.0"), ("1.0a1", "1.0b1"),
+                             ("1.0pre1", "1.0pre2"), ("2", "2.0.1")):
+            with self.subTest(older=older, newer=newer):
+                self.assertEqual(engine.compare_versions(older, newer), -1)
+                self.assertEqual(engine.compare_versions(newer, older), 1)
+
+    def test_equal(self):
+        engine = FxAutoconfigEngine()
+        self.assertEqual(engine.compare_versions("1", "1.0.0"), 0)
+        self.assertEqual(engine.compare_versions("1.*", "1.*"), 0)
+
+
+class SyncActionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "src", "test.uc.js")
+        self.dst = os.path.join(self.tmp.name, "dst", "test.uc.js")
+        self.engine = FxAutoconfigEngine()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text, mtime_ns):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def action(self, src_text, dst_text, src_mtime=OLD, dst_mtime=OLD):
+        self.write(self.src, src_text, src_mtime)
+        self.write(self.dst, dst_text, dst_mtime)
+        return self.engine.sync_action(self.src, self.dst)[0]
+
+    def test_missing_target_is_copied(self):
+        self.write(self.src, script("1"), OLD)
+        self.assertEqual(self.engine.sync_action(self.src, self.dst)[0], "copy")
+
+    def test_earlier_copy_is_unchanged(self):
+        self.write(self.src, script("1"), OLD)
+        os.makedirs(os.path.dirname(self.dst))
+        shutil.copy2(self.src, self.dst)
+        self.assertEqual(self.engine.sync_action(self.src, self.dst)[0], "unchanged")
+
+    def test_same_content_is_unchanged_and_keeps_timestamps(self):
+        self.assertEqual(self.action(script("1"), script("1"), OLD, NEW), "unchanged")
+        self.assertEqual(os.stat(self.dst).st_mtime_ns, NEW)
+
+    def test_versions_decide_when_both_have_one(self):
+        self.assertEqual(self.action(script("2"), script("1"), OLD, NEW), "copy")
+        self.assertEqual(self.action(script("1"), script("2"), NEW, OLD), "downgrade")
+
+    def test_different_id_is_a_conflict(self):
+        self.assertEqual(self.action(script("2", "a@x"), script("1", "b@x"), NEW, OLD), "conflict")
+
+    def test_same_version_newer_source_is_copied(self):
+        self.assertEqual(self.action(script("1", body="a();"), script("1", body="bb();"), NEW, OLD), "copy")
+
+    def test_same_version_newer_profile_copy_is_kept(self):
+        self.assertEqual(self.action(script("1", body="a();"), script("1", body="bb();"), OLD, NEW), "downgrade")
+
+    def test_unversioned_files_compare_mtimes(self):
+        self.assertEqual(self.action("a", "bb", NEW, OLD), "copy")
+        self.assertEqual(self.action("a", "bb", OLD, NEW), "downgrade")
+
+    def test_one_side_without_version_compares_mtimes(self):
+        self.assertEqual(self.action(script("3"), script(), OLD, NEW), "downgrade")
+        self.assertEqual(self.action(script(), script("3"), NEW, OLD), "copy")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from fx_autoconfig import FxAutoconfigEngine
+
+MANIFEST = ("content userchromejs ../../../profile/chrome/utils/\n"
+            "content userscripts ../tests/\n"
+            "skin userstyles classic/1.0 ../../../profile/chrome/CSS/\n"
+            "content userchrome ../resources/\n")
+REPO_FILES = {
+    "test_profile/chrome/userChrome.css": "@import url(resources/test.css);\n",
+    "test_profile/chrome/tests/test.uc.js": "// test\n",
+    "test_profile/chrome/resources/test.css": "#nav-bar {}\n",
+    "test_profile/chrome/utils/chrome.manifest": MANIFEST,
+    "profile/chrome/utils/boot.sys.mjs": "// boot\n",
+    "profile/chrome/CSS/author.uc.css": "/* style */\n",
+}
+# Where every repository file ends up in a clone
+CLONE_FILES = {
+    "chrome/userChrome.css": "test_profile/chrome/userChrome.css",
+    "chrome/tests/test.uc.js": "test_profile/chrome/tests/test.uc.js",
+    "chrome/resources/test.css": "test_profile/chrome/resources/test.css",
+    "chrome/utils/boot.sys.mjs": "profile/chrome/utils/boot.sys.mjs",
+    "chrome/CSS/author.uc.css": "profile/chrome/CSS/author.uc.css",
+}
+
+
+class TestProfileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.repo = os.path.join(self.tmp.name, "repo")
+        for rel_path, text in REPO_FILES.items():
+            self.write(self.repo_path(rel_path), text)
+        self.engine = FxAutoconfigEngine()
+        self.engine.log_message = lambda message, error=False: None
+        self.engine.get_repo_root = lambda: self.repo
+        patcher = mock.patch("tempfile.tempdir", self.tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def repo_path(self, rel_path):
+        return os.path.join(self.repo, *rel_path.split("/"))
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path, encoding='utf-8', newline='') as f:
+            return f.read()
+
+    def files(self, top):
+        found = []
+        for root, dirs, files in os.walk(top):
+            found += [os.path.relpath(os.path.join(root, file), top).replace(os.sep, "/") for file in files]
+        return sorted(found)
+
+    def test_clone_layout(self):
+        profiles = self.engine.create_test_profiles("Firefox", 2)
+        self.assertEqual(len(profiles), 2)
+        self.assertEqual(self.engine.find_test_profile_roots(), [os.path.dirname(profiles[0])])
+        for profile in profiles:
+            self.assertEqual(self.files(profile), sorted(list(CLONE_FILES) + ["chrome/utils/chrome.manifest"]))
+            for clone_path, repo_path in CLONE_FILES.items():
+                self.assertEqual(self.read(os.path.join(profile, *clone_path.split("/"))),
+                                 REPO_FILES[repo_path])
+            # Directories from profile/chrome are used from inside the clone
+            self.assertEqual(self.read(os.path.join(profile, "chrome", "utils", "chrome.manifest")),
+                             "content userchromejs ./\ncontent userscripts ../tests/\n"
+                             "skin userstyles classic/1.0 ../CSS/\ncontent userchrome ../resources/\n")
+
+    def test_editing_a_clone_leaves_the_repository_alone(self):
+        profile = self.engine.create_test_profiles("Firefox", 1)[0]
+        self.write(os.path.join(profile, "chrome", "userChrome.css"), "/* edited */\n")
+        self.write(os.path.join(profile, "chrome", "resources", "test.css"), "/* edited */\n")
+        with open(os.path.join(profile, "chrome", "utils", "chrome.manifest"), 'a') as f:
+            f.write("content extra ../extra/\n")
+        for rel_path, text in REPO_FILES.items():
+            with self.subTest(path=rel_path):
+                self.assertEqual(self.read(self.repo_path(rel_path)), text)
+
+    def test_reflink_hardlink_and_copy_fallbacks(self):
+        def fake_reflink(src, dst):
+            shutil.copy2(src, dst)
+            return True
+        with mock.patch.object(self.engine, 'reflink_file', side_effect=fake_reflink) as reflink_file:
+            profile = self.engine.create_test_profiles("Firefox", 1)[0]
+        # Every file is reflinked when the filesystem can, including the ones that could be hardlinked
+        self.assertEqual(reflink_file.call_count, len(REPO_FILES))
+        for clone_path in CLONE_FILES:
+            with self.subTest(path=clone_path):
+                self.assertEqual(os.stat(os.path.join(profile, *clone_path.split("/"))).st_nlink, 1)
+
+        with mock.patch.object(FxAutoconfigEngine, 'reflink_file', return_value=False) as reflink_file:
+            profile = self.engine.create_test_profiles("Firefox", 1)[0]
+        # Once the filesystem refuses a reflink it is not asked again
+        self.assertEqual(reflink_file.call_count, 1)
+        self.assertTrue(os.path.samefile(os.path.join(profile, "chrome", "tests", "test.uc.js"),
+                                         self.repo_path("test_profile/chrome/tests/test.uc.js")))
+        self.assertTrue(os.path.samefile(os.path.join(profile, "chrome", "utils", "boot.sys.mjs"),
+                                         self.repo_path("profile/chrome/utils/boot.sys.mjs")))
+        # The tests write to these, they must never share an inode with the repository
+        for clone_path in ("chrome/userChrome.css", "chrome/resources/test.css", "chrome/utils/chrome.manifest"):
+            with self.subTest(path=clone_path):
+                self.assertEqual(os.stat(os.path.join(profile, *clone_path.split("/"))).st_nlink, 1)
+
+        with mock.patch.object(FxAutoconfigEngine, 'reflink_file', return_value=False), \
+                mock.patch("fx_autoconfig.engine.os.link", side_effect=OSError("not supported")):
+            profile = self.engine.create_test_profiles("Firefox", 1)[0]
+        for clone_path, repo_path in CLONE_FILES.items():
+            with self.subTest(path=clone_path):
+                clone_file = os.path.join(profile, *clone_path.split("/"))
+                self.assertFalse(os.path.samefile(clone_file, self.repo_path(repo_path)))
+                self.assertEqual(self.read(clone_file), REPO_FILES[repo_path])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from fx_autoconfig import FxAutoconfigEngine
+from fx_autoconfig.engine import BUNDLE_DIR, BUNDLE_MANIFEST, MMAP_HASH_THRESHOLD
+
+REPO_FILES = {
+    ("program", "config.js"): "// config\n",
+    ("program", "defaults", "pref", "config-prefs.js"): "pref('general.config.filename', 'config.js');\n",
+    ("profile", "chrome", "utils", "boot.sys.mjs"): "// boot\n",
+    ("profile", "chrome", "utils", "chrome.manifest"): "content userchromejs ./\n",
+}
+
+
+class VerifyTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.repo = os.path.join(self.tmp.name, "repo")
+        self.firefox = os.path.join(self.tmp.name, "firefox")
+        self.profile = os.path.join(self.tmp.name, "profile")
+        self.custom = os.path.join(self.tmp.name, "myjs")
+        for parts, text in REPO_FILES.items():
+            self.write(os.path.join(self.repo, *parts), text)
+        shutil.copytree(os.path.join(self.repo, "program"), self.firefox)
+        shutil.copytree(os.path.join(self.repo, "profile"), self.profile)
+        self.engine = FxAutoconfigEngine()
+        self.engine.log_message = lambda message, error=False: None
+        self.settings = {'firefox_path': self.firefox, 'profile_path': self.profile,
+                         'custom_js_path': '', 'custom_css_path': '', 'use_symlinks': False}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+
+    def verify(self):
+        results = self.engine.run_verification(self.repo, self.settings)
+        return {key: sorted(pair[0] if isinstance(pair, tuple) else pair for pair in value)
+                for key, value in results.items()}
+
+    def test_identical_installation(self):
+        results = self.verify()
+        self.assertEqual(len(results['ok']), len(REPO_FILES))
+        for key in ('missing', 'mismatch', 'error', 'extra'):
+            self.assertEqual(results[key], [], key)
+
+    def test_same_size_mismatch_and_missing_file(self):
+        self.write(os.path.join(self.firefox, "config.js"), "// CONFIG\n")
+        os.remove(os.path.join(self.profile, "chrome", "utils", "boot.sys.mjs"))
+        results = self.verify()
+        self.assertEqual(results['mismatch'], ["config.js"])
+        self.assertEqual(results['missing'], ["boot.sys.mjs"])
+
+    def test_extra_files_in_utils(self):
+        extra = os.path.join(self.profile, "chrome", "utils", "old.sys.mjs")
+        self.write(extra, "// left over\n")
+        self.assertEqual(self.verify()['extra'], [extra])
+
+    def test_stale_bundles_are_extra(self):
+        bundle_dir = os.path.join(self.profile, "chrome", *BUNDLE_DIR)
+        self.write(os.path.join(bundle_dir, BUNDLE_MANIFEST),
+                   json.dumps({'format': 1, 'bundles': [{'file': "bundle-a.js", 'scripts': []}]}))
+        self.write(os.path.join(bundle_dir, "bundle-a.js"), "[]")
+        self.write(os.path.join(bundle_dir, "bundle-b.js"), "[]")
+        self.assertEqual(self.verify()['extra'], [os.path.join(bundle_dir, "bundle-b.js")])
+
+    def test_custom_files_respect_ucignore(self):
+        self.write(os.path.join(self.custom, "a.uc.js"), "// a\n")
+        self.write(os.path.join(self.custom, "notes.txt"), "not installed\n")
+        self.write(os.path.join(self.custom, ".ucignore"), "*.txt\n")
+        self.write(os.path.join(self.custom, ".git", "HEAD"), "ref\n")
+        self.write(os.path.join(self.profile, "chrome", "JS", "a.uc.js"), "// a\n")
+        self.settings['custom_js_path'] = self.custom
+        results = self.verify()
+        self.assertIn(os.path.join("JS", "a.uc.js"), results['ok'])
+        self.assertEqual((results['missing'], results['mismatch']), ([], []))
+
+        self.write(os.path.join(self.profile, "chrome", "JS", "a.uc.js"), "// b\n")
+        self.assertEqual(self.verify()['mismatch'], [os.path.join("JS", "a.uc.js")])
+
+    def test_large_files_are_memory_mapped(self):
+        data = b"x" * MMAP_HASH_THRESHOLD
+        for path in (os.path.join(self.repo, "program", "big.bin"), os.path.join(self.firefox, "big.bin")):
+            with open(path, 'wb') as f:
+                f.write(data)
+        with mock.patch("fx_autoconfig.engine.mmap.mmap", wraps=mmap.mmap) as mapped:
+            results = self.verify()
+        self.assertIn("big.bin", results['ok'])
+        self.assertEqual(mapped.call_count, 2)
+
+        with open(os.path.join(self.firefox, "big.bin"), 'r+b') as f:
+            f.seek(MMAP_HASH_THRESHOLD // 2)
+            f.write(b"y")
+        self.assertEqual(self.verify()['mismatch'], ["big.bin"])
+
+
+if __name__ == '__main__':
+    unittest.main()